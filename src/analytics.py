@@ -1,31 +1,56 @@
 # src/analytics.py
 
+import numpy as np
+import pandas as pd
+
+from positions import position_group
+
+# === Etiquetado de grupos de pico ===
+# Temporada válida para buscar el pico: al menos 900 minutos (10 partidos completos)
+PEAK_MIN_MINUTES = 900
+# Pico alcanzado hasta este año desde el debut → "joven estrella"
+EARLY_PEAK_MAX_YEAR = 4
+# Percentil del rating pico a partir del cual el jugador se considera estrella
+STAR_PEAK_QUANTILE = 0.67
+
 def assign_position_group(position):
-    position_groups = {
-        'GOALKEEPER': ['GK'],
-        'DEFENSIVE': ['CB', 'LB', 'RB', 'FB', 'LWB', 'RWB', 'SW', 'D'],
-        'MIDFIELD': ['CM', 'DM', 'MF', 'AM'],
-        'ATTACKING': ['CF', 'ST', 'F', 'FW', 'LW', 'RW', 'WF', 'IF', 'OL', 'OR']
-    }
+    """
+    Grupo de posición de una cadena suelta. Para tablas completas, usar
+    `positions.classify_positions` (vectorizado).
+    """
+    return position_group(position)
 
-    if not isinstance(position, str):
-        return "UNKNOWN"
 
-    for group, codes in position_groups.items():
-        if any(code in position for code in codes):
-            return group
-    return "UNKNOWN"
+# === Pesos del rating por grupo de posición ===
+# DEFAULT es el rating original de la app (con el que se entrenó el modelo).
+# Los demás están fijados a mano, no ajustados con datos, y solo se usan si
+# se activa `rating_by_position` en el motor de percentiles. Compensan que
+# solo hay estadísticas ofensivas: para defensas y porteros un gol o una
+# asistencia es más raro y pesa más, y las amarillas (faltas tácticas)
+# penalizan menos que en un delantero.
+RATING_WEIGHTS = {
+    "DEFAULT": {"Goals": 5, "Assists": 4, "Shots_on_target": 0.5, "Shots_off_target": 0.1, "Yellow_cards": -1, "Red_cards": -2},
+    "ATTACKING": {"Goals": 5, "Assists": 4, "Shots_on_target": 0.5, "Shots_off_target": 0.1, "Yellow_cards": -1, "Red_cards": -2},
+    "MIDFIELD": {"Goals": 6, "Assists": 4.5, "Shots_on_target": 0.6, "Shots_off_target": 0.1, "Yellow_cards": -0.75, "Red_cards": -2},
+    "DEFENSIVE": {"Goals": 8, "Assists": 6, "Shots_on_target": 0.75, "Shots_off_target": 0.15, "Yellow_cards": -0.5, "Red_cards": -2},
+    "GOALKEEPER": {"Goals": 10, "Assists": 8, "Shots_on_target": 1, "Shots_off_target": 0.2, "Yellow_cards": -0.5, "Red_cards": -3},
+}
 
 
-def compute_rating_row(row):
+def rating_weights(position_group: str | None = None) -> dict[str, float]:
+    return RATING_WEIGHTS.get(position_group or "DEFAULT", RATING_WEIGHTS["DEFAULT"])
+
+
+def compute_rating_row(row, position_group: str | None = None):
     try:
+        w = rating_weights(position_group)
         score = (
-            row['Goals'] * 5 +
-            row['Assists'] * 4 +
-            row['Shots_on_target'] * 0.5 +
-            (row['Shots'] - row['Shots_on_target']) * 0.1 -
-            row['Yellow_cards'] * 1 -
-            row['Red_cards'] * 2
+            row['Goals'] * w['Goals'] +
+            row['Assists'] * w['Assists'] +
+            row['Shots_on_target'] * w['Shots_on_target'] +
+            (row['Shots'] - row['Shots_on_target']) * w['Shots_off_target'] +
+            row['Yellow_cards'] * w['Yellow_cards'] +
+            row['Red_cards'] * w['Red_cards']
         )
         return score / (row['Minutes'] / 90) if row['Minutes'] > 0 else 0
     except Exception as e:
@@ -33,3 +58,57 @@ def compute_rating_row(row):
         return 0
 
 
+def compute_rating(df: pd.DataFrame, position_groups=None) -> pd.Series:
+    """
+    Versión vectorizada de `compute_rating_row` para un DataFrame completo.
+    Espera las columnas ya convertidas a numérico.
+
+    Sin `position_groups` se usan los pesos DEFAULT. Con un grupo por fila
+    (Series alineada o array), cada partido se puntúa con los de su grupo.
+    """
+    if position_groups is None:
+        w = rating_weights()
+    else:
+        groups = pd.Series(np.asarray(position_groups, dtype=object), index=df.index)
+        w = {
+            coef: groups.map({g: weights[coef] for g, weights in RATING_WEIGHTS.items()}).fillna(RATING_WEIGHTS["DEFAULT"][coef]).astype(float)
+            for coef in RATING_WEIGHTS["DEFAULT"]
+        }
+    score = (
+        df['Goals'] * w['Goals'] +
+        df['Assists'] * w['Assists'] +
+        df['Shots_on_target'] * w['Shots_on_target'] +
+        (df['Shots'] - df['Shots_on_target']) * w['Shots_off_target'] +
+        df['Yellow_cards'] * w['Yellow_cards'] +
+        df['Red_cards'] * w['Red_cards']
+    )
+    minutes = df['Minutes']
+    return (score / (minutes / 90)).where(minutes > 0, 0.0)
+
+
+def label_peak_groups(careers: pd.DataFrame) -> pd.Series:
+    """
+    Asigna el peak_group de cada jugador a partir de su carrera completa
+    (una fila por Player_ID y year_since_debut, como el career_df de la app).
+
+    - "joven estrella": pico alto alcanzado pronto.
+    - "estrellato tardío": pico alto alcanzado más tarde.
+    - "jugador medio": pico por debajo del umbral o sin temporadas válidas.
+    """
+    players = careers['Player_ID'].unique()
+    valid = careers[careers['Minutes'] >= PEAK_MIN_MINUTES]
+    if valid.empty:
+        return pd.Series("jugador medio", index=pd.Index(players, name='Player_ID'), name='peak_group')
+
+    peaks = valid.loc[valid.groupby('Player_ID')['rating_per_90'].idxmax()].set_index('Player_ID')
+    threshold = peaks['rating_per_90'].quantile(STAR_PEAK_QUANTILE)
+
+    labels = np.where(
+        peaks['rating_per_90'] < threshold,
+        "jugador medio",
+        np.where(peaks['year_since_debut'] <= EARLY_PEAK_MAX_YEAR, "joven estrella", "estrellato tardío")
+    )
+    return (
+        pd.Series(labels, index=peaks.index, name='peak_group')
+        .reindex(pd.Index(players, name='Player_ID'), fill_value="jugador medio")
+    )
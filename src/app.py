@@ -5,21 +5,32 @@ from PIL import Image
 import pandas as pd
 import time
 import os
+import numpy as np
 
 from data_loader import (
     load_future_metadata,
     get_metadata_by_player,
-    get_player_image_path
+    get_player_image_path,
+    get_data_version
 )
-from model_runner import predict_and_project_player
-from player_processing import build_player_df, summarize_basic_stats, traducir_posicion
+from leaderboard import FACETS, POSITION_GROUP_NAMES, get_leaderboard
+from model_utils import get_model_version
+from cache_policy import cache_stats, get_cache
+from comparison import MAX_COMPARED, get_comparison
+from player_context import PlayerContext
+from player_processing import traducir_posicion
+from startup import get_startup_loader, wait_for_page
 from stats import (
+    FIGURE_LOCK,
     plot_player_stats,
     plot_minutes_per_year,
-    plot_rating_projection
+    plot_rating_projection,
+    plot_comparison
 )
-from descriptions import generar_conclusion_completa, generar_explicacion_grafica_ga, generar_explicacion_minutos_por_ano, generar_explicacion_curva_evolucion
+from descriptions import generar_conclusion_stream, generar_explicacion_grafica_ga, generar_explicacion_minutos_por_ano, generar_explicacion_curva_evolucion
 from styles.theme import apply_background
+from tenants import current_tenant, resolve_tenant, set_session_tenant
+from whatif import get_whatif_simulator
 
 # ---------------------------
 # ✅ CONFIGURACIÓN INICIAL
@@ -48,6 +59,24 @@ st.markdown("""
 
 apply_background()
 
+
+def show_figure(fig, size: tuple[float, float] | None = None) -> None:
+    # Figuras cacheadas y compartidas entre sesiones: se redimensionan y dibujan de una en una
+    with FIGURE_LOCK:
+        if size:
+            fig.set_size_inches(*size)
+        st.pyplot(fig)
+
+# 🏢 Tenant de la sesión (?tenant=...&key=...): decide qué jugadores se ven
+try:
+    set_session_tenant(resolve_tenant(st.query_params.get("tenant"), st.query_params.get("key")))
+except (KeyError, ValueError, PermissionError) as e:
+    st.error(f"❌ Acceso no permitido: {e}")
+    st.stop()
+
+# 🚀 Datos y modelo se cargan en paralelo mientras se pinta la interfaz
+loader = get_startup_loader(current_tenant(), get_data_version(), get_model_version())
+
 sleep_duration = 1.0 if os.getenv("STREAMLIT_SERVER_HEADLESS") == "1" else 0.5
 
 # ---------------------------
@@ -77,7 +106,16 @@ with st.sidebar:
         3. Compara con grupos similares.  
     """)
 
+    vista = st.radio(
+        label="Vista",
+        options=["👤 Jugador", "🏆 Ranking", "⚖️ Comparar"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="vista"
+    )
+
     try:
+        wait_for_page(loader, "sidebar")
         metadata = load_future_metadata()
         player_names = sorted(metadata["Player_name"].dropna().unique())
     except Exception as e:
@@ -92,6 +130,12 @@ with st.sidebar:
         key="selected_player"
     )
 
+    modo_mixto = st.toggle(
+        "🎲 Proyección probabilística",
+        key="modo_mixto",
+        help="Mezcla las curvas de todos los grupos según la probabilidad que da el modelo a cada uno."
+    )
+
     if "selected_player_prev" not in st.session_state:
         st.session_state.selected_player_prev = selected_player
 
@@ -126,6 +170,14 @@ with st.sidebar:
         </p>
     """, unsafe_allow_html=True)
 
+    if os.getenv("FUTPEAK_DEBUG") == "1":
+        with st.expander("📦 Caché"):
+            cache = get_cache()
+            st.caption(f"{cache.total_bytes / 2**20:.1f} MB de {cache.max_bytes / 2**20:.0f} MB ({cache.policy.upper()})")
+            st.dataframe(cache_stats(), hide_index=True, use_container_width=True)
+        with st.expander("🚀 Carga inicial"):
+            st.dataframe(loader.status(), hide_index=True, use_container_width=True)
+
     st.markdown("""
         <a href="https://docs.google.com/forms/d/e/1FAIpQLSfuuXMKtFDsAtQzLXoXuIlxOKQM3oPiEQtpyBJrfbxazAk2GQ/viewform?usp=dialog" target="_blank">
             <button style="background-color:#FFD700; color:black; font-weight:bold; padding:0.5em 1em; margin-top: 0.5rem; border:none; border-radius:8px; font-size:1rem; cursor:pointer; width:100%;">
@@ -134,6 +186,139 @@ with st.sidebar:
         </a>
     """, unsafe_allow_html=True)
 
+# ---------------------------
+# 🏆 RANKING DE PROYECCIONES
+# ---------------------------
+if vista == "🏆 Ranking":
+    st.markdown("<h1 style='font-size:2rem; margin-bottom:0.5rem;'>🏆 Ranking de proyecciones</h1>", unsafe_allow_html=True)
+
+    try:
+        wait_for_page(loader, "ranking", "⏳ Cargando datos y modelo...")
+        ranking = get_leaderboard(get_data_version(), get_model_version())
+    except Exception as e:
+        st.error(f"❌ Error al construir el ranking: {e}")
+        st.stop()
+
+    facet_labels = {
+        "peak_group": "Grupo predicho",
+        "position_group": "Posición",
+        "age_band": "Edad",
+    }
+    filtros = {}
+    cols = st.columns(len(FACETS) + 1)
+    for col, facet in zip(cols, FACETS):
+        with col:
+            valor = st.selectbox(
+                facet_labels[facet],
+                options=["Todos"] + ranking.facet_values(facet),
+                format_func=lambda v: POSITION_GROUP_NAMES.get(v, v),
+                key=f"ranking_{facet}"
+            )
+            filtros[facet] = None if valor == "Todos" else valor
+    with cols[-1]:
+        k = st.number_input("Top", min_value=5, max_value=200, value=20, step=5)
+
+    top_df = ranking.top(int(k), **filtros)
+    top_df = top_df.assign(position_group=top_df["position_group"].map(POSITION_GROUP_NAMES))
+    st.dataframe(
+        top_df.drop(columns=["Player_ID"]).rename(columns={
+            "Player_name": "Jugador",
+            "Club": "Equipo",
+            "Age": "Edad",
+            "position_group": "Posición",
+            "age_band": "Franja de edad",
+            "peak_group": "Grupo predicho",
+            "projected_peak": "Pico proyectado",
+            "current_rating": "Rating actual",
+            "seasons": "Años desde debut",
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+    st.stop()
+
+# ---------------------------
+# ⚖️ COMPARACIÓN DE JUGADORES
+# ---------------------------
+if vista == "⚖️ Comparar":
+    st.markdown("<h1 style='font-size:2rem; margin-bottom:0.5rem;'>⚖️ Comparar jugadores</h1>", unsafe_allow_html=True)
+
+    seleccion = st.multiselect(
+        "Jugadores",
+        options=player_names,
+        default=[selected_player] if selected_player else [],
+        max_selections=MAX_COMPARED,
+        key="comparar_jugadores"
+    )
+    if len(seleccion) < 2:
+        st.info("Selecciona al menos dos jugadores.")
+        st.stop()
+
+    try:
+        wait_for_page(loader, "compare", "⏳ Cargando datos y modelo...")
+        ids = tuple(metadata.loc[metadata["Player_name"].isin(seleccion)].drop_duplicates("Player_name").set_index("Player_name").loc[seleccion, "Player_ID"])
+        comparacion = get_comparison(ids, get_data_version(), get_model_version())
+    except Exception as e:
+        st.error(f"❌ Error al comparar jugadores: {e}")
+        st.stop()
+
+    jugadores = comparacion["players"]
+    st.dataframe(
+        jugadores.drop(columns=["Player_ID"]).assign(
+            position_group=jugadores["position_group"].map(POSITION_GROUP_NAMES),
+            probability=(jugadores["probability"] * 100).round(0),
+        ).rename(columns={
+            "Player_name": "Jugador",
+            "Club": "Equipo",
+            "position_group": "Posición",
+            "peak_group": "Grupo predicho",
+            "probability": "Probabilidad (%)",
+            "current_rating": "Rating actual",
+            "projected_peak": "Pico proyectado",
+            "seasons": "Años desde debut",
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+
+    fig_cmp = plot_comparison(jugadores, comparacion["careers"], comparacion["projections"])
+    if fig_cmp:
+        show_figure(fig_cmp)
+    else:
+        st.warning("⚠️ No se pudo generar esta gráfica.")
+    st.stop()
+
+# ---------------------------
+# 🔮 SIMULADOR «¿Y SI...?»
+# ---------------------------
+# Fragmento: al mover un slider solo se vuelve a ejecutar este bloque
+@st.fragment
+def render_whatif(ctx: PlayerContext, player_name: str) -> None:
+    with st.expander("🔮 ¿Y si...? Simular próximas temporadas"):
+        simulator = get_whatif_simulator(ctx.player_id, get_data_version(), get_model_version(), _ctx=ctx)
+        last = simulator.seasonal.iloc[-1]
+        ratings = simulator.seasonal["rating_per_90"]
+        low = float(min(0.0, np.floor(ratings.min())))
+        high = float(max(1.0, np.ceil(ratings.max() * 1.5)))
+
+        n_seasons = st.slider("Temporadas simuladas", 1, 3, 1, key=f"whatif_n_{ctx.player_id}")
+        minutes = st.slider(
+            "Minutos por temporada", 0, 4000, int(min(last["Minutes"], 4000)), step=50,
+            key=f"whatif_minutes_{ctx.player_id}"
+        )
+        rating = st.slider(
+            "Rating por 90", low, high, float(np.clip(last["rating_per_90"], low, high)), step=0.05,
+            key=f"whatif_rating_{ctx.player_id}"
+        )
+
+        result = simulator.simulate([(minutes, rating)] * n_seasons)
+        proba = result["probabilities"][result["group"]]
+        st.caption(f"Grupo simulado: **{result['group']}** ({proba:.0%}) · recalculado en {result['ms']:.1f} ms")
+        fig = plot_rating_projection(player_name, result["seasonal"], result["curve"], f"{result['group']} (simulado)")
+        if fig:
+            show_figure(fig, (6, 4))
+
+
 # ---------------------------
 # 🏗️ BLOQUE PRINCIPAL
 # ---------------------------
@@ -143,18 +328,24 @@ placeholder = st.empty()
 if selected_player:
     with placeholder.container():
         with st.spinner("🔄 Cargando perfil completo..."):
+            try:
+                wait_for_page(loader, "player")
+            except Exception as e:
+                st.error(f"❌ Error al cargar datos o modelo: {e}")
+                st.stop()
 
             player_id = metadata.loc[metadata["Player_name"] == selected_player, "Player_ID"].values[0]
+            ctx = PlayerContext(player_id)
 
             img = None
             meta = {}
             summary_df = pd.DataFrame()
             seasonal = group_curve = label = None
+            form = pd.Series(dtype=float)
             fig_stats = fig_minutes = fig_proj = None
-            conclusion_text = ""
 
             try:
-                img_path = get_player_image_path(selected_player, metadata)
+                img_path = get_player_image_path(selected_player, metadata, get_data_version())
                 if img_path and img_path.exists():
                     img = Image.open(img_path)
             except Exception as e:
@@ -162,12 +353,15 @@ if selected_player:
 
             try:
                 meta = get_metadata_by_player(selected_player, future=True)
-                summary_df = summarize_basic_stats(build_player_df(player_id))
-                label, seasonal, group_curve = predict_and_project_player(player_id)
-                fig_stats = plot_player_stats(player_id)
-                fig_minutes = plot_minutes_per_year(player_id)
+                summary_df = ctx.summary
+                form = ctx.form
+                if modo_mixto:
+                    label, seasonal, group_curve, _ = ctx.prediction_mixture
+                else:
+                    label, seasonal, group_curve = ctx.prediction
+                fig_stats = plot_player_stats(player_id, _ctx=ctx)
+                fig_minutes = plot_minutes_per_year(player_id, _ctx=ctx)
                 fig_proj = plot_rating_projection(selected_player, seasonal, group_curve, label)
-                conclusion_text = generar_conclusion_completa(player_id).replace("## ", "")
             except Exception as e:
                 st.warning(f"⚠️ Error durante la carga: {e}")
 
@@ -197,6 +391,15 @@ if selected_player:
                 club = meta.get("Club", "N/A")
                 age_display = raw_age.split("-")[0] if "-" in raw_age else raw_age
                 minutos = int(summary_df['Minutos totales'].iloc[0]) if not summary_df.empty else "N/A"
+                percentil = ""
+                if 'Percentil rating/90' in summary_df and pd.notna(summary_df['Percentil rating/90'].iloc[0]):
+                    percentil = f"<p><strong>Percentil rating/90 (año {int(summary_df['Año de referencia'].iloc[0])}):</strong> P{summary_df['Percentil rating/90'].iloc[0]:.0f}</p>"
+                forma = ""
+                if pd.notna(form.get("form_rating_10")):
+                    forma = (
+                        f"<p><strong>Forma (últimos 10 partidos):</strong> rating {form['form_rating_10']:.2f} · "
+                        f"G+A/90 {form['form_ga90_10']:.2f} · {form['form_min_share_10']:.0%} de minutos</p>"
+                    )
                 st.markdown(f"""
                 <div class='block-card' style="
                     min-height: 280px;
@@ -212,6 +415,8 @@ if selected_player:
                     <p><strong>Edad:</strong> {age_display}</p>
                     <p><strong>Posición:</strong> {traducir_posicion(meta.get('Position', 'N/A'))}</p>
                     <p><strong>Minutos jugados:</strong> {minutos}</p>
+                    {percentil}
+                    {forma}
                 </div>
                 """, unsafe_allow_html=True)
 
@@ -219,7 +424,7 @@ if selected_player:
             # 🧠 Generar explicación IA de la gráfica de G+A
             from descriptions import generar_explicacion_grafica_ga
             try:
-                explicacion_ia_raw = generar_explicacion_grafica_ga(player_id)
+                explicacion_ia_raw = generar_explicacion_grafica_ga(player_id, _ctx=ctx)
                 explicacion_ia = explicacion_ia_raw.replace('"', '').replace('\n', ' ').strip()
             except Exception as e:
                 explicacion_ia = "⚠️ No se pudo generar la explicación."
@@ -267,14 +472,14 @@ if selected_player:
 
             # 🎯 Mostrar gráfica G+A
             if fig_stats:
-                st.pyplot(fig_stats)
+                show_figure(fig_stats)
             else:
                 st.warning("⚠️ No se pudo generar esta gráfica.")
 
             # ⏱️ Gráfica de minutos
             # 🧠 Explicación IA para minutos por año
             try:
-                explicacion_min_raw = generar_explicacion_minutos_por_ano(player_id)
+                explicacion_min_raw = generar_explicacion_minutos_por_ano(player_id, _ctx=ctx)
                 explicacion_min = explicacion_min_raw.replace('"', '').replace('\n', ' ').strip()
             except Exception as e:
                 explicacion_min = "⚠️ No se pudo generar la explicación."
@@ -289,8 +494,7 @@ if selected_player:
             </h3>
             """, unsafe_allow_html=True)
             if fig_minutes:
-                fig_minutes.set_size_inches(6, 3)
-                st.pyplot(fig_minutes)
+                show_figure(fig_minutes, (6, 3))
             else:
                 st.warning("⚠️ No se pudo generar esta gráfica.")
 
@@ -298,7 +502,7 @@ if selected_player:
             # 🧠 Explicación IA para la gráfica de evolución
            
             try:
-                explicacion_proj_raw = generar_explicacion_curva_evolucion(player_id)
+                explicacion_proj_raw = generar_explicacion_curva_evolucion(player_id, _ctx=ctx)
                 explicacion_proj = explicacion_proj_raw.replace('"', '').replace('\n', ' ').strip()
             except Exception as e:
                 explicacion_proj = "⚠️ No se pudo generar la explicación."
@@ -348,18 +552,24 @@ if selected_player:
             """, unsafe_allow_html=True)
 
             if fig_proj:
-                fig_proj.set_size_inches(6, 4)
-                st.pyplot(fig_proj)
+                show_figure(fig_proj, (6, 4))
             else:
                 st.warning("⚠️ No se pudo generar esta gráfica.")
 
+            if seasonal is not None and not seasonal.empty:
+                render_whatif(ctx, selected_player)
 
-        if conclusion_text:
-            st.markdown(f"""
+
+        # 🌠 Conclusiones: se pintan según llegan los trozos de la IA
+        conclusion_box = st.empty()
+        conclusion_text = ""
+        for chunk in generar_conclusion_stream(player_id, _ctx=ctx):
+            conclusion_text += chunk
+            conclusion_box.markdown(f"""
             <div class='block-card'>
               <h3>🌠 Conclusiones</h3>
               <p style="font-size:20px; line-height:1.4;">
-                {conclusion_text}
+                {conclusion_text.replace("**", "").replace("## ", "")}
               </p>
             </div>
             """, unsafe_allow_html=True)
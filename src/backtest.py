@@ -0,0 +1,224 @@
+# src/backtest.py
+#
+# Backtesting del modelo de peak_group sobre el histórico: cada jugador se
+# "rebobina" a su año N desde el debut, se construyen las features con el
+# mismo código que la app (`build_feature_matrix` → `compute_annual_profile`)
+# y se predice en lote. Después se compara con lo que pasó de verdad:
+# grupo real (etiquetado con la carrera completa), pico real y rating de
+# cada temporada posterior al corte frente a la curva proyectada.
+#
+#   python backtest.py                       # cortes 1..5 con el modelo actual
+#   python backtest.py --cutoffs 2 3 --model-dir ruta/al/modelo --output informe/
+#   python backtest.py --all-players         # también los jugadores de entrenamiento
+#
+# Por defecto solo se evalúan los jugadores reservados al entrenar
+# (`holdout_players` del manifest). Con --all-players, o con un modelo sin
+# manifest, las métricas son dentro de muestra (optimistas).
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, balanced_accuracy_score, f1_score
+
+from analytics import PEAK_MIN_MINUTES, label_peak_groups
+from data_loader import load_cleaned_matchlogs, load_cleaned_metadata
+from features import add_year_since_debut, build_feature_matrix, prepare_player_frames, truncate_careers
+from form import uses_form
+from leaderboard import projection_curves, score_matrix
+from model_utils import MANIFEST_NAME, MODEL_DIR, ModelAssets, get_model_version
+from player_processing import calculate_rating_per_90
+from positions import curves_for_position, position_groups_by_player
+
+CUTOFFS = (1, 2, 3, 4, 5)
+
+
+# -------------------------
+# Carreras reales
+# -------------------------
+def realised_outcomes(careers: pd.DataFrame) -> pd.DataFrame:
+    """
+    Por jugador: grupo real, pico real (mejor rating en temporadas con al
+    menos PEAK_MIN_MINUTES), año del pico y último año jugado.
+    """
+    valid = careers[careers["Minutes"] >= PEAK_MIN_MINUTES]
+    peaks = valid.loc[valid.groupby("Player_ID")["rating_per_90"].idxmax(), ["Player_ID", "rating_per_90", "year_since_debut"]]
+    out = pd.DataFrame({
+        "true_group": label_peak_groups(careers),
+        "last_year": careers.groupby("Player_ID")["year_since_debut"].max(),
+    })
+    return out.join(peaks.set_index("Player_ID").rename(columns={"rating_per_90": "true_peak", "year_since_debut": "true_peak_year"}))
+
+
+# -------------------------
+# Un corte
+# -------------------------
+def backtest_cutoff(
+    frames: pd.DataFrame,
+    careers: pd.DataFrame,
+    outcomes: pd.DataFrame,
+    positions: pd.Series,
+    assets: ModelAssets,
+    cutoff: int,
+    n_jobs: int = -1,
+) -> tuple[dict, pd.DataFrame]:
+    """
+    Métricas y predicciones por jugador para el corte `cutoff`. Solo entran
+    jugadores que siguieron jugando después del corte (hay algo que comparar).
+    """
+    eligible = outcomes.index[outcomes["last_year"] > cutoff]
+    truncated = truncate_careers(frames[frames["Player_ID"].isin(eligible)], cutoff)
+    with_form = uses_form(assets.features)
+    X, careers_cut = build_feature_matrix(truncated, n_jobs=n_jobs, with_form=with_form)
+    if assets.feature_max_year is not None and cutoff > assets.feature_max_year:
+        # Mismas features que en la app: el modelo solo ve sus primeros años
+        X, _ = build_feature_matrix(truncated, max_year=assets.feature_max_year, n_jobs=n_jobs, with_form=with_form)
+    if X.empty:
+        return {"cutoff": cutoff, "n_players": 0}, pd.DataFrame()
+
+    scores = score_matrix(assets, X, careers_cut, positions)
+    players = scores.join(outcomes, how="inner")
+    players["cutoff"] = cutoff
+    players["correct"] = players["peak_group"] == players["true_group"]
+    players["peak_error"] = players["projected_peak"] - players["true_peak"]
+
+    # Curva proyectada frente al rating real de cada temporada posterior al corte
+    projections = []
+    pos = positions.astype(str).reindex(X.index).fillna("UNKNOWN")
+    for position, ids in pos.groupby(pos, sort=False).groups.items():
+        part = careers_cut[careers_cut["Player_ID"].isin(ids)]
+        projections.append(projection_curves(part, scores["peak_group"], curves_for_position(assets.curves, position)))
+    future = careers[careers["Player_ID"].isin(X.index) & (careers["year_since_debut"] > cutoff)]
+    future = future[["Player_ID", "year_since_debut", "rating_per_90"]].merge(
+        pd.concat(projections, ignore_index=True), on=["Player_ID", "year_since_debut"], how="inner"
+    )
+    curve_error = future["projection"] - future["rating_per_90"]
+
+    y_true, y_pred = players["true_group"], players["peak_group"]
+    peak_error = players["peak_error"].dropna()
+    metrics = {
+        "cutoff": cutoff,
+        "n_players": int(len(players)),
+        # Un modelo que predice siempre el mismo grupo se ve aquí antes que en las métricas
+        "true_distribution": {g: int(n) for g, n in y_true.value_counts().items()},
+        "predicted_distribution": {g: int(n) for g, n in y_pred.value_counts().items()},
+        "accuracy": round(float(accuracy_score(y_true, y_pred)), 4),
+        "balanced_accuracy": round(float(balanced_accuracy_score(y_true, y_pred)), 4),
+        "f1_macro": round(float(f1_score(y_true, y_pred, average="macro")), 4),
+        "recall_by_group": {g: round(float(block["correct"].mean()), 4) for g, block in players.groupby("true_group")},
+        "peak_mae": round(float(peak_error.abs().mean()), 4) if len(peak_error) else None,
+        "peak_bias": round(float(peak_error.mean()), 4) if len(peak_error) else None,
+        "curve_rmse": round(float(np.sqrt((curve_error ** 2).mean())), 4) if len(curve_error) else None,
+        "curve_points": int(len(curve_error)),
+    }
+    return metrics, players.reset_index()
+
+
+# -------------------------
+# Backtest completo
+# -------------------------
+def holdout_players(model_dir: Path = MODEL_DIR) -> list[str] | None:
+    """
+    Jugadores que el entrenamiento dejó fuera (manifest), o None si no consta.
+    """
+    path = Path(model_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("holdout_players")
+
+
+def run_backtest(
+    cutoffs=CUTOFFS,
+    assets: ModelAssets | None = None,
+    n_jobs: int = -1,
+    matchlogs: pd.DataFrame | None = None,
+    metadata: pd.DataFrame | None = None,
+    player_ids: Iterable[str] | None = None,
+) -> dict:
+    """
+    {"metrics": una fila por corte, "players": predicciones por jugador y
+    corte, "confusion": grupo real × predicho por corte}. Las carreras
+    completas se procesan una vez; cada corte recorta y construye features
+    en paralelo (n_jobs) y predice con una sola llamada al modelo.
+    Con `player_ids` solo se evalúan esos jugadores (los reservados al entrenar),
+    pero el grupo real se etiqueta con toda la población, igual que al entrenar:
+    el umbral de estrella es un percentil y cambia si se calcula solo con ellos.
+    """
+    start = time.perf_counter()
+    assets = assets or ModelAssets(MODEL_DIR)
+    matchlogs = load_cleaned_matchlogs() if matchlogs is None else matchlogs
+    metadata = load_cleaned_metadata() if metadata is None else metadata
+
+    frames = add_year_since_debut(calculate_rating_per_90(prepare_player_frames(matchlogs, metadata)))
+    _, careers = build_feature_matrix(frames, n_jobs=n_jobs)
+    outcomes = realised_outcomes(careers)
+    if player_ids is not None:
+        player_ids = set(player_ids)
+        outcomes = outcomes[outcomes.index.isin(player_ids)]
+        frames = frames[frames["Player_ID"].isin(player_ids)]
+    positions = position_groups_by_player(metadata)
+
+    rows, players = [], []
+    for cutoff in cutoffs:
+        t0 = time.perf_counter()
+        metrics, block = backtest_cutoff(frames, careers, outcomes, positions, assets, cutoff, n_jobs=n_jobs)
+        metrics["seconds"] = round(time.perf_counter() - t0, 2)
+        rows.append(metrics)
+        players.append(block)
+        if metrics["n_players"]:
+            print(f"⏪ Año {cutoff}: {metrics['n_players']} jugadores | accuracy {metrics['accuracy']:.3f} | "
+                  f"F1 macro {metrics['f1_macro']:.3f} | MAE pico {metrics['peak_mae']} | RMSE curva {metrics['curve_rmse']}")
+            print(f"   reales {metrics['true_distribution']} | predichos {metrics['predicted_distribution']}")
+            if len(metrics["predicted_distribution"]) < 2:
+                print(f"⚠️ Año {cutoff}: el modelo predice un solo grupo para todos los jugadores")
+
+    players = pd.concat([p for p in players if len(p)], ignore_index=True) if any(len(p) for p in players) else pd.DataFrame()
+    confusion = (
+        pd.crosstab([players["cutoff"], players["true_group"]], players["peak_group"], rownames=["cutoff", "true"], colnames=["predicted"])
+        if len(players) else pd.DataFrame()
+    )
+    print(f"✅ Backtest en {time.perf_counter() - start:.1f}s")
+    return {"metrics": pd.DataFrame(rows), "players": players, "confusion": confusion}
+
+
+def backtest_summary(result: dict) -> list[dict]:
+    """
+    Métricas por corte como lista de dicts (para el manifest o un JSON).
+    """
+    metrics = result["metrics"].astype(object).where(result["metrics"].notna(), None)
+    return metrics.to_dict(orient="records")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtesting del modelo de peak_group sobre el histórico.")
+    parser.add_argument("--cutoffs", type=int, nargs="+", default=list(CUTOFFS))
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR)
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--output", type=Path, default=None, help="Por defecto, <model-dir>/backtest")
+    parser.add_argument("--all-players", action="store_true", help="Incluye a los jugadores de entrenamiento (dentro de muestra)")
+    args = parser.parse_args()
+
+    player_ids = None if args.all_players else holdout_players(args.model_dir)
+    if player_ids is None:
+        print("⚠️ Se evalúan todos los jugadores (--all-players o sin reservados en el manifest): métricas dentro de muestra")
+    else:
+        print(f"🧪 Evaluando {len(player_ids)} jugadores reservados al entrenar")
+    result = run_backtest(args.cutoffs, ModelAssets(args.model_dir), n_jobs=args.jobs, player_ids=player_ids)
+    output = args.output or args.model_dir / "backtest"
+    output.mkdir(parents=True, exist_ok=True)
+    result["metrics"].to_csv(output / "metrics.csv", index=False)
+    result["players"].to_csv(output / "players.csv", index=False)
+    result["confusion"].to_csv(output / "confusion.csv")
+    with open(output / "summary.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "model_version": get_model_version(args.model_dir),
+            "held_out": player_ids is not None,
+            "cutoffs": backtest_summary(result),
+        }, f, indent=2, ensure_ascii=False)
+    print(result["metrics"].drop(columns=["recall_by_group", "true_distribution", "predicted_distribution"], errors="ignore").to_string(index=False))
+    print(f"💾 Informe guardado en {output}")
@@ -0,0 +1,233 @@
+# src/cache_policy.py
+#
+# Caché en memoria con presupuesto global de bytes para los resultados por
+# jugador (DataFrames, figuras, prompts). A diferencia de st.cache_data:
+# - la clave es barata (player_id + versión de datos y modelo), no el DataFrame;
+# - cada entrada lleva su tamaño estimado y el total no supera el presupuesto;
+# - expulsa por LRU o LFU y admite max_entries y TTL por espacio de nombres.
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+from data_loader import get_data_version
+from model_utils import get_model_version
+
+DEFAULT_BUDGET_MB = float(os.getenv("FUTPEAK_CACHE_MB", "512"))
+DEFAULT_POLICY = os.getenv("FUTPEAK_CACHE_POLICY", "lru")
+
+
+# -------------------------
+# Tamaño aproximado de un valor
+# -------------------------
+def estimate_size(obj: Any, _seen: set | None = None) -> int:
+    """
+    Bytes aproximados que ocupa `obj` en memoria.
+    """
+    _seen = _seen if _seen is not None else set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (str, bytes)):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(v, _seen) for v in obj)
+    if hasattr(obj, "get_size_inches") and hasattr(obj, "dpi"):
+        # Figura de matplotlib: domina el buffer RGBA que se genera al dibujarla
+        width, height = obj.get_size_inches()
+        return int(width * obj.dpi * height * obj.dpi * 4) + 200_000
+    return sys.getsizeof(obj)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "hits", "created", "last_access", "expires")
+
+    def __init__(self, value: Any, size: int, ttl: float | None):
+        now = time.monotonic()
+        self.value = value
+        self.size = size
+        self.hits = 0
+        self.created = now
+        self.last_access = now
+        self.expires = now + ttl if ttl else None
+
+
+class _Stats:
+    __slots__ = ("hits", "misses", "evictions", "expirations", "rejected")
+
+    def __init__(self):
+        self.hits = self.misses = self.evictions = self.expirations = self.rejected = 0
+
+
+class BoundedCache:
+    """
+    Almacén compartido por todos los espacios de nombres con un límite de bytes.
+
+    Las entradas se guardan en orden de uso (OrderedDict): en LRU la víctima es
+    la primera; en LFU, la de menos aciertos (y la menos reciente si empatan).
+    """
+
+    def __init__(self, max_bytes: int, policy: str = DEFAULT_POLICY):
+        if policy not in ("lru", "lfu"):
+            raise ValueError("policy debe ser 'lru' o 'lfu'")
+        self.max_bytes = int(max_bytes)
+        self.policy = policy
+        self.total_bytes = 0
+        self._entries: OrderedDict[tuple[str, Hashable], _Entry] = OrderedDict()
+        self._counts: dict[str, int] = {}
+        self._bytes: dict[str, int] = {}
+        self._stats: dict[str, _Stats] = {}
+        self._lock = threading.Lock()
+
+    def _stat(self, namespace: str) -> _Stats:
+        return self._stats.setdefault(namespace, _Stats())
+
+    def get(self, namespace: str, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            full_key = (namespace, key)
+            entry = self._entries.get(full_key)
+            if entry is not None and entry.expires is not None and entry.expires <= time.monotonic():
+                self._drop(full_key)
+                self._stat(namespace).expirations += 1
+                entry = None
+            if entry is None:
+                self._stat(namespace).misses += 1
+                return False, None
+            entry.hits += 1
+            entry.last_access = time.monotonic()
+            self._entries.move_to_end(full_key)
+            self._stat(namespace).hits += 1
+            return True, entry.value
+
+    def put(self, namespace: str, key: Hashable, value: Any, ttl: float | None = None, max_entries: int | None = None):
+        size = estimate_size(value)
+        with self._lock:
+            if size > self.max_bytes:
+                self._stat(namespace).rejected += 1
+                return
+            full_key = (namespace, key)
+            if full_key in self._entries:
+                self._drop(full_key)
+            if max_entries is not None:
+                while self._counts.get(namespace, 0) >= max_entries:
+                    self._evict(namespace)
+            while self.total_bytes + size > self.max_bytes and self._entries:
+                self._evict()
+
+            self._entries[full_key] = _Entry(value, size, ttl)
+            self._counts[namespace] = self._counts.get(namespace, 0) + 1
+            self._bytes[namespace] = self._bytes.get(namespace, 0) + size
+            self.total_bytes += size
+
+    def _drop(self, full_key: tuple[str, Hashable]) -> _Entry:
+        entry = self._entries.pop(full_key)
+        namespace = full_key[0]
+        self._counts[namespace] -= 1
+        self._bytes[namespace] -= entry.size
+        self.total_bytes -= entry.size
+        return entry
+
+    def _evict(self, namespace: str | None = None):
+        candidates = (k for k in self._entries if namespace is None or k[0] == namespace)
+        if self.policy == "lru":
+            victim = next(candidates)
+        else:
+            victim = min(candidates, key=lambda k: (self._entries[k].hits, self._entries[k].last_access))
+        self._drop(victim)
+        self._stat(victim[0]).evictions += 1
+
+    def clear(self, namespace: str | None = None):
+        with self._lock:
+            for full_key in [k for k in self._entries if namespace is None or k[0] == namespace]:
+                self._drop(full_key)
+
+    def stats(self) -> pd.DataFrame:
+        """
+        Aciertos, fallos, expulsiones, entradas y bytes por espacio de nombres.
+        """
+        with self._lock:
+            rows = [
+                {
+                    "namespace": ns,
+                    "hits": s.hits,
+                    "misses": s.misses,
+                    "hit_rate": s.hits / (s.hits + s.misses) if s.hits + s.misses else 0.0,
+                    "evictions": s.evictions,
+                    "expirations": s.expirations,
+                    "rejected": s.rejected,
+                    "entries": self._counts.get(ns, 0),
+                    "bytes": self._bytes.get(ns, 0),
+                }
+                for ns, s in sorted(self._stats.items())
+            ]
+        return pd.DataFrame(rows, columns=[
+            "namespace", "hits", "misses", "hit_rate", "evictions", "expirations", "rejected", "entries", "bytes",
+        ])
+
+
+# ✅ Un único presupuesto por proceso, compartido por todas las sesiones
+_cache = BoundedCache(int(DEFAULT_BUDGET_MB * 2**20))
+
+
+def get_cache() -> BoundedCache:
+    return _cache
+
+
+def cache_stats() -> pd.DataFrame:
+    return _cache.stats()
+
+
+def frame_key(df: pd.DataFrame) -> tuple:
+    """
+    Clave barata para un player_df: jugador, filas, última fecha y minutos
+    totales, en lugar de hashear el DataFrame entero.
+    """
+    player_id = df["Player_ID"].iloc[0] if "Player_ID" in df and len(df) else None
+    last_date = df["Date"].max() if "Date" in df and len(df) else None
+    minutes = pd.to_numeric(df["Minutes"], errors="coerce").sum() if "Minutes" in df else None
+    return player_id, len(df), str(last_date), float(minutes) if minutes is not None else None
+
+
+def bounded_cache(
+    namespace: str,
+    key: Callable[..., Hashable] | None = None,
+    max_entries: int | None = None,
+    ttl: float | None = None,
+    copy: bool = False,
+):
+    """
+    Decorador: cachea el resultado en el presupuesto global.
+
+    `key` recibe los argumentos de la función y devuelve la parte hashable de la
+    clave; se le añaden las versiones de datos y modelo. Con `copy=True` cada
+    llamada recibe una copia (para quien muta el DataFrame devuelto).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            base = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            cache_key = (base, get_data_version(), get_model_version())
+            found, value = _cache.get(namespace, cache_key)
+            if not found:
+                value = func(*args, **kwargs)
+                _cache.put(namespace, cache_key, value, ttl=ttl, max_entries=max_entries)
+            return value.copy() if copy and hasattr(value, "copy") else value
+
+        wrapper.clear = lambda: _cache.clear(namespace)
+        return wrapper
+    return decorator
@@ -0,0 +1,84 @@
+# src/comparison.py
+#
+# Comparación de varios jugadores en una sola pasada: se filtran sus
+# matchlogs de una vez, se construye una matriz de features con todos, se
+# predice en una llamada (predict_proba) y se proyectan todas las curvas con
+# merges. El coste es el de un jugador más una fila por jugador extra.
+
+import pandas as pd
+import streamlit as st
+
+from data_loader import load_future_matchlogs, load_future_metadata
+from features import build_feature_matrix, prepare_player_frames, to_model_input
+from form import uses_form
+from leaderboard import MAX_PROJECTION_YEAR, projection_curves
+from model_runner import get_model_assets
+from positions import curves_for_position, position_groups_by_player
+
+MAX_COMPARED = 5
+COMPARISON_COLUMNS = [
+    "Player_ID", "Player_name", "Club", "position_group", "peak_group",
+    "probability", "current_rating", "projected_peak", "seasons",
+]
+
+
+def compare_players(player_ids, matchlogs: pd.DataFrame, metadata: pd.DataFrame) -> dict:
+    """
+    {"players": una fila por jugador (grupo, probabilidad, pico proyectado...),
+    "careers": rating y minutos por temporada, "projections": curva del grupo
+    y proyección ajustada por año}, todo en formato largo por Player_ID.
+    """
+    ids = list(dict.fromkeys(player_ids))
+    metadata = metadata[metadata["Player_ID"].isin(ids)]
+    matchlogs = matchlogs[matchlogs["Player_ID"].isin(ids)]
+    model, le, df_curves, model_features = get_model_assets()
+
+    frames = prepare_player_frames(matchlogs, metadata)
+    X, careers = build_feature_matrix(frames, n_jobs=1, with_form=uses_form(model_features))
+    if X.empty:
+        return {"players": pd.DataFrame(columns=COMPARISON_COLUMNS), "careers": pd.DataFrame(), "projections": pd.DataFrame()}
+
+    proba = model.predict_proba(to_model_input(X, model_features))
+    classes = le.inverse_transform(model.classes_)
+    groups = pd.Series(classes[proba.argmax(axis=1)], index=X.index)
+
+    positions = position_groups_by_player(metadata).astype(str).reindex(X.index).fillna("UNKNOWN")
+    projections = []
+    for position, group_ids in positions.groupby(positions, sort=False).groups.items():
+        curves = curves_for_position(df_curves, position)
+        long = projection_curves(careers[careers["Player_ID"].isin(group_ids)], groups, curves)
+        curve_cols = [c for c in ("rating_avg", "rating_p25", "rating_p75") if c in curves]
+        reference = curves.assign(year_since_debut=pd.to_numeric(curves["year_since_debut"], errors="coerce"))[["peak_group", "year_since_debut", *curve_cols]]
+        long = long.assign(peak_group=long["Player_ID"].map(groups)).merge(reference, on=["peak_group", "year_since_debut"], how="left")
+        projections.append(long)
+    projections = pd.concat(projections, ignore_index=True)
+
+    last = careers.loc[careers.groupby("Player_ID")["year_since_debut"].idxmax()].set_index("Player_ID")
+    info = metadata.drop_duplicates("Player_ID").set_index("Player_ID")
+    players = pd.DataFrame({
+        "Player_name": info["Player_name"],
+        "Club": info.get("Club", pd.Series("", index=info.index)).fillna(""),
+        "position_group": positions,
+        "peak_group": groups,
+        "probability": pd.Series(proba.max(axis=1), index=X.index),
+        "current_rating": last["rating_per_90"],
+        "projected_peak": projections.groupby("Player_ID")["projection"].max(),
+        "seasons": last["year_since_debut"],
+    }).reindex([i for i in ids if i in X.index])
+    players.index.name = "Player_ID"
+
+    careers = careers[careers["year_since_debut"] <= MAX_PROJECTION_YEAR]
+    return {
+        "players": players.reset_index()[COMPARISON_COLUMNS],
+        "careers": careers[["Player_ID", "year_since_debut", "rating_per_90", "Minutes"]].reset_index(drop=True),
+        "projections": projections,
+    }
+
+
+@st.cache_data(max_entries=64)
+def get_comparison(player_ids: tuple[str, ...], data_version: str, model_version: str) -> dict:
+    """
+    Comparación cacheada por conjunto de jugadores; las versiones solo
+    forman parte de la clave.
+    """
+    return compare_players(player_ids, load_future_matchlogs(), load_future_metadata())
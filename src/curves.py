@@ -0,0 +1,268 @@
+# src/curves.py
+#
+# Curvas promedio por peak_group (curvas_promedio.joblib):
+#   python src/curves.py                 # todo en memoria, una pasada agrupada
+#   python src/curves.py --streaming     # por bloques con sketches de cuantiles
+#   python src/curves.py --by-position   # además, curvas por grupo de posición
+#
+# Las curvas se calculan a nivel de partido: media y percentiles 25/75 del
+# rating_per_90 de todos los partidos de cada grupo en cada año desde el debut.
+
+import argparse
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from analytics import compute_rating, label_peak_groups
+from data_loader import DATA_FILES
+from model_utils import MODEL_DIR
+from positions import ALL_POSITIONS, POSITION_GROUPS, position_groups_by_player
+
+QUANTILES = {"rating_p25": 0.25, "rating_p75": 0.75}
+CURVE_COLUMNS = ["peak_group", "year_since_debut", "rating_avg", *QUANTILES, "n_matches"]
+RATING_INPUTS = ['Goals', 'Assists', 'Shots', 'Shots_on_target', 'Yellow_cards', 'Red_cards', 'Minutes']
+
+
+# -------------------------
+# Modo en memoria: una sola pasada ordenada
+# -------------------------
+def build_group_curves(matches: pd.DataFrame, labels: pd.Series | None = None) -> pd.DataFrame:
+    """
+    `matches`: una fila por partido con Player_ID, year_since_debut y rating_per_90
+    (y peak_group, o bien `labels` indexado por Player_ID).
+
+    Ordena una vez por (grupo, año, rating) y obtiene medias y cuantiles de todos
+    los grupos con operaciones sobre los límites de cada bloque, sin groupby.apply.
+    """
+    if labels is not None:
+        matches = matches.merge(labels.rename("peak_group"), left_on="Player_ID", right_index=True)
+    df = matches[(matches["year_since_debut"] >= 1) & matches["rating_per_90"].notna()]
+    if df.empty:
+        return pd.DataFrame(columns=CURVE_COLUMNS)
+
+    group_codes, group_names = pd.factorize(df["peak_group"])
+    years = df["year_since_debut"].to_numpy(dtype=np.int64)
+    values = df["rating_per_90"].to_numpy(dtype=np.float64)
+
+    order = np.lexsort((values, years, group_codes))
+    g, y, v = group_codes[order], years[order], values[order]
+
+    starts = np.r_[0, np.flatnonzero((np.diff(g) != 0) | (np.diff(y) != 0)) + 1]
+    counts = np.diff(np.r_[starts, len(v)])
+
+    curves = pd.DataFrame({
+        "peak_group": np.asarray(group_names)[g[starts]],
+        "year_since_debut": y[starts],
+        "rating_avg": np.add.reduceat(v, starts) / counts,
+    })
+    for col, q in QUANTILES.items():
+        # Interpolación lineal, igual que Series.quantile
+        pos = starts + q * (counts - 1)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.ceil(pos).astype(np.int64)
+        curves[col] = v[lo] + (v[hi] - v[lo]) * (pos - lo)
+    curves["n_matches"] = counts
+    return curves[CURVE_COLUMNS]
+
+
+def build_position_curves(matches: pd.DataFrame, labels: pd.Series, position_groups: pd.Series) -> pd.DataFrame:
+    """
+    Curvas generales (position_group="ALL") más las de cada grupo de posición.
+    `position_groups` es una Series Player_ID → grupo de posición.
+    """
+    positions = matches["Player_ID"].map(position_groups).astype(object).fillna("UNKNOWN")
+    parts = [build_group_curves(matches, labels).assign(position_group=ALL_POSITIONS)]
+    for group in POSITION_GROUPS:
+        part = build_group_curves(matches[positions == group], labels)
+        if len(part):
+            parts.append(part.assign(position_group=group))
+    return pd.concat(parts, ignore_index=True)[["position_group", *CURVE_COLUMNS]]
+
+
+def build_career_table(matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Minutos y rating medio por jugador y año desde el debut (la parte del
+    career_df de `compute_annual_profile` que necesita el etiquetado).
+    """
+    return (
+        matches.groupby(["Player_ID", "year_since_debut"], sort=False)
+        .agg(Minutes=("Minutes", "sum"), rating_per_90=("rating_per_90", "mean"))
+        .reset_index()
+    )
+
+
+def _prepare_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk = chunk.copy()
+    chunk["Date"] = pd.to_datetime(chunk["Date"], errors="coerce")
+    for col in RATING_INPUTS:
+        chunk[col] = pd.to_numeric(chunk[col], errors="coerce").fillna(0) if col in chunk else 0
+    chunk["rating_per_90"] = compute_rating(chunk)
+    chunk["Natural_year"] = chunk["Date"].dt.year
+    return chunk
+
+
+def build_curves_from_matchlogs(matchlogs: pd.DataFrame, player_ids=None, position_groups: pd.Series | None = None) -> pd.DataFrame:
+    df = matchlogs if player_ids is None else matchlogs[matchlogs["Player_ID"].isin(player_ids)]
+    df = _prepare_chunk(df)
+    debut = df["Natural_year"].where(df["Minutes"] > 0).groupby(df["Player_ID"]).transform("min")
+    df["year_since_debut"] = df["Natural_year"] - debut + 1
+    labels = label_peak_groups(build_career_table(df))
+    if position_groups is not None:
+        return build_position_curves(df, labels, position_groups)
+    return build_group_curves(df, labels)
+
+
+# -------------------------
+# Modo streaming: sketches de cuantiles combinables
+# -------------------------
+class QuantileSketch:
+    """
+    Resumen de cuantiles combinable en memoria acotada (estilo t-digest).
+
+    Guarda centroides (media, peso) y los compacta con la función de escala
+    k1 del t-digest, que da más resolución en las colas que en el centro.
+    La media se mantiene exacta; los cuantiles son aproximados.
+    """
+
+    def __init__(self, compression: int = 200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values) -> "QuantileSketch":
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.count += values.size
+        self.total += values.sum()
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.means = np.concatenate([self.means, values])
+        self.weights = np.concatenate([self.weights, np.ones(values.size)])
+        if self.means.size > 4 * self.compression:
+            self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.count == 0:
+            return self
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.means = np.concatenate([self.means, other.means])
+        self.weights = np.concatenate([self.weights, other.weights])
+        self._compress()
+        return self
+
+    def _compress(self):
+        order = np.argsort(self.means, kind="stable")
+        means, weights = self.means[order], self.weights[order]
+        q = (np.cumsum(weights) - weights / 2) / weights.sum()
+        k = self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5)
+        bucket = np.minimum(k.astype(np.int64), self.compression - 1)
+        w = np.bincount(bucket, weights=weights)
+        m = np.bincount(bucket, weights=means * weights)
+        keep = w > 0
+        self.means, self.weights = m[keep] / w[keep], w[keep]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else np.nan
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return np.nan
+        if self.weights.size == self.count:
+            # Aún sin compactar: cuantil exacto
+            return float(np.quantile(self.means, q))
+        self._compress()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        xp = np.r_[0.0, centers, self.count]
+        fp = np.r_[self.min, self.means, self.max]
+        return float(np.interp(q * self.count, xp, fp))
+
+
+def _read_chunks(path: Path, chunksize: int, usecols=None):
+    return pd.read_csv(path, chunksize=chunksize, usecols=usecols, low_memory=False)
+
+
+def build_group_curves_streaming(
+    matchlogs_path: Path = DATA_FILES["matches"],
+    player_ids=None,
+    chunksize: int = 200_000,
+    compression: int = 200,
+) -> pd.DataFrame:
+    """
+    Dos pasadas por bloques sobre el CSV de matchlogs:
+    1. Debut y agregados por jugador/año (tabla pequeña) → etiquetas de grupo.
+    2. Un sketch por (grupo, año) alimentado bloque a bloque.
+
+    Solo se mantiene en memoria un bloque, la tabla por jugador/año y los sketches.
+    """
+    usecols = lambda c: c in {"Player_ID", "Date", *RATING_INPUTS}
+    partial = []
+    for chunk in _read_chunks(matchlogs_path, chunksize, usecols):
+        if player_ids is not None:
+            chunk = chunk[chunk["Player_ID"].isin(player_ids)]
+        chunk = _prepare_chunk(chunk)
+        partial.append(
+            chunk.groupby(["Player_ID", "Natural_year"], sort=False)
+            .agg(Minutes=("Minutes", "sum"), rating_sum=("rating_per_90", "sum"), matches=("rating_per_90", "size"))
+        )
+    if not partial:
+        return pd.DataFrame(columns=CURVE_COLUMNS)
+
+    # Un jugador puede quedar repartido entre bloques: se vuelve a sumar
+    yearly = pd.concat(partial).groupby(level=[0, 1]).sum().reset_index()
+    debut = yearly[yearly["Minutes"] > 0].groupby("Player_ID")["Natural_year"].min()
+    yearly["year_since_debut"] = yearly["Natural_year"] - yearly["Player_ID"].map(debut) + 1
+    yearly["rating_per_90"] = yearly["rating_sum"] / yearly["matches"]
+    labels = label_peak_groups(yearly.dropna(subset=["year_since_debut"]))
+
+    sketches: dict[tuple[str, int], QuantileSketch] = {}
+    for chunk in _read_chunks(matchlogs_path, chunksize, usecols):
+        chunk = _prepare_chunk(chunk[chunk["Player_ID"].isin(labels.index)])
+        chunk["year_since_debut"] = chunk["Natural_year"] - chunk["Player_ID"].map(debut) + 1
+        chunk["peak_group"] = chunk["Player_ID"].map(labels)
+        chunk = chunk[chunk["year_since_debut"] >= 1]
+        for (group, year), values in chunk.groupby(["peak_group", "year_since_debut"])["rating_per_90"]:
+            key = (group, int(year))
+            sketches.setdefault(key, QuantileSketch(compression)).update(values.to_numpy())
+
+    rows = []
+    for (group, year), sketch in sorted(sketches.items()):
+        row = {"peak_group": group, "year_since_debut": year, "rating_avg": sketch.mean}
+        row.update({col: sketch.quantile(q) for col, q in QUANTILES.items()})
+        row["n_matches"] = sketch.count
+        rows.append(row)
+    return pd.DataFrame(rows, columns=CURVE_COLUMNS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenera las curvas promedio por peak_group.")
+    parser.add_argument("--output", type=Path, default=MODEL_DIR / "curvas_promedio.joblib")
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--by-position", action="store_true", help="Añade curvas por grupo de posición (solo en memoria)")
+    args = parser.parse_args()
+    if args.streaming and args.by_position:
+        parser.error("--by-position no está disponible con --streaming")
+
+    players = pd.read_csv(DATA_FILES["players"], low_memory=False)
+    player_ids = set(players["Player_ID"])
+    if args.streaming:
+        curves = build_group_curves_streaming(DATA_FILES["matches"], player_ids, chunksize=args.chunksize)
+    else:
+        position_groups = position_groups_by_player(players) if args.by_position else None
+        curves = build_curves_from_matchlogs(pd.read_csv(DATA_FILES["matches"], low_memory=False), player_ids, position_groups)
+
+    joblib.dump(curves, args.output)
+    print(f"✅ Curvas guardadas en {args.output} | Grupos: {curves['peak_group'].nunique()} | Filas: {len(curves)}")
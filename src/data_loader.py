@@ -1,8 +1,12 @@
 from pathlib import Path
+import hashlib
+import os
 import pandas as pd
 import requests
 import streamlit as st
 
+from positions import add_position_groups
+
 # === Directorios base ===
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR.parent / "data" / "processed"
@@ -16,9 +20,16 @@ CSV_URLS = {
     "future_matches": "1eFjerIs9g5v2XoLkEPigv6SI2QR7nRdf",
 }
 
+# === Rutas locales de cada dataset ===
+DATA_FILES = {
+    "players": DATA_DIR / "cleaned_metadata.csv",
+    "matches": DATA_DIR / "cleaned_matchlogs.csv",
+    "future_players": DATA_DIR / "future_stars_cleaned_metadata.csv",
+    "future_matches": DATA_DIR / "future_stars_cleaned_matchlogs.csv",
+}
+
 # === Función de descarga y carga ===
-@st.cache_data
-def download_csv_from_drive(file_id: str, output_path: Path) -> pd.DataFrame:
+def fetch_csv(file_id: str, output_path: Path) -> Path:
     if not output_path.exists():
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -28,37 +39,101 @@ def download_csv_from_drive(file_id: str, output_path: Path) -> pd.DataFrame:
 
         with open(output_path, "wb") as f:
             f.write(response.content)
+    return output_path
 
-    return pd.read_csv(output_path)
+@st.cache_data(max_entries=len(CSV_URLS))
+def download_csv_from_drive(file_id: str, output_path: Path) -> pd.DataFrame:
+    return pd.read_csv(fetch_csv(file_id, output_path))
 
 # === Funciones de carga cacheadas ===
-@st.cache_data
-def load_cleaned_matchlogs() -> pd.DataFrame:
+@st.cache_data(max_entries=1)
+def _cleaned_matchlogs() -> pd.DataFrame:
     return download_csv_from_drive(
         CSV_URLS["matches"],
-        DATA_DIR / "cleaned_matchlogs.csv"
+        DATA_FILES["matches"]
     )
 
-@st.cache_data
-def load_future_matchlogs() -> pd.DataFrame:
+@st.cache_data(max_entries=1)
+def _future_matchlogs() -> pd.DataFrame:
     return download_csv_from_drive(
         CSV_URLS["future_matches"],
-        DATA_DIR / "future_stars_cleaned_matchlogs.csv"
+        DATA_FILES["future_matches"]
     )
 
-@st.cache_data
-def load_cleaned_metadata() -> pd.DataFrame:
-    return download_csv_from_drive(
+@st.cache_data(max_entries=1)
+def _cleaned_metadata() -> pd.DataFrame:
+    return add_position_groups(download_csv_from_drive(
         CSV_URLS["players"],
-        DATA_DIR / "cleaned_metadata.csv"
-    )
+        DATA_FILES["players"]
+    ))
 
-@st.cache_data
-def load_future_metadata() -> pd.DataFrame:
-    return download_csv_from_drive(
+@st.cache_data(max_entries=1)
+def _future_metadata() -> pd.DataFrame:
+    return add_position_groups(download_csv_from_drive(
         CSV_URLS["future_players"],
-        DATA_DIR / "future_stars_cleaned_metadata.csv"
-    )
+        DATA_FILES["future_players"]
+    ))
+
+# === Modo de tablas compartidas (ver shared_tables.py) ===
+# Las tablas se proyectan desde memoria compartida y no pasan por
+# st.cache_data, que devolvería una copia completa en cada llamada.
+SHARED_TABLES = os.getenv("FUTPEAK_SHARED_TABLES", "").strip() not in ("", "0")
+
+# === Tenants (ver tenants.py) ===
+# Con un tenant activo, los datasets "future" son su partición privada; el
+# histórico sigue siendo común.
+def _tenant() -> str | None:
+    from tenants import DEFAULT_TENANT, current_tenant
+    tenant = current_tenant()
+    return None if tenant == DEFAULT_TENANT else tenant
+
+def _attach(name: str) -> pd.DataFrame:
+    from shared_tables import attach_table
+    return attach_table(name)
+
+def load_cleaned_matchlogs() -> pd.DataFrame:
+    return _attach("matches") if SHARED_TABLES else _cleaned_matchlogs()
+
+def load_future_matchlogs() -> pd.DataFrame:
+    tenant = _tenant()
+    if tenant is not None:
+        from tenants import tenant_matchlogs
+        return tenant_matchlogs(tenant)
+    return _attach("future_matches") if SHARED_TABLES else _future_matchlogs()
+
+def load_cleaned_metadata() -> pd.DataFrame:
+    return _attach("players") if SHARED_TABLES else _cleaned_metadata()
+
+def load_future_metadata() -> pd.DataFrame:
+    tenant = _tenant()
+    if tenant is not None:
+        from tenants import tenant_metadata
+        return tenant_metadata(tenant)
+    return _attach("future_players") if SHARED_TABLES else _future_metadata()
+
+# === Versión de los datos ===
+def get_base_data_version() -> str:
+    """
+    Huella corta de los datasets locales (tamaño y fecha de modificación).
+    Cambia en cuanto se descarga o regenera cualquiera de los CSV.
+    """
+    h = hashlib.sha1()
+    for name, path in sorted(DATA_FILES.items()):
+        try:
+            stat = path.stat()
+            h.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        except OSError:
+            h.update(f"{name}:{CSV_URLS[name]}".encode())
+    return h.hexdigest()[:12]
+
+def get_data_version() -> str:
+    """
+    Versión de los datos que ve el tenant activo: la base si es el tenant por
+    defecto, combinada con la de su partición si no. Las cachés la llevan en
+    la clave, así que nunca se comparten resultados entre tenants.
+    """
+    from tenants import current_tenant, tenant_data_version
+    return tenant_data_version(current_tenant())
 
 # === Funciones auxiliares ===
 def get_matchlogs_by_player(player_id, future: bool = True) -> pd.DataFrame:
@@ -77,16 +152,55 @@ def get_name_id_mapping(metadata_df: pd.DataFrame) -> dict[str, str]:
             metadata_df["Player_ID"].astype(str)
         )
     )
-@st.cache_resource
-def get_player_image_path(player_name: str, metadata_df: pd.DataFrame) -> Path | None:
+# `_metadata_df` no entra en la clave: basta con el nombre y la versión de datos (tenant)
+@st.cache_resource(max_entries=512)
+def get_player_image_path(player_name: str, _metadata_df: pd.DataFrame, data_version: str = "") -> Path | None:
     try:
-        mapping = get_name_id_mapping(metadata_df)
+        mapping = get_name_id_mapping(_metadata_df)
         player_id = mapping.get(player_name)
         if not player_id:
             return None
 
-        img_file = IMG_DIR / f"{player_id}.png"
+        tenant = _tenant()
+        if tenant is not None:
+            from tenants import tenant_dir
+            img_file = tenant_dir(tenant) / "players_faces" / f"{player_id}.png"
+        else:
+            img_file = IMG_DIR / f"{player_id}.png"
         return img_file if img_file.exists() else None
     except Exception as e:
         print(f"⚠️ Error al obtener imagen de {player_name}: {e}")
         return None
+
+# === Consultas sobre la base SQLite (ver sql_backend.py) ===
+def _dataset(future: bool | None) -> str | None:
+    return None if future is None else ("future" if future else "historical")
+
+def query_matchlogs(future: bool | None = False, columns: list[str] | None = None, **filters) -> pd.DataFrame:
+    """
+    Partidos que cumplen los filtros, sin cargar el CSV, p. ej.
+    `query_matchlogs(Player_ID__in=ids, Date__gte="2023-01-01")`.
+    `future=None` consulta los dos datasets.
+    """
+    from sql_backend import select
+    return select("matchlogs", columns=columns, dataset=_dataset(future), **filters)
+
+def query_seasons(future: bool | None = False, columns: list[str] | None = None, **filters) -> pd.DataFrame:
+    """
+    Temporadas (jugador × año desde el debut) que cumplen los filtros, p. ej.
+    sub-21 de ataque con más de 1500 minutos en su segundo año:
+    `query_seasons(position_group="ATTACKING", year_since_debut=2, Minutes__gt=1500, Age__lt=21)`.
+    """
+    from sql_backend import select
+    return select("seasons", columns=columns, dataset=_dataset(future), **filters)
+
+def query_players(future: bool | None = False, columns: list[str] | None = None, **filters) -> pd.DataFrame:
+    from sql_backend import select
+    return select("players", columns=columns, dataset=_dataset(future), **filters)
+
+def query_aggregate(table: str, group_by: list[str], metrics: dict[str, str], future: bool | None = False, **filters) -> pd.DataFrame:
+    """
+    Agregados calculados en SQLite, p. ej. minutos totales por jugador desde una fecha.
+    """
+    from sql_backend import aggregate
+    return aggregate(table, group_by, metrics, dataset=_dataset(future), **filters)
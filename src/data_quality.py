@@ -0,0 +1,300 @@
+# src/data_quality.py
+#
+# Control de calidad de matchlogs: una pasada vectorizada sobre la tabla
+# completa que detecta y limpia
+#   - fechas ilegibles y filas sin minutos,
+#   - valores no numéricos en columnas de estadísticas,
+#   - valores imposibles (minutos fuera de 0-120, negativos, tiros a puerta
+#     por encima de tiros...),
+#   - partidos duplicados por jugador (hash de Player_ID + fecha + rival),
+# y señala fechas futuras y huecos largos entre partidos de un mismo jugador
+# (no se borran: los huecos suelen ser temporadas que faltan en el scraping o
+# lesiones largas).
+#
+#   python data_quality.py --input ../data/processed/cleaned_matchlogs.csv --report informe_calidad/
+#   python data_quality.py --input bruto.csv --output limpio.csv --reference-date 2025-06-30
+#   python data_quality.py --input matchlogs.csv --output matchlogs.csv --overwrite
+#
+# "Fecha futura" se mide contra --reference-date (por defecto, hoy) y la fecha
+# usada queda en el informe: con la misma fecha, el informe es reproducible.
+# Nunca se sobrescribe la entrada salvo con --overwrite.
+#
+# La ingesta de matchlogs lo ejecuta al terminar (ver ingestion/__main__.py).
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ["Player_ID", "Date", "Rival_team"]
+NUMERIC_COLUMNS = [
+    "Minutes", "Goals", "Assists", "Penalty_kick", "Penalty_kick_att", "Shots", "Shots_on_target",
+    "Yellow_cards", "Red_cards", "Fouls_committed", "Fouls_drawn", "Offsides", "Crosses",
+    "Tackles_won", "Interceptions", "Own_goals", "Penaltys_won", "Penaltys_conceded", "Touches",
+    "Tackles", "Blocks", "xG", "non_penalty_xG", "x_assisted_G", "Shot_creating_actions",
+    "Goal_creating_actions", "Passes_completed", "Passes_att", "Percent_passes",
+    "Progressive_passes", "Feet_control", "Progressive_control", "Dribling_suc",
+]
+# Parte ≤ total: si no se cumple, la parte se descarta (queda vacía)
+PART_OF = {
+    "Shots_on_target": "Shots",
+    "Penalty_kick": "Penalty_kick_att",
+    "Passes_completed": "Passes_att",
+}
+MAX_MINUTES = 120
+GAP_DAYS = 365
+ISSUE_COLUMNS = ["Player_ID", "Date", "issue", "column", "value"]
+
+
+def _normalized_codes(values: pd.Series, normalize) -> np.ndarray:
+    """
+    Códigos enteros de `values` tras normalizar cada valor distinto (las
+    cadenas se repiten mucho: se normalizan los únicos, no las filas).
+    """
+    codes, uniques = pd.factorize(values)
+    normalized, _ = pd.factorize(normalize(pd.Series(uniques, dtype=object)))
+    return np.where(codes >= 0, normalized[codes], -1)
+
+
+def match_keys(df: pd.DataFrame, dates: pd.Series | None = None) -> pd.Series:
+    """
+    Hash uint64 por fila de (Player_ID, fecha normalizada, rival sin
+    mayúsculas ni espacios): dos filas con la misma clave son el mismo partido.
+    """
+    dates = pd.to_datetime(df["Date"], errors="coerce") if dates is None else dates
+    keys = pd.DataFrame({
+        "Player_ID": _normalized_codes(df["Player_ID"], lambda u: u.astype(str).str.strip()),
+        "Date": dates.dt.normalize().to_numpy(dtype="datetime64[ns]").view("int64"),
+    }, index=df.index)
+    if "Rival_team" in df:
+        keys["Rival_team"] = _normalized_codes(df["Rival_team"], lambda u: u.astype(str).str.strip().str.lower())
+    return pd.util.hash_pandas_object(keys, index=False)
+
+
+def _issues(df: pd.DataFrame, mask: pd.Series, issue: str, column: str | None = None) -> pd.DataFrame:
+    rows = df.loc[mask, ["Player_ID", "Date"]]
+    value = df.loc[mask, column].astype(str) if column else None
+    return rows.assign(issue=issue, column=column, value=value)
+
+
+def _to_numeric(values: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """
+    (valores numéricos, máscara de celdas con texto que no es un número).
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values, pd.Series(False, index=values.index)
+    # Conversión sobre los valores distintos y reparto por códigos
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip().str.replace(",", "", regex=False)
+    parsed = pd.to_numeric(text, errors="coerce").to_numpy(dtype="float64")
+    invalid = np.isnan(parsed) & text.ne("").to_numpy()
+    numbers = np.where(codes >= 0, parsed[codes], np.nan)
+    return pd.Series(numbers, index=values.index), pd.Series((codes >= 0) & invalid[codes], index=values.index)
+
+
+def date_gaps(df: pd.DataFrame, gap_days: int = GAP_DAYS, dates: pd.Series | None = None) -> pd.DataFrame:
+    """
+    Huecos de más de `gap_days` días entre partidos consecutivos de un jugador.
+    """
+    dates = pd.to_datetime(df["Date"], errors="coerce") if dates is None else dates
+    order = pd.DataFrame({"Player_ID": df["Player_ID"].to_numpy(), "to": dates.to_numpy()}).sort_values(["Player_ID", "to"], kind="stable")
+    same_player = order["Player_ID"].eq(order["Player_ID"].shift())
+    order["from"] = order["to"].shift()
+    order["days"] = (order["to"] - order["from"]).dt.days
+    gaps = order[same_player & (order["days"] > gap_days)]
+    return gaps[["Player_ID", "from", "to", "days"]].reset_index(drop=True)
+
+
+# -------------------------
+# Limpieza
+# -------------------------
+def check_matchlogs(
+    df: pd.DataFrame,
+    max_minutes: int = MAX_MINUTES,
+    gap_days: int = GAP_DAYS,
+    reference_date: str | pd.Timestamp | None = None,
+) -> tuple[pd.DataFrame, dict]:
+    """
+    (matchlogs limpios, informe). El informe tiene "summary" (recuentos),
+    "issues" (una fila por celda o fila problemática) y "gaps" (huecos de
+    fechas). Las filas que quedan conservan el orden y las columnas originales.
+    Las fechas posteriores a `reference_date` (por defecto, hoy) son futuras.
+    """
+    start = time.perf_counter()
+    reference = pd.Timestamp(reference_date) if reference_date is not None else pd.Timestamp.today().normalize()
+    out = df.copy()
+    issues = []
+    drop = pd.Series(False, index=out.index)
+    dropped = {}
+
+    dates = pd.to_datetime(out["Date"], errors="coerce")
+    bad_date = dates.isna()
+    # Fechas futuras: solo se señalan (los datasets de ejemplo las tienen)
+    future_date = dates > reference
+    issues.append(_issues(out, bad_date, "bad_date", "Date"))
+    issues.append(_issues(out, future_date, "future_date", "Date"))
+
+    non_numeric = {}
+    for col in [c for c in NUMERIC_COLUMNS if c in out]:
+        numbers, invalid = _to_numeric(out[col])
+        if invalid.any():
+            issues.append(_issues(out, invalid, "non_numeric", col))
+            non_numeric[col] = int(invalid.sum())
+        out[col] = numbers
+
+    empty_minutes = out["Minutes"].isna() & ~bad_date
+    minutes_range = (out["Minutes"] > max_minutes) | (out["Minutes"] < 0)
+    issues.append(_issues(out, empty_minutes, "empty_minutes", "Minutes"))
+    issues.append(_issues(out, minutes_range, "impossible_minutes", "Minutes"))
+    for name, mask in (("bad_date", bad_date), ("empty_minutes", empty_minutes), ("impossible_minutes", minutes_range)):
+        dropped[name] = int((mask & ~drop).sum())
+        drop |= mask
+
+    # Valores imposibles en el resto: se vacía la celda, la fila se conserva
+    impossible = {}
+    for col in [c for c in NUMERIC_COLUMNS if c in out and c != "Minutes" and c != "Percent_passes"]:
+        negative = out[col] < 0
+        if negative.any():
+            issues.append(_issues(out, negative, "negative", col))
+            impossible[f"negative_{col}"] = int(negative.sum())
+            out.loc[negative, col] = np.nan
+    if "Percent_passes" in out:
+        bad_pct = (out["Percent_passes"] < 0) | (out["Percent_passes"] > 100)
+        if bad_pct.any():
+            issues.append(_issues(out, bad_pct, "impossible_percent", "Percent_passes"))
+            impossible["impossible_percent"] = int(bad_pct.sum())
+            out.loc[bad_pct, "Percent_passes"] = np.nan
+    for part, total in PART_OF.items():
+        if part in out and total in out:
+            over = out[part] > out[total]
+            if over.any():
+                issues.append(_issues(out, over, f"{part}_gt_{total}", part))
+                impossible[f"{part}_gt_{total}"] = int(over.sum())
+                out.loc[over, part] = np.nan
+
+    # Duplicados entre las filas válidas: se queda la primera aparición
+    keys = match_keys(out, dates)
+    duplicate = keys.where(~drop).duplicated(keep="first") & ~drop
+    issues.append(_issues(out, duplicate, "duplicate"))
+    dropped["duplicate"] = int(duplicate.sum())
+    drop |= duplicate
+
+    cleaned = out[~drop].reset_index(drop=True)
+    # Columnas enteras vuelven a int64 si no les quedan huecos
+    for col in [c for c in NUMERIC_COLUMNS if c in cleaned]:
+        values = cleaned[col]
+        if pd.api.types.is_float_dtype(values) and values.notna().all() and (values % 1 == 0).all():
+            cleaned[col] = values.astype("int64")
+
+    gaps = date_gaps(cleaned, gap_days, dates[~drop].reset_index(drop=True))
+    issues = pd.concat([i for i in issues if len(i)], ignore_index=True) if any(len(i) for i in issues) else pd.DataFrame(columns=ISSUE_COLUMNS)
+    summary = {
+        "rows_in": int(len(df)),
+        "rows_out": int(len(cleaned)),
+        "players": int(cleaned["Player_ID"].nunique()),
+        "dropped": dropped,
+        "future_dates": int(future_date.sum()),
+        "reference_date": reference.date().isoformat(),
+        "non_numeric": non_numeric,
+        "impossible_values": impossible,
+        "date_gaps": int(len(gaps)),
+        "players_with_gaps": int(gaps["Player_ID"].nunique()),
+        "max_minutes": max_minutes,
+        "gap_days": gap_days,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    return cleaned, {"summary": summary, "issues": issues[ISSUE_COLUMNS], "gaps": gaps}
+
+
+def clean_matchlogs(df: pd.DataFrame) -> pd.DataFrame:
+    return check_matchlogs(df)[0]
+
+
+# -------------------------
+# Etapa de ingesta
+# -------------------------
+def save_report(report: dict, output_dir: Path) -> Path:
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report["issues"].to_csv(output_dir / "issues.csv", index=False)
+    report["gaps"].to_csv(output_dir / "gaps.csv", index=False)
+    with open(output_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(report["summary"], f, indent=2, ensure_ascii=False)
+    return output_dir
+
+
+def print_summary(summary: dict) -> None:
+    dropped = ", ".join(f"{k} {v}" for k, v in summary["dropped"].items() if v) or "ninguna"
+    print(f"🧹 Calidad: {summary['rows_in']} → {summary['rows_out']} filas ({summary['seconds']:.2f}s) | descartadas: {dropped}")
+    if summary["non_numeric"]:
+        print(f"   ⚠️ No numéricos: {summary['non_numeric']}")
+    if summary["impossible_values"]:
+        print(f"   ⚠️ Valores imposibles: {summary['impossible_values']}")
+    if summary["future_dates"]:
+        print(f"   📅 {summary['future_dates']} partidos con fecha posterior a {summary['reference_date']}")
+    if summary["date_gaps"]:
+        print(f"   📅 {summary['date_gaps']} huecos de más de {summary['gap_days']} días en {summary['players_with_gaps']} jugadores")
+
+
+def default_output(input_csv: Path) -> Path:
+    return Path(input_csv).with_name(f"{Path(input_csv).stem}_clean.csv")
+
+
+def run_quality_stage(
+    input_csv: Path,
+    output_csv: Path | None = None,
+    report_dir: Path | None = None,
+    max_minutes: int = MAX_MINUTES,
+    gap_days: int = GAP_DAYS,
+    reference_date: str | pd.Timestamp | None = None,
+    overwrite: bool = False,
+) -> dict:
+    """
+    Lee un CSV de matchlogs, escribe la versión limpia de forma atómica y el
+    informe en `report_dir` (por defecto <output>_quality/). Sin `output_csv`
+    la salida es <input>_clean.csv, o la propia entrada con `overwrite`;
+    escribir encima de la entrada sin `overwrite` es un error. Devuelve el resumen.
+    """
+    input_csv = Path(input_csv)
+    output_csv = Path(output_csv) if output_csv else (input_csv if overwrite else default_output(input_csv))
+    if output_csv.resolve() == input_csv.resolve() and not overwrite:
+        raise ValueError(f"{output_csv} es la entrada: usa otra salida u overwrite=True para reemplazarla")
+    cleaned, report = check_matchlogs(
+        pd.read_csv(input_csv, dtype={"Player_ID": str}, low_memory=False), max_minutes, gap_days, reference_date
+    )
+
+    tmp_path = output_csv.with_suffix(f".tmp{os.getpid()}")
+    cleaned.to_csv(tmp_path, index=False, encoding="utf-8")
+    os.replace(tmp_path, output_csv)
+    save_report(report, report_dir or output_csv.with_name(f"{output_csv.stem}_quality"))
+    print_summary(report["summary"])
+    return report["summary"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Control de calidad y deduplicación de matchlogs.")
+    parser.add_argument("--input", type=Path, required=True)
+    parser.add_argument("--output", type=Path, default=None, help="CSV limpio; sin él solo se genera el informe")
+    parser.add_argument("--report", type=Path, default=None, help="Directorio del informe")
+    parser.add_argument("--max-minutes", type=int, default=MAX_MINUTES)
+    parser.add_argument("--gap-days", type=int, default=GAP_DAYS)
+    parser.add_argument("--reference-date", default=None, help="Fecha (AAAA-MM-DD) a partir de la cual un partido es futuro; por defecto, hoy")
+    parser.add_argument("--overwrite", action="store_true", help="Permite que --output sea el mismo fichero que --input")
+    args = parser.parse_args()
+
+    if args.output:
+        try:
+            run_quality_stage(args.input, args.output, args.report, args.max_minutes, args.gap_days, args.reference_date, args.overwrite)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        _, report = check_matchlogs(
+            pd.read_csv(args.input, dtype={"Player_ID": str}, low_memory=False), args.max_minutes, args.gap_days, args.reference_date
+        )
+        print_summary(report["summary"])
+        if args.report:
+            print(f"💾 Informe guardado en {save_report(report, args.report)}")
@@ -1,25 +1,40 @@
-from model_runner import predict_and_project_player
-from data_loader import load_future_metadata
-from player_processing import build_player_df
+from player_context import PlayerContext
+from singleflight import current_versions, single_flight, single_flight_stream
+from cache_policy import bounded_cache, get_cache
+from gemini_utils import LLMError, get_llm_client
 from datetime import datetime
+from typing import Iterator
 import pandas as pd
-import requests
-import streamlit as st
 from pytz import timezone
 
-@st.cache_data
-def generar_prompt_conclusion(player_id: str) -> str:
+
+def _preguntar_ia(prompt: str) -> str:
+    """
+    Llamada al cliente de IA compartido; los errores se devuelven como texto.
+    """
+    try:
+        return get_llm_client().generate(prompt)
+    except LLMError as e:
+        if e.retryable:
+            return f"❌ Error al contactar con la IA: {e}"
+        return f"❌ Error del servidor IA: {e}"
+    except Exception as e:
+        return f"❌ Error al contactar con la IA: {e}"
+
+# El prompt lleva la fecha del día: caduca a la hora
+@bounded_cache("generar_prompt_conclusion", key=lambda player_id, _ctx=None: player_id, max_entries=256, ttl=3600)
+def generar_prompt_conclusion(player_id: str, _ctx: PlayerContext | None = None) -> str:
+    ctx = _ctx or PlayerContext(player_id)
     zona_local = timezone("Europe/Madrid")  # O la que corresponda
     fecha_actual = datetime.now(zona_local)
     fecha_str = fecha_actual.strftime("%d de %B de %Y").lstrip("0").capitalize()
 
     # Modelo y metadatos
-    group_label, seasonal_df, group_curve = predict_and_project_player(player_id)
-    metadata = load_future_metadata()
-    player_name = metadata[metadata["Player_ID"] == player_id]["Player_name"].values[0]
+    group_label, seasonal_df, group_curve = ctx.prediction
+    player_name = ctx.name
 
     # Matchlogs
-    matchlogs = build_player_df(player_id)
+    matchlogs = ctx.player_df
     matchlogs = matchlogs[matchlogs["Minutes"] > 0].sort_values("Date")
     debut_year = pd.to_datetime(matchlogs.iloc[0]["Date"]).year
 
@@ -90,29 +105,48 @@ def generar_prompt_conclusion(player_id: str) -> str:
     """
     return prompt
 
-def generar_conclusion_completa(player_id: str) -> str:
+# Conclusión terminada por jugador y versión; como el prompt, caduca a la hora
+CONCLUSION_CACHE = "generar_conclusion"
+CONCLUSION_TTL = 3600
+
+@single_flight_stream(CONCLUSION_CACHE, key=lambda player_id, _ctx=None: player_id)
+def _conclusion_chunks(player_id: str, _ctx: PlayerContext | None = None) -> Iterator[str]:
+    prompt = generar_prompt_conclusion(player_id, _ctx=_ctx)
+    yield from get_llm_client().stream(prompt)
+
+def generar_conclusion_stream(player_id: str, _ctx: PlayerContext | None = None) -> Iterator[str]:
+    """
+    Conclusión por trozos según llega. Si ya está en caché sale entera; si
+    otra sesión la está generando, se espera a su texto en vez de repetir la
+    llamada. Un error a mitad de respuesta se añade al final y no se cachea.
+    """
+    key = (player_id, *current_versions())
+    found, text = get_cache().get(CONCLUSION_CACHE, key)
+    if found:
+        yield text
+        return
+    chunks = []
     try:
-        prompt = generar_prompt_conclusion(player_id)
-
-        response = requests.post(
-            "https://JuanmaCM7-gemini-endpoint.hf.space/generate",
-            json={"prompt": prompt},
-            timeout=30
-        )
-        result = response.json()
-        if "result" in result:
-            conclusion = result["result"].replace("**", "")
-            return conclusion
-        else:
-            return f"❌ Error del servidor IA: {result.get('error', 'Respuesta inesperada')}"
+        for chunk in _conclusion_chunks(player_id, _ctx=_ctx):
+            chunks.append(chunk)
+            yield chunk
+    except LLMError as e:
+        yield f"❌ Error {'al contactar con la IA' if e.retryable else 'del servidor IA'}: {e}"
+        return
     except Exception as e:
-        return f"❌ Error al contactar con la IA: {e}"
+        yield f"❌ Error al contactar con la IA: {e}"
+        return
+    get_cache().put(CONCLUSION_CACHE, key, "".join(chunks), ttl=CONCLUSION_TTL, max_entries=256)
 
-def generar_explicacion_grafica_ga(player_id: str) -> str:
+def generar_conclusion_completa(player_id: str, _ctx: PlayerContext | None = None) -> str:
+    # Misma caché y mismo vuelo que la versión en streaming de la app
+    return "".join(generar_conclusion_stream(player_id, _ctx=_ctx)).replace("**", "")
+
+@single_flight("generar_explicacion_grafica_ga", key=lambda player_id, _ctx=None: player_id)
+def generar_explicacion_grafica_ga(player_id: str, _ctx: PlayerContext | None = None) -> str:
     from stats import get_player_stats
-    import requests
 
-    df = get_player_stats(player_id)
+    df = get_player_stats(player_id, _ctx=_ctx)
     if df.empty:
         return "No hay datos suficientes para generar una explicación."
 
@@ -133,25 +167,13 @@ Explica en pocas frases, de forma simple y pedagógica:
 No utilices lenguaje técnico. Sé claro y directo.
 """
 
-    try:
-        response = requests.post(
-            "https://JuanmaCM7-gemini-endpoint.hf.space/generate",
-            json={"prompt": prompt},
-            timeout=30
-        )
-        result = response.json()
-        if "result" in result:
-            return result["result"].replace("**", "").strip()
-        else:
-            return f"❌ Error del servidor IA: {result.get('error', 'Respuesta inesperada')}"
-    except Exception as e:
-        return f"❌ Error al contactar con la IA: {e}"
+    return _preguntar_ia(prompt).replace("**", "").strip()
 
-def generar_explicacion_minutos_por_ano(player_id: str) -> str:
+@single_flight("generar_explicacion_minutos_por_ano", key=lambda player_id, _ctx=None: player_id)
+def generar_explicacion_minutos_por_ano(player_id: str, _ctx: PlayerContext | None = None) -> str:
     from stats import get_player_stats
-    import requests
 
-    df = get_player_stats(player_id)
+    df = get_player_stats(player_id, _ctx=_ctx)
     if df.empty:
         return "No hay datos suficientes para generar una explicación."
 
@@ -172,26 +194,12 @@ Explica brevemente y de forma sencilla:
 Hazlo con un lenguaje claro, como si hablaras con alguien sin experiencia en análisis deportivo.
 """
 
-    try:
-        response = requests.post(
-            "https://JuanmaCM7-gemini-endpoint.hf.space/generate",
-            json={"prompt": prompt},
-            timeout=30
-        )
-        result = response.json()
-        if "result" in result:
-            return result["result"].replace("**", "").strip()
-        else:
-            return f"❌ Error del servidor IA: {result.get('error', 'Respuesta inesperada')}"
-    except Exception as e:
-        return f"❌ Error al contactar con la IA: {e}"
-
-def generar_explicacion_curva_evolucion(player_id: str) -> str:
-    from model_runner import predict_and_project_player
-    import requests
+    return _preguntar_ia(prompt).replace("**", "").strip()
 
+@single_flight("generar_explicacion_curva_evolucion", key=lambda player_id, _ctx=None: player_id)
+def generar_explicacion_curva_evolucion(player_id: str, _ctx: PlayerContext | None = None) -> str:
     try:
-        label, seasonal_df, group_curve = predict_and_project_player(player_id)
+        label, seasonal_df, group_curve = (_ctx or PlayerContext(player_id)).prediction
         resumen = seasonal_df[['year_since_debut', 'rating_per_90']].to_string(index=False)
         resumen_grupo = group_curve[['year_since_debut', 'rating_avg']].to_string(index=False)
     except Exception:
@@ -215,17 +223,5 @@ Explica en lenguaje simple:
 No uses jerga técnica, habla como si lo explicaras a alguien ajeno al fútbol profesional.
 """
 
-    try:
-        response = requests.post(
-            "https://JuanmaCM7-gemini-endpoint.hf.space/generate",
-            json={"prompt": prompt},
-            timeout=30
-        )
-        result = response.json()
-        if "result" in result:
-            return result["result"].replace("**", "").strip()
-        else:
-            return f"❌ Error del servidor IA: {result.get('error', 'Respuesta inesperada')}"
-    except Exception as e:
-        return f"❌ Error al contactar con la IA: {e}"
+    return _preguntar_ia(prompt).replace("**", "").strip()
 
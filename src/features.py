@@ -0,0 +1,131 @@
+# src/features.py
+
+import re
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from form import add_form_features
+from player_processing import compute_annual_profile
+
+NUMERIC_COLS = ['Goals', 'Assists', 'Shots', 'Shots_on_target', 'Yellow_cards', 'Red_cards', 'Minutes']
+_YEAR_FEATURE = re.compile(r"^(rating|age|minutes)_year_(-?\d+)$")
+
+
+# -------------------------
+# Matchlogs de todos los jugadores listos para el perfil anual
+# -------------------------
+def prepare_player_frames(matchlogs: pd.DataFrame, metadata: pd.DataFrame) -> pd.DataFrame:
+    """
+    Equivalente en lote de `build_player_df`: tipa columnas, añade Birth_date
+    y la edad en cada partido para todos los jugadores de una vez.
+    """
+    df = matchlogs[matchlogs["Player_ID"].isin(metadata["Player_ID"])].copy()
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    for col in NUMERIC_COLS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0) if col in df else 0
+
+    births = metadata[["Player_ID", "Birth_date"]].drop_duplicates("Player_ID").copy()
+    births["Birth_date"] = pd.to_datetime(births["Birth_date"], errors="coerce")
+    df = df.drop(columns=["Birth_date"], errors="ignore").merge(births, on="Player_ID", how="left")
+    df["Age"] = (df["Date"] - df["Birth_date"]).dt.days / 365.25
+    return df
+
+
+def add_year_since_debut(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Año desde el debut (primer año natural con minutos) para cada partido,
+    con la misma definición que `compute_annual_profile`.
+    """
+    df["Natural_year"] = df["Date"].dt.year
+    debut = df["Natural_year"].where(df["Minutes"] > 0).groupby(df["Player_ID"]).transform("min")
+    df["year_since_debut"] = df["Natural_year"] - debut + 1
+    return df
+
+
+def truncate_careers(df: pd.DataFrame, max_year: int) -> pd.DataFrame:
+    """
+    Recorta todas las carreras a los partidos hasta `max_year` años desde el debut.
+    """
+    if "year_since_debut" not in df:
+        df = add_year_since_debut(df)
+    return df[df["year_since_debut"] <= max_year]
+
+
+# -------------------------
+# Perfil anual en lote
+# -------------------------
+def _profile_chunk(frames: list[Tuple[str, pd.DataFrame]]):
+    rows, careers = [], []
+    for player_id, player_df in frames:
+        try:
+            model_row, career_df = compute_annual_profile(player_df)
+        except Exception as e:
+            print(f"⚠️ Perfil no disponible para {player_id}: {e}")
+            continue
+        model_row.index = [player_id]
+        career_df.insert(0, "Player_ID", player_id)
+        rows.append(model_row)
+        careers.append(career_df)
+    return rows, careers
+
+
+def order_features(columns) -> list[str]:
+    """
+    Columnas por bloques (rating, edad, minutos) ordenadas por año y después
+    las derivadas, para que el vector de entrada sea estable entre entrenamientos.
+    """
+    yearly, derived = [], []
+    for col in columns:
+        match = _YEAR_FEATURE.match(col)
+        if match:
+            yearly.append((("rating", "age", "minutes").index(match.group(1)), int(match.group(2)), col))
+        else:
+            derived.append(col)
+    return [col for _, _, col in sorted(yearly)] + sorted(derived)
+
+
+def build_feature_matrix(
+    frames: pd.DataFrame,
+    max_year: int | None = None,
+    n_jobs: int = -1,
+    chunk_size: int = 200,
+    with_form: bool = False,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Aplica `compute_annual_profile` a cada jugador en paralelo.
+
+    Devuelve (X, careers): una fila de features por Player_ID y el perfil
+    por temporada de todos los jugadores en formato largo. Con `with_form`
+    se añaden las métricas de forma al final de los partidos considerados.
+    """
+    if max_year is not None:
+        frames = truncate_careers(frames, max_year)
+    frames = frames.drop(columns=["Natural_year", "year_since_debut"], errors="ignore")
+
+    groups = [(pid, g.copy()) for pid, g in frames.groupby("Player_ID", sort=False)]
+    chunks = [groups[i:i + chunk_size] for i in range(0, len(groups), chunk_size)]
+    results = Parallel(n_jobs=n_jobs)(delayed(_profile_chunk)(chunk) for chunk in chunks)
+
+    rows = [row for chunk_rows, _ in results for row in chunk_rows]
+    careers = [career for _, chunk_careers in results for career in chunk_careers]
+    if not rows:
+        return pd.DataFrame(), pd.DataFrame()
+
+    # Igual que en la app: las columnas que un jugador no tiene valen 0, no NaN
+    columns = order_features(set().union(*(row.columns for row in rows)))
+    X = pd.concat([row.reindex(columns=columns, fill_value=0) for row in rows], axis=0)
+    X.index.name = "Player_ID"
+    if with_form:
+        X = add_form_features(X, frames)
+    career_df = pd.concat(careers, ignore_index=True)
+    return X, career_df
+
+
+def to_model_input(X: pd.DataFrame, model_features: list[str]) -> pd.DataFrame:
+    """
+    Alinea la matriz de features con las columnas del modelo (faltantes = 0).
+    """
+    return X.reindex(columns=model_features, fill_value=0).astype(np.float64)
@@ -0,0 +1,169 @@
+# src/form.py
+#
+# Forma reciente: métricas en ventanas móviles de los últimos N partidos o de
+# los últimos M minutos. Se calculan para todos los jugadores a la vez con
+# sumas acumuladas agrupadas (O(n)) y se actualizan de forma incremental
+# guardando solo la cola de partidos que aún puede entrar en una ventana.
+
+import numpy as np
+import pandas as pd
+
+from analytics import compute_rating
+
+MATCH_WINDOWS = (5, 10, 20)
+MINUTE_WINDOWS = (900,)
+FORM_PREFIX = "form_"
+_INPUTS = ['Goals', 'Assists', 'Shots', 'Shots_on_target', 'Yellow_cards', 'Red_cards', 'Minutes']
+
+
+def form_columns() -> list[str]:
+    suffixes = [str(w) for w in MATCH_WINDOWS] + [f"{m}m" for m in MINUTE_WINDOWS]
+    return [f"{FORM_PREFIX}{metric}_{s}" for s in suffixes for metric in ("rating", "ga90", "min_share")]
+
+
+def uses_form(model_features) -> bool:
+    return any(str(col).startswith(FORM_PREFIX) for col in model_features)
+
+
+def _match_table(matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Una fila por partido ordenada por (Player_ID, Date) con rating, minutos y G+A.
+    """
+    df = pd.DataFrame({
+        "Player_ID": matches["Player_ID"].values,
+        "Date": pd.to_datetime(matches["Date"], errors="coerce").values,
+    })
+    for col in _INPUTS:
+        df[col] = pd.to_numeric(matches[col], errors="coerce").fillna(0).values if col in matches else 0
+    df = df.dropna(subset=["Date"]).sort_values(["Player_ID", "Date"], kind="stable").reset_index(drop=True)
+    return pd.DataFrame({
+        "Player_ID": df["Player_ID"],
+        "Date": df["Date"],
+        "rating_per_90": compute_rating(df).to_numpy(float),
+        "Minutes": df["Minutes"].to_numpy(float),
+        "G+A": (df["Goals"] + df["Assists"]).to_numpy(float),
+    })
+
+
+def _window_metrics(sums: dict[str, np.ndarray], start: np.ndarray, end: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Métricas de la ventana [start, end) a partir de sumas acumuladas con un 0 delante.
+    """
+    n = end - start
+    rating = sums["rating_per_90"][end] - sums["rating_per_90"][start]
+    minutes = sums["Minutes"][end] - sums["Minutes"][start]
+    ga = sums["G+A"][end] - sums["G+A"][start]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (
+            np.where(n > 0, rating / np.maximum(n, 1), np.nan),
+            np.where(minutes > 0, ga / (minutes / 90), 0.0),
+            np.where(n > 0, minutes / (90 * np.maximum(n, 1)), np.nan),
+        )
+
+
+def _form_table(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ventanas sobre una tabla de `_match_table`: cada suma de ventana es la
+    diferencia de dos posiciones de la suma acumulada, sin salir del jugador.
+    """
+    sums = {col: np.concatenate([[0.0], np.cumsum(table[col].to_numpy(float))]) for col in ["rating_per_90", "Minutes", "G+A"]}
+    pos = np.arange(len(table))
+    first = pd.Series(pos).groupby(table["Player_ID"].values, sort=False).transform("min").to_numpy()
+    end = pos + 1
+
+    out = table[["Player_ID", "Date"]].copy()
+    windows = [(str(w), np.maximum(end - w, first)) for w in MATCH_WINDOWS]
+    for m in MINUTE_WINDOWS:
+        # Primer partido de la ventana más corta que acumula al menos m minutos
+        start = np.searchsorted(sums["Minutes"], sums["Minutes"][end] - m, side="right") - 1
+        windows.append((f"{m}m", np.maximum(start, first)))
+    for suffix, start in windows:
+        rating, ga90, min_share = _window_metrics(sums, start, end)
+        out[f"{FORM_PREFIX}rating_{suffix}"] = rating
+        out[f"{FORM_PREFIX}ga90_{suffix}"] = ga90
+        out[f"{FORM_PREFIX}min_share_{suffix}"] = min_share
+    return out
+
+
+def compute_form(matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Forma tras cada partido de cada jugador (Player_ID, Date y una columna por
+    métrica y ventana). El rating de la ventana es la media por partido, como
+    en el perfil anual; G+A/90 y la cuota de minutos salen de las sumas.
+    """
+    return _form_table(_match_table(matches))
+
+
+def latest_form(matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Forma tras el último partido de cada jugador, indexada por Player_ID.
+    """
+    form = compute_form(matches)
+    return form.groupby("Player_ID", sort=False).tail(1).set_index("Player_ID")
+
+
+def add_form_features(X: pd.DataFrame, frames: pd.DataFrame) -> pd.DataFrame:
+    """
+    Añade a la matriz de features la forma al final de los partidos de
+    `frames` (ya recortados al año de corte si se entrena con recorte).
+    """
+    form = latest_form(frames)[form_columns()].reindex(X.index).fillna(0)
+    return X.join(form)
+
+
+def _concat(frames: list[pd.DataFrame], ignore_index: bool = True) -> pd.DataFrame:
+    # pd.concat avisa si alguna pieza está vacía: se omiten salvo que lo estén todas
+    non_empty = [f for f in frames if len(f)]
+    return pd.concat(non_empty, ignore_index=ignore_index) if non_empty else frames[-1]
+
+
+class RollingForm:
+    """
+    Forma actual de todos los jugadores con actualización incremental.
+
+    Por jugador solo se guarda la cola de partidos necesaria para las ventanas
+    (los últimos max(MATCH_WINDOWS) partidos y los que cubren MINUTE_WINDOWS),
+    así que `update` recalcula únicamente cola + partidos nuevos.
+    """
+
+    def __init__(self, matches: pd.DataFrame | None = None):
+        self._tail = pd.DataFrame(columns=["Player_ID", "Date", "rating_per_90", "Minutes", "G+A"])
+        self.latest = pd.DataFrame(columns=["Date"] + form_columns(), index=pd.Index([], name="Player_ID"))
+        if matches is not None and len(matches):
+            self.update(matches)
+
+    def __len__(self) -> int:
+        return len(self.latest)
+
+    def update(self, new_matches: pd.DataFrame) -> pd.DataFrame:
+        """
+        Incorpora partidos nuevos y devuelve la forma actualizada de los
+        jugadores afectados. Se asume que son posteriores a los ya vistos.
+        """
+        new = _match_table(new_matches)
+        if new.empty:
+            return self.latest.iloc[:0]
+        players = new["Player_ID"].unique()
+        affected = self._tail["Player_ID"].isin(players)
+
+        table = (
+            _concat([self._tail[affected], new])
+            .sort_values(["Player_ID", "Date"], kind="stable")
+            .reset_index(drop=True)
+        )
+        updated = _form_table(table).groupby("Player_ID", sort=False).tail(1).set_index("Player_ID")
+
+        self.latest = _concat([self.latest.drop(index=players, errors="ignore"), updated], ignore_index=False)
+        self._tail = _concat([self._tail[~affected], self._trim(table)])
+        return updated
+
+    @staticmethod
+    def _trim(table: pd.DataFrame) -> pd.DataFrame:
+        """
+        Partidos que todavía pueden entrar en alguna ventana de un partido futuro.
+        """
+        by_player = table.groupby("Player_ID", sort=False)
+        from_end = by_player.cumcount(ascending=False)
+        minutes_after = by_player["Minutes"].transform("sum") - by_player["Minutes"].cumsum()
+        keep = (from_end < max(MATCH_WINDOWS)) | (minutes_after < max(MINUTE_WINDOWS, default=0))
+        return table[keep]
@@ -1,38 +1,264 @@
+# src/gemini_utils.py
+#
+# Cliente de IA compartido por todas las sesiones: se configura una vez, pasa
+# cada petición por un TokenBucket global y reintenta con espera exponencial
+# y jitter solo ante errores reintentables (429/5xx, red). El transporte es
+# intercambiable: Gemini, el endpoint HTTP propio o uno falso para pruebas.
+
+import os
+import random
+import threading
+import time
+from typing import Iterator
+
+import requests
 import streamlit as st
-import google.generativeai as genai
-from functools import wraps
-from tenacity import retry, stop_after_attempt, wait_random, retry_if_exception_type
-
-# 🎯 Decorador para reintentos
-def with_retry(func):
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_random(min=1, max=2),
-        retry=retry_if_exception_type(Exception)
-    )
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        return func(*args, **kwargs)
-    return wrapper
-
-@with_retry
-def generar_conclusion_gemini(prompt: str, temperature: float = 0.3) -> str:
-    api_key = st.secrets.get("GOOGLE_API_KEY")
 
-    if not api_key:
-        print("❌ No se encontró GOOGLE_API_KEY en st.secrets.")
-        return "❌ No se encontró la API KEY en st.secrets."
+from rate_limit import TokenBucket
+
+# Endpoint del modelo de lenguaje (sobrescribible para pruebas locales)
+LLM_URL = os.getenv("FUTPEAK_LLM_URL", "https://JuanmaCM7-gemini-endpoint.hf.space/generate")
+LLM_TRANSPORT = os.getenv("FUTPEAK_LLM_TRANSPORT", "http")
+LLM_RATE = float(os.getenv("FUTPEAK_LLM_RATE", "2"))
+GEMINI_MODEL = "gemini-1.5-flash"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_RETRYABLE_GOOGLE = ("ResourceExhausted", "ServiceUnavailable", "InternalServerError", "DeadlineExceeded")
+
+
+class LLMError(Exception):
+    """
+    Error del proveedor de IA. Solo se reintenta si `retryable` es True.
+    """
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+# -------------------------
+# Transportes
+# -------------------------
+class GeminiTransport:
+    """
+    API de Gemini: `genai.configure` una vez y un GenerativeModel por temperatura.
+    La librería solo se importa al usar este transporte.
+    """
+
+    def __init__(self, api_key: str, model_name: str = GEMINI_MODEL):
+        import google.generativeai as genai
+        from google.api_core import exceptions as google_exceptions
 
-    try:
         genai.configure(api_key=api_key)
+        self._genai = genai
+        self._api_error = google_exceptions.GoogleAPIError
+        self._retryable = tuple(getattr(google_exceptions, name) for name in _RETRYABLE_GOOGLE)
+        self.model_name = model_name
+        self._models: dict[float, object] = {}
+        self._lock = threading.Lock()
+
+    def _model(self, temperature: float):
+        with self._lock:
+            if temperature not in self._models:
+                self._models[temperature] = self._genai.GenerativeModel(
+                    model_name=self.model_name,
+                    generation_config={"temperature": temperature}
+                )
+            return self._models[temperature]
+
+    def generate(self, prompt: str, temperature: float) -> str:
+        return "".join(self.stream(prompt, temperature))
+
+    def stream(self, prompt: str, temperature: float) -> Iterator[str]:
+        try:
+            for chunk in self._model(temperature).generate_content(prompt, stream=True):
+                try:
+                    text = chunk.text
+                except ValueError as e:
+                    # `text` lanza ValueError si el candidato viene bloqueado o vacío
+                    raise LLMError(f"Respuesta sin texto: {e}") from e
+                if text:
+                    yield text
+        except self._retryable as e:
+            raise LLMError(str(e), retryable=True) from e
+        except self._api_error as e:
+            raise LLMError(str(e)) from e
+
+
+class HTTPTransport:
+    """
+    Endpoint propio: POST {"prompt", "generationConfig": {"temperature"}} →
+    {"result"} o {"error"}. Si responde text/plain por trozos, se emiten
+    según llegan.
+    """
+
+    def __init__(self, url: str = LLM_URL, timeout: float = 30):
+        self.url = url
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _post(self, prompt: str, temperature: float, stream: bool) -> requests.Response:
+        try:
+            response = self._session().post(
+                self.url,
+                json={"prompt": prompt, "generationConfig": {"temperature": temperature}},
+                timeout=self.timeout,
+                stream=stream,
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise LLMError(str(e), retryable=True) from e
+        if response.status_code in RETRYABLE_STATUS:
+            response.close()
+            raise LLMError(f"HTTP {response.status_code}", retryable=True)
+        return response
+
+    @staticmethod
+    def _result(response: requests.Response) -> str:
+        try:
+            result = response.json()
+        except ValueError as e:
+            raise LLMError(f"HTTP {response.status_code}: respuesta no válida") from e
+        if "result" not in result:
+            raise LLMError(result.get("error", "Respuesta inesperada"))
+        return result["result"]
+
+    def generate(self, prompt: str, temperature: float) -> str:
+        return self._result(self._post(prompt, temperature, stream=False))
 
-        model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash",
-            generation_config={"temperature": temperature}
-        )
+    def stream(self, prompt: str, temperature: float) -> Iterator[str]:
+        # `with`: la conexión se libera aunque el llamante deje de leer o haya un error
+        with self._post(prompt, temperature, stream=True) as response:
+            if not response.headers.get("Content-Type", "").startswith("text/plain"):
+                yield self._result(response)
+                return
+            try:
+                for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+                    if chunk:
+                        yield chunk
+            except requests.RequestException as e:
+                raise LLMError(str(e), retryable=True) from e
 
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
+
+class FakeTransport:
+    """
+    Transporte sin red para pruebas: responde con `reply` (o un eco del prompt)
+    y lanza, en orden, los errores de `failures` antes de responder.
+    """
+
+    def __init__(self, reply: str | None = None, failures: list[Exception] | None = None, delay: float = 0.0):
+        self.reply = reply
+        self.failures = list(failures or [])
+        self.delay = delay
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    def _answer(self, prompt: str) -> str:
+        with self._lock:
+            self.calls.append(prompt)
+            failure = self.failures.pop(0) if self.failures else None
+        if self.delay:
+            time.sleep(self.delay)
+        if failure is not None:
+            raise failure
+        return self.reply if self.reply is not None else f"Respuesta de prueba ({len(prompt)} caracteres)."
+
+    def generate(self, prompt: str, temperature: float) -> str:
+        return self._answer(prompt)
+
+    def stream(self, prompt: str, temperature: float) -> Iterator[str]:
+        for word in self._answer(prompt).split(" "):
+            yield word + " "
+
+
+# -------------------------
+# Cliente
+# -------------------------
+class LLMClient:
+    """
+    Envuelve un transporte con el límite de ritmo y la política de reintentos.
+
+    - Cada intento consume un token del TokenBucket compartido.
+    - Espera backoff · 2^intento · U(0.5, 1.5), con tope `max_backoff`.
+    - En streaming solo se reintenta si aún no se ha emitido ningún trozo.
+    """
+
+    def __init__(
+        self,
+        transport,
+        limiter: TokenBucket | None = None,
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 20.0,
+        sleep=time.sleep,
+    ):
+        self.transport = transport
+        self.limiter = limiter or TokenBucket(LLM_RATE, capacity=max(1.0, 2 * LLM_RATE))
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sleep = sleep
+
+    def _wait(self, attempt: int, error: LLMError):
+        wait = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.5)
+        print(f"🔁 IA: {error}. Reintento {attempt + 1}/{self.retries} en {wait:.1f}s")
+        self._sleep(wait)
+
+    def generate(self, prompt: str, temperature: float = 0.3) -> str:
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            try:
+                return self.transport.generate(prompt, temperature)
+            except LLMError as e:
+                if not e.retryable or attempt == self.retries:
+                    raise
+                self._wait(attempt, e)
+
+    def stream(self, prompt: str, temperature: float = 0.3) -> Iterator[str]:
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            started = False
+            try:
+                for chunk in self.transport.stream(prompt, temperature):
+                    started = True
+                    yield chunk
+                return
+            except LLMError as e:
+                if started or not e.retryable or attempt == self.retries:
+                    raise
+                self._wait(attempt, e)
+
+
+def make_transport(kind: str = LLM_TRANSPORT):
+    if kind == "http":
+        return HTTPTransport(LLM_URL)
+    if kind == "gemini":
+        api_key = st.secrets.get("GOOGLE_API_KEY")
+        if not api_key:
+            raise LLMError("No se encontró GOOGLE_API_KEY en st.secrets.")
+        return GeminiTransport(api_key)
+    if kind == "fake":
+        return FakeTransport()
+    raise ValueError(f"Transporte de IA desconocido: {kind}")
+
+
+@st.cache_resource
+def get_llm_client(kind: str = LLM_TRANSPORT) -> LLMClient:
+    """
+    Un cliente por proceso y transporte, con un solo TokenBucket para todas
+    las sesiones y hilos.
+    """
+    print(f"🤖 Cliente de IA ({kind}) a {LLM_RATE:g} peticiones/s")
+    return LLMClient(make_transport(kind))
+
+
+def generar_conclusion_gemini(prompt: str, temperature: float = 0.3) -> str:
+    try:
+        return get_llm_client("gemini").generate(prompt, temperature).strip()
+    except LLMError as e:
         print(f"❌ Error al usar Gemini: {e}")
         return f"❌ Error generando conclusión: {e}"
@@ -0,0 +1,16 @@
+# src/ingestion/__init__.py
+
+from ingestion.checkpoint import Checkpoint
+from ingestion.fetcher import Fetcher
+from ingestion.pipeline import ingest_matchlogs, ingest_metadata, ingest_players, normalize_matchlogs
+from ingestion.raw_metadata import process_raw_metadata
+
+__all__ = [
+    "Checkpoint",
+    "Fetcher",
+    "ingest_matchlogs",
+    "ingest_metadata",
+    "ingest_players",
+    "normalize_matchlogs",
+    "process_raw_metadata",
+]
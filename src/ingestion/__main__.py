@@ -0,0 +1,79 @@
+# src/ingestion/__main__.py
+#
+# Desde src/:
+#   python -m ingestion players   --output ../data/meta/players.csv
+#   python -m ingestion metadata  --players ../data/meta/players.csv --output ../data/processed/cleaned_metadata.csv
+#   python -m ingestion matchlogs --players ../data/processed/cleaned_metadata.csv --output ../data/processed/cleaned_matchlogs.csv
+#   python -m ingestion quality   --output ../data/processed/cleaned_matchlogs.csv --quality-output limpio.csv
+#   python -m ingestion raw-metadata --raw ../data/raw/future_stars_raw_metadata.csv --output ../data/processed/future_stars_cleaned_metadata.csv --jobs 4
+#
+# --base-url http://127.0.0.1:8000 sirve para ejecutarlo contra páginas HTML guardadas
+# (p. ej. `python -m http.server -d ../tests/fixtures/fbref`; ver tests/test_ingestion.py).
+# La etapa matchlogs termina con el control de calidad (data_quality.py) sobre
+# el CSV completo, salvo con --skip-quality. La versión limpia va a
+# --quality-output (por defecto <output>_clean.csv); solo con --overwrite
+# reemplaza a <output>. El informe va junto a la versión limpia (<limpio>_quality/).
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from data_quality import run_quality_stage
+from ingestion.fetcher import FBREF_URL, Fetcher
+from ingestion.pipeline import ingest_matchlogs, ingest_metadata, ingest_players
+from ingestion.raw_metadata import process_raw_metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingesta de FBref al formato procesado de Futpeak.")
+    parser.add_argument("stage", choices=["players", "metadata", "matchlogs", "quality", "raw-metadata"])
+    parser.add_argument("--players", type=Path, help="CSV con Player_ID, Player_name y Url_template")
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--checkpoint", type=Path)
+    parser.add_argument("--base-url", default=FBREF_URL)
+    parser.add_argument("--rate", type=float, default=0.5, help="Peticiones por segundo (global)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--raw", type=Path, help="CSV raw de metadatos (etapa raw-metadata)")
+    parser.add_argument("--jobs", type=int, default=1, help="Procesos para raw-metadata (-1 = todos)")
+    parser.add_argument("--skip-quality", action="store_true", help="No limpiar los matchlogs al terminar")
+    parser.add_argument("--report", type=Path, help="Directorio del informe de calidad")
+    parser.add_argument("--quality-output", type=Path, help="CSV limpio (por defecto <output>_clean.csv)")
+    parser.add_argument("--overwrite", action="store_true", help="El control de calidad reemplaza <output> por la versión limpia")
+    parser.add_argument("--reference-date", help="Fecha (AAAA-MM-DD) a partir de la cual un partido es futuro; por defecto, hoy")
+    args = parser.parse_args()
+
+    def quality():
+        try:
+            run_quality_stage(
+                args.output, args.quality_output, args.report,
+                reference_date=args.reference_date, overwrite=args.overwrite,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.stage == "quality":
+        quality()
+        return
+
+    if args.stage == "raw-metadata":
+        if args.raw is None:
+            parser.error("--raw es obligatorio para esta etapa")
+        process_raw_metadata(args.raw, args.output, n_jobs=args.jobs)
+        return
+
+    fetcher = Fetcher(base_url=args.base_url, rate=args.rate, max_workers=args.workers)
+    if args.stage == "players":
+        ingest_players(fetcher, args.output)
+    else:
+        if args.players is None:
+            parser.error("--players es obligatorio para esta etapa")
+        players = pd.read_csv(args.players, dtype=str).fillna("")
+        stage = ingest_metadata if args.stage == "metadata" else ingest_matchlogs
+        stage(players, fetcher, args.output, args.checkpoint)
+        if args.stage == "matchlogs" and not args.skip_quality and args.output.exists():
+            quality()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# src/ingestion/checkpoint.py
+
+import threading
+from pathlib import Path
+
+
+class Checkpoint:
+    """
+    Registro de jugadores ya procesados (un Player_ID por línea).
+
+    Se escribe en modo append y se vacía en cada marca, así que una ejecución
+    interrumpida retoma exactamente donde se quedó.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._done: set[str] = set()
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self._done = {line.strip() for line in f if line.strip()}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._done
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def mark(self, key: str):
+        with self._lock:
+            if key in self._done:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(f"{key}\n")
+                f.flush()
+            self._done.add(key)
+
+    def pending(self, keys) -> list[str]:
+        return [k for k in keys if k not in self._done]
@@ -0,0 +1,99 @@
+# src/ingestion/fetcher.py
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+from rate_limit import TokenBucket
+
+FBREF_URL = "https://fbref.com"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+USER_AGENT = "Mozilla/5.0 (compatible; FutpeakIngestion/1.0)"
+
+
+class Fetcher:
+    """
+    Descarga páginas en paralelo con un límite de ritmo global.
+
+    - Una sesión HTTP por hilo (conexiones reutilizadas).
+    - Todas las peticiones pasan por el mismo TokenBucket, sea cual sea el hilo.
+    - Reintentos con espera exponencial solo ante 429/5xx y errores de red.
+    - `base_url` permite apuntar a un servidor local con páginas guardadas.
+    """
+
+    def __init__(
+        self,
+        base_url: str = FBREF_URL,
+        rate: float = 0.5,
+        max_workers: int = 4,
+        timeout: float = 30,
+        retries: int = 3,
+        backoff: float = 5.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.limiter = TokenBucket(rate, capacity=1)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+            self._local.session = session
+        return session
+
+    def resolve(self, url: str) -> str:
+        """
+        URL relativa o absoluta de FBref → URL bajo `base_url`.
+        """
+        parts = urlsplit(url)
+        base = urlsplit(self.base_url)
+        return urlunsplit((base.scheme, base.netloc, base.path + parts.path, parts.query, ""))
+
+    def get(self, url: str) -> str | None:
+        full_url = self.resolve(url)
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self._session().get(full_url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+            else:
+                if response.status_code == 200:
+                    return response.text
+                if response.status_code not in RETRYABLE_STATUS:
+                    print(f"⚠️ {response.status_code} en {full_url}")
+                    return None
+                error = f"HTTP {response.status_code}"
+
+            if attempt < self.retries:
+                wait = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                print(f"🔁 {error} en {full_url}. Reintento {attempt + 1}/{self.retries} en {wait:.1f}s")
+                time.sleep(wait)
+
+        print(f"❌ Sin respuesta de {full_url}")
+        return None
+
+    def map(self, func: Callable, items: Iterable) -> Iterator:
+        """
+        Aplica `func` a cada elemento en el pool de hilos y devuelve
+        (item, resultado) según van terminando. Las excepciones se devuelven
+        como resultado para no cortar el lote.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(func, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield item, future.result()
+                except Exception as e:
+                    yield item, e
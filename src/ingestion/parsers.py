@@ -0,0 +1,158 @@
+# src/ingestion/parsers.py
+#
+# Parsers de páginas de FBref (lxml + BeautifulSoup, sin navegador).
+# Misma lógica de extracción que notebooks/scraping.ipynb.
+
+import re
+
+import pandas as pd
+from bs4 import BeautifulSoup, Comment
+
+STAT_COLUMNS = [
+    "Date", "Day", "Comp", "Round", "Venue", "Result", "Squad", "Opponent", "Start",
+    "Pos", "Min", "Gls", "Ast", "PK", "PKatt", "Sh", "SoT", "CrdY", "CrdR", "Fls", "Fld", "Off",
+    "Crs", "TklW", "Int", "OG", "PKwon", "PKcon", "Touches", "Tkl", "Blocks", "xG", "npxG", "xAG",
+    "SCA", "GCA", "Cmp", "Att", "Cmp%", "PrgP", "Carries", "PrgC", "Succ"
+]
+
+_PLAYER_HREF = re.compile(r"^/en/players/([a-f0-9]{8})/")
+_AGE = re.compile(r"Age:\s*([\d\-]+)")
+
+
+def _soup(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, "lxml")
+
+
+def _find_table(soup: BeautifulSoup, table_id: str):
+    """
+    FBref sirve algunas tablas dentro de comentarios HTML: se buscan en ambos sitios.
+    """
+    table = soup.find("table", id=table_id)
+    if table is not None:
+        return table
+    for comment in soup.find_all(string=lambda s: isinstance(s, Comment) and table_id in s):
+        table = _soup(str(comment)).find("table", id=table_id)
+        if table is not None:
+            return table
+    return None
+
+
+# -------------------------
+# Página de país → lista de jugadores
+# -------------------------
+def parse_country_players(html: str, country: str = "") -> list[dict]:
+    soup = _soup(html)
+    section = None
+    for candidate in soup.select("div.section_content"):
+        links = [a for a in candidate.select("p > a[href]") if _PLAYER_HREF.match(a["href"])]
+        if len(links) > 10:
+            section = candidate
+            break
+    if section is None:
+        return []
+
+    players = []
+    for tag in section.find_all("p"):
+        a = tag.find("a", href=True)
+        match = _PLAYER_HREF.match(a["href"]) if a else None
+        if not match:
+            continue
+        name = a.text.strip()
+        trailing = tag.get_text(separator=" ").replace(name, "").strip()
+        parts = [p.strip() for p in trailing.split("·")]
+        players.append({
+            "Player_ID": match.group(1),
+            "Player_name": name,
+            "Url_template": a["href"].strip(),
+            "Years": parts[0] if len(parts) > 0 else "",
+            "Position": parts[1] if len(parts) > 1 else "",
+            "Clubs": parts[2] if len(parts) > 2 else "",
+            "Country": country,
+        })
+    return players
+
+
+# -------------------------
+# Perfil del jugador → metadatos
+# -------------------------
+def parse_player_metadata(html: str) -> dict:
+    meta = _soup(html).find("div", id="meta")
+    if meta is None:
+        return {}
+
+    def after_label(label: str):
+        strong = meta.find("strong", string=label)
+        link = strong.find_next("a") if strong else None
+        return link.text.strip() if link else ""
+
+    first_p = meta.find("p")
+    record = {
+        "Full_name": first_p.text.strip() if first_p else "",
+        "Position": "",
+        "Footed": "",
+        "Birth_date": "",
+        "Age": "",
+        "Birth_place": "",
+        "Nationality": after_label("National Team:") or after_label("Citizenship:"),
+        "Club": after_label("Club:"),
+    }
+
+    pos_tag = meta.find("strong", string="Position:")
+    if pos_tag:
+        parts = pos_tag.parent.get_text(separator="|").split("|")
+        record["Position"] = parts[1].strip().strip("▪").strip() if len(parts) > 1 else ""
+        if "Footed:" in pos_tag.parent.text and len(parts) > 3:
+            record["Footed"] = parts[3].strip()
+
+    birth_tag = meta.find("strong", string="Born:")
+    if birth_tag:
+        block = birth_tag.parent
+        date_span = block.find("span")
+        if date_span:
+            birth = date_span.get("data-birth") or date_span.text.strip()
+            parsed = pd.to_datetime(birth, errors="coerce")
+            record["Birth_date"] = parsed.strftime("%Y-%m-%d") if pd.notna(parsed) else ""
+        nobr = block.find("nobr")
+        if nobr:
+            match = _AGE.search(nobr.text)
+            record["Age"] = match.group(1) if match else ""
+            place = nobr.find_next("span")
+            if place:
+                record["Birth_place"] = place.text.strip().removeprefix("in ").strip()
+    return record
+
+
+# -------------------------
+# Perfil del jugador → temporadas con match logs
+# -------------------------
+def parse_matchlog_links(html: str) -> set[str]:
+    nav = _soup(html).find("div", id="inner_nav")
+    if nav is None:
+        return set()
+    return {
+        a["href"] for a in nav.find_all("a", href=True)
+        if "/matchlogs/" in a["href"] and "Match-Logs" in a["href"] and "summary" in a["href"].lower()
+    }
+
+
+def season_from_link(rel_url: str) -> str:
+    return rel_url.split("/matchlogs/")[1].split("/")[0]
+
+
+# -------------------------
+# Página de match logs → filas de partidos
+# -------------------------
+def parse_matchlog_table(html: str) -> list[dict]:
+    table = _find_table(_soup(html), "matchlogs_all")
+    if table is None or table.find("tbody") is None:
+        return []
+
+    columns = [th.text.strip() for th in table.find("thead").find_all("tr")[-1].find_all("th")]
+    rows = []
+    for tr in table.find("tbody").find_all("tr"):
+        if "thead" in (tr.get("class") or []):
+            continue
+        values = [cell.text.strip() for cell in tr.find_all(["th", "td"])]
+        raw = dict(zip(columns, values))
+        rows.append({col: raw.get(col, "") for col in STAT_COLUMNS})
+    return rows
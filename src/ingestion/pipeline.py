@@ -0,0 +1,225 @@
+# src/ingestion/pipeline.py
+#
+# Ingesta concurrente y reanudable de FBref directamente al formato de data/processed/.
+# Uso por línea de comandos: ver ingestion/__main__.py
+
+import os
+import threading
+from pathlib import Path
+from urllib.parse import urljoin
+
+import pandas as pd
+
+from ingestion.checkpoint import Checkpoint
+from ingestion.fetcher import FBREF_URL, Fetcher
+from ingestion.parsers import (
+    STAT_COLUMNS,
+    parse_country_players,
+    parse_matchlog_links,
+    parse_matchlog_table,
+    parse_player_metadata,
+    season_from_link,
+)
+
+COUNTRY_URLS = {
+    "Argentina": "/en/country/players/ARG/Argentina-Football-Players",
+    "Brazil": "/en/country/players/BRA/Brazil-Football-Players",
+    "France": "/en/country/players/FRA/France-Football-Players",
+    "Spain": "/en/country/players/ESP/Spain-Football-Players",
+    "England": "/en/country/players/ENG/England-Football-Players",
+    "Germany": "/en/country/players/GER/Germany-Football-Players",
+    "Italy": "/en/country/players/ITA/Italy-Football-Players",
+    "Belgium": "/en/country/players/BEL/Belgium-Football-Players",
+    "Netherlands": "/en/country/players/NED/Netherlands-Football-Players",
+    "Portugal": "/en/country/players/POR/Portugal-Football-Players",
+}
+
+# === Mismo renombrado que notebooks/processing.ipynb ===
+RENAME_COLUMNS = {
+    "Date": "Date", "Day": "Day", "Comp": "Competition", "Round": "Round", "Venue": "Home_Away",
+    "Result": "Result", "Squad": "Player_team", "Opponent": "Rival_team", "Start": "Start",
+    "Pos": "Position", "Min": "Minutes", "Gls": "Goals", "Ast": "Assists", "PK": "Penalty_kick",
+    "PKatt": "Penalty_kick_att", "Sh": "Shots", "SoT": "Shots_on_target", "CrdY": "Yellow_cards",
+    "CrdR": "Red_cards", "Fls": "Fouls_committed", "Fld": "Fouls_drawn", "Off": "Offsides",
+    "Crs": "Crosses", "TklW": "Tackles_won", "Int": "Interceptions", "OG": "Own_goals",
+    "PKwon": "Penaltys_won", "PKcon": "Penaltys_conceded", "Touches": "Touches", "Tkl": "Tackles",
+    "Blocks": "Blocks", "xG": "xG", "npxG": "non_penalty_xG", "xAG": "x_assisted_G",
+    "SCA": "Shot_creating_actions", "GCA": "Goal_creating_actions", "Cmp": "Passes_completed",
+    "Att": "Passes_att", "Cmp%": "Percent_passes", "PrgP": "Progressive_passes",
+    "Carries": "Feet_control", "PrgC": "Progressive_control", "Succ": "Dribling_suc"
+}
+CORE_COLUMNS = ["Player_name", "Player_ID", "Seasons"]
+MATCHLOG_COLUMNS = CORE_COLUMNS + [RENAME_COLUMNS[c] for c in STAT_COLUMNS]
+METADATA_COLUMNS = [
+    "Player_ID", "Player_name", "Full_name", "Url_template", "Birth_date", "Age",
+    "Position", "Footed", "Birth_place", "Nationality", "Club",
+]
+PLAYER_LIST_COLUMNS = ["Player_ID", "Player_name", "Url_template", "Years", "Position", "Clubs", "Country"]
+
+
+class CsvAppender:
+    """
+    Escritura concurrente en un CSV: cabecera una sola vez y bloques por jugador.
+    """
+
+    def __init__(self, path: Path, columns: list[str]):
+        self.path = Path(path)
+        self.columns = columns
+        self._lock = threading.Lock()
+
+    def append(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            header = not self.path.exists() or self.path.stat().st_size == 0
+            df.reindex(columns=self.columns).to_csv(self.path, mode="a", header=header, index=False, encoding="utf-8")
+
+    def drop_players(self, player_ids) -> int:
+        """
+        Quita las filas ya escritas de esos jugadores. Al reanudar se llama con
+        los pendientes: si una ejecución se cortó entre `append` y
+        `Checkpoint.mark`, sus filas se quitan antes de volver a descargarlo.
+        Devuelve las filas quitadas.
+        """
+        with self._lock:
+            if not self.path.exists() or self.path.stat().st_size == 0:
+                return 0
+            df = pd.read_csv(self.path, dtype=str, keep_default_na=False)
+            stale = df["Player_ID"].isin(set(player_ids))
+            if not stale.any():
+                return 0
+            tmp_path = self.path.with_suffix(f".tmp{os.getpid()}")
+            df[~stale].to_csv(tmp_path, index=False, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            return int(stale.sum())
+
+
+def player_name_from_url(url: str) -> str:
+    slug = url.rstrip("/").split("/")[-1]
+    return slug.replace("-", " ").replace("_", " ").title()
+
+
+# -------------------------
+# Normalización al formato procesado
+# -------------------------
+def normalize_matchlogs(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pasos 2-9 del notebook de processing sobre las filas de un lote.
+    """
+    if raw.empty:
+        return pd.DataFrame(columns=MATCHLOG_COLUMNS)
+
+    df = raw.fillna("").astype(str).rename(columns=RENAME_COLUMNS)
+    df = df[(df["Player_ID"] != "") & (df["Seasons"] != "") & (df["Date"] != "")]
+    df = df[df["Position"] != "On matchday squad, but did not play"]
+
+    non_core = [c for c in df.columns if c not in CORE_COLUMNS]
+    df = df[df[non_core].apply(lambda col: col.str.strip() != "").any(axis=1)]
+    df = df.drop_duplicates(subset=["Player_ID", "Date"])
+
+    for col in ["Player_team", "Rival_team"]:
+        df[col] = df[col].str.replace(r"^[a-z]{2,3}\s+", "", regex=True)
+    return df.reindex(columns=MATCHLOG_COLUMNS)
+
+
+# -------------------------
+# Etapas
+# -------------------------
+def ingest_players(fetcher: Fetcher, output_csv: Path, countries: dict[str, str] = COUNTRY_URLS) -> pd.DataFrame:
+    def task(country):
+        html = fetcher.get(countries[country])
+        if html is None:
+            raise RuntimeError("página no disponible")
+        return parse_country_players(html, country)
+
+    players = []
+    for country, result in fetcher.map(task, countries):
+        if isinstance(result, Exception):
+            print(f"⚠️ {country}: {result}")
+            continue
+        print(f"✅ {country}: {len(result)} jugadores")
+        players.extend(result)
+
+    df = pd.DataFrame(players, columns=PLAYER_LIST_COLUMNS).drop_duplicates("Player_ID")
+    output_csv = Path(output_csv)
+    output_csv.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(output_csv, index=False, encoding="utf-8")
+    return df
+
+
+def ingest_metadata(players: pd.DataFrame, fetcher: Fetcher, output_csv: Path, checkpoint_path: Path | None = None) -> int:
+    output_csv = Path(output_csv)
+    checkpoint = Checkpoint(checkpoint_path or output_csv.with_suffix(".metadata.done"))
+    writer = CsvAppender(output_csv, METADATA_COLUMNS)
+    pending = players[[pid not in checkpoint for pid in players["Player_ID"]]]
+    stale = writer.drop_players(pending["Player_ID"])
+    if stale:
+        print(f"🧹 {stale} filas de jugadores sin checkpoint descartadas (ejecución anterior interrumpida)")
+    print(f"🚀 Metadatos pendientes: {len(pending)} (hechos: {len(checkpoint)})")
+
+    def task(player):
+        html = fetcher.get(player["Url_template"])
+        if html is None:
+            raise RuntimeError("perfil no disponible")
+        record = parse_player_metadata(html)
+        if not record:
+            raise RuntimeError("sin bloque de metadatos")
+        record.update({
+            "Player_ID": player["Player_ID"],
+            "Player_name": player_name_from_url(player["Url_template"]),
+            "Url_template": urljoin(FBREF_URL, player["Url_template"]),
+        })
+        writer.append(pd.DataFrame([record]))
+        checkpoint.mark(player["Player_ID"])
+        return 1
+
+    return _run(fetcher, task, pending)
+
+
+def ingest_matchlogs(players: pd.DataFrame, fetcher: Fetcher, output_csv: Path, checkpoint_path: Path | None = None) -> int:
+    output_csv = Path(output_csv)
+    checkpoint = Checkpoint(checkpoint_path or output_csv.with_suffix(".matchlogs.done"))
+    writer = CsvAppender(output_csv, MATCHLOG_COLUMNS)
+    pending = players[[pid not in checkpoint for pid in players["Player_ID"]]]
+    stale = writer.drop_players(pending["Player_ID"])
+    if stale:
+        print(f"🧹 {stale} filas de jugadores sin checkpoint descartadas (ejecución anterior interrumpida)")
+    print(f"🚀 Matchlogs pendientes: {len(pending)} (hechos: {len(checkpoint)})")
+
+    def task(player):
+        html = fetcher.get(player["Url_template"])
+        if html is None:
+            raise RuntimeError("perfil no disponible")
+
+        rows = []
+        for link in sorted(parse_matchlog_links(html)):
+            page = fetcher.get(link)
+            if page is None:
+                # Sin checkpoint: el jugador se repite entero en la próxima ejecución
+                raise RuntimeError(f"temporada no disponible: {link}")
+            season = season_from_link(link)
+            for row in parse_matchlog_table(page):
+                row.update({"Player_name": player["Player_name"], "Player_ID": player["Player_ID"], "Seasons": season})
+                rows.append(row)
+
+        df = normalize_matchlogs(pd.DataFrame(rows))
+        writer.append(df)
+        checkpoint.mark(player["Player_ID"])
+        return len(df)
+
+    return _run(fetcher, task, pending)
+
+
+def _run(fetcher: Fetcher, task, pending: pd.DataFrame) -> int:
+    total = 0
+    records = pending.to_dict("records")
+    keyed = {r["Player_ID"]: r for r in records}
+    for player_id, result in fetcher.map(lambda pid: task(keyed[pid]), list(keyed)):
+        if isinstance(result, Exception):
+            print(f"❌ {player_id}: {result}")
+            continue
+        total += result
+        print(f"✅ {player_id}: {result} filas")
+    return total
+
@@ -0,0 +1,168 @@
+# src/ingestion/raw_metadata.py
+#
+# Raw metadata (CSV exportado por el scraping) → cleaned_metadata.csv en una sola pasada.
+# Mismas reglas que process_metadata_file() en notebooks/processing.ipynb, pero cada
+# línea se lee una vez y todos los campos salen de ella con patrones precompilados.
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+TEAMS_PATH = Path(__file__).resolve().parents[2] / "data" / "meta" / "World_Cup_Qualification_Teams.csv"
+METADATA_COLUMNS = [
+    "Player_ID", "Player_name", "Full_name", "Url_template", "Birth_date", "Age",
+    "Position", "Footed", "Birth_place", "Nationality", "Club", "Gender",
+]
+
+# === Patrones (pasos 1-10 del notebook)
+URL_RE = re.compile(r"https://fbref\.com/en/players/([a-f0-9]{8})/([^\s/,]+)")
+NAME_RE = re.compile(r"\b([A-ZÁÉÍÓÚÑ][a-záéíóúñü'’\-]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñü'’\-]+){2,})\b")
+DATE_RE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+AGE_RE = re.compile(r"\b\d{2}-\d{3}\b")
+POSITION_RE = re.compile(r"\b([A-Z]{2,})\b")
+FOOTED_RE = re.compile(r"\b(Right|Left)\b", flags=re.IGNORECASE)
+BIRTH_PLACE_RE = re.compile(r'"in ([^"]+,[^"]+)"')
+
+
+def load_countries(teams_path: Path = TEAMS_PATH) -> list[str]:
+    teams = pd.read_csv(teams_path, dtype=str)
+    return sorted(set(teams["National Team"].dropna().str.strip()))
+
+
+def _country_pattern(countries: list[str]) -> re.Pattern | None:
+    if not countries:
+        return None
+    # Los nombres largos primero: "Equatorial Guinea" antes que "Guinea"
+    ordered = sorted(countries, key=len, reverse=True)
+    return re.compile("|".join(re.escape(c) for c in ordered))
+
+
+def _club(line: str, known: set[str]) -> str:
+    best = ""
+    for p in (p.strip() for p in line.replace('"', "").split(",")):
+        pl = p.lower()
+        if (
+            not p or "http" in pl or pl in known or len(p) < 2 or
+            "position" in pl or "footed" in pl or "in " in pl or
+            p.isupper() or p.replace("-", "").isupper()
+        ):
+            continue
+        if p[0].isupper():
+            best = p
+    return best
+
+
+def parse_line(line: str, country_re: re.Pattern | None = None) -> dict | None:
+    """
+    Una línea del raw → registro de cleaned_metadata (o None si no es de un jugador).
+    """
+    url = URL_RE.search(line)
+    if not url:
+        return None
+
+    player_id, slug = url.group(1), url.group(2)
+    player_name = slug.replace("_", " ").replace("-", " ").title()
+
+    candidate = NAME_RE.search(line)
+    candidate = candidate.group(1) if candidate else ""
+    common = {t.lower() for t in player_name.split()} & {t.lower() for t in candidate.split()}
+    full_name = candidate if candidate and len(common) >= 2 else ""
+
+    birth_date = DATE_RE.search(line)
+    age = AGE_RE.search(line)
+    footed = FOOTED_RE.search(line)
+    birth_place = BIRTH_PLACE_RE.search(line)
+    nationality = country_re.search(line) if country_re else None
+
+    record = {
+        "Player_ID": player_id,
+        "Player_name": player_name,
+        "Full_name": full_name,
+        "Url_template": url.group(0),
+        "Birth_date": birth_date.group(0) if birth_date else "",
+        "Age": age.group(0) if age else "",
+        "Position": "-".join(sorted(set(POSITION_RE.findall(line)))),
+        "Footed": footed.group(1).capitalize() if footed else "",
+        "Birth_place": birth_place.group(1).strip() if birth_place else "",
+        "Nationality": nationality.group(0) if nationality else "",
+        "Gender": "male",
+    }
+    known = {record[k].lower() for k in
+             ["Player_name", "Full_name", "Footed", "Birth_date", "Age", "Birth_place", "Nationality", "Position"]}
+    record["Club"] = _club(line, known)
+    return record
+
+
+# -------------------------
+# Lectura por bloques
+# -------------------------
+def _chunk_offsets(path: Path, n_chunks: int) -> list[tuple[int, int]]:
+    """
+    Divide el fichero en rangos de bytes que empiezan y acaban en salto de línea.
+    """
+    size = path.stat().st_size
+    bounds = [0]
+    with open(path, "rb") as f:
+        f.readline()  # cabecera
+        bounds[0] = f.tell()
+        for i in range(1, n_chunks):
+            f.seek(max(bounds[-1], size * i // n_chunks))
+            f.readline()
+            bounds.append(f.tell())
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def _parse_chunk(path: Path, start: int, end: int, countries: list[str]) -> list[dict]:
+    country_re = _country_pattern(countries)
+    records = []
+    with open(path, "rb") as f:
+        f.seek(start)
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            text = line.decode("utf-8").strip()
+            if "fbref.com" not in text:
+                continue
+            record = parse_line(text, country_re)
+            if record:
+                records.append(record)
+    return records
+
+
+def process_raw_metadata(
+    raw_path: Path,
+    cleaned_path: Path | None = None,
+    teams_path: Path = TEAMS_PATH,
+    n_jobs: int = 1,
+) -> pd.DataFrame:
+    """
+    Procesa el raw de metadatos en `n_jobs` bloques paralelos y escribe el CSV una vez.
+    Si un Player_ID aparece en varias líneas se queda la primera, como en el notebook.
+    """
+    raw_path = Path(raw_path)
+    countries = load_countries(teams_path) if Path(teams_path).exists() else []
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+
+    chunks = _chunk_offsets(raw_path, max(1, n_jobs))
+    if len(chunks) == 1:
+        results = [_parse_chunk(raw_path, *chunks[0], countries)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            futures = [pool.submit(_parse_chunk, raw_path, start, end, countries) for start, end in chunks]
+            results = [f.result() for f in futures]
+
+    records = [r for chunk in results for r in chunk]
+    df = pd.DataFrame(records, columns=METADATA_COLUMNS).drop_duplicates("Player_ID").reset_index(drop=True)
+
+    if cleaned_path is not None:
+        cleaned_path = Path(cleaned_path)
+        cleaned_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(cleaned_path, index=False, encoding="utf-8")
+        print(f"✅ Metadata procesada ({len(df)} jugadores) y guardada en: {cleaned_path}")
+    return df
@@ -0,0 +1,256 @@
+# src/leaderboard.py
+#
+# Ranking de proyecciones: todos los jugadores se puntúan en lote una vez y se
+# guardan en listas ordenadas por faceta. Las consultas top-k recorren solo la
+# lista más pequeña que cumple el filtro, sin volver a ejecutar el modelo.
+
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sortedcontainers import SortedKeyList
+
+from data_loader import (
+    load_cleaned_matchlogs,
+    load_cleaned_metadata,
+    load_future_matchlogs,
+    load_future_metadata,
+)
+from features import build_feature_matrix, prepare_player_frames, to_model_input
+from form import uses_form
+from model_runner import get_model_assets
+from positions import curves_for_position, position_groups_by_player
+from tenants import tenant_cache_entries
+
+FACETS = ("peak_group", "position_group", "age_band")
+AGE_BINS = [0, 20, 22, 24, np.inf]
+AGE_BANDS = ["<20", "20-21", "22-23", "24+"]
+MAX_PROJECTION_YEAR = 13
+LEADERBOARD_COLUMNS = [
+    "Player_ID", "Player_name", "Club", "Age", "position_group", "age_band",
+    "peak_group", "projected_peak", "current_rating", "seasons",
+]
+POSITION_GROUP_NAMES = {
+    "ATTACKING": "Ataque",
+    "MIDFIELD": "Centro del campo",
+    "DEFENSIVE": "Defensa",
+    "GOALKEEPER": "Portero",
+    "UNKNOWN": "Desconocida",
+}
+
+
+# -------------------------
+# Puntuación en lote
+# -------------------------
+def _player_info(metadata: pd.DataFrame) -> pd.DataFrame:
+    info = metadata.drop_duplicates("Player_ID").set_index("Player_ID")
+    age = pd.to_numeric(info["Age"].astype(str).str.split("-").str[0], errors="coerce")
+    return pd.DataFrame({
+        "Player_name": info["Player_name"],
+        "Club": info.get("Club", pd.Series("", index=info.index)).fillna(""),
+        "Age": age,
+        "position_group": position_groups_by_player(metadata).astype(str),
+        "age_band": pd.cut(age, AGE_BINS, labels=AGE_BANDS, right=False).astype(str),
+    })
+
+
+def projected_peaks(careers: pd.DataFrame, groups: pd.Series, curves: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pico proyectado de cada jugador con la misma regla que `adjust_projection`:
+    la curva del grupo se desplaza hasta el rating de su último año real.
+    """
+    last = careers.loc[careers.groupby("Player_ID")["year_since_debut"].idxmax()]
+    last = last[["Player_ID", "year_since_debut", "rating_per_90"]].assign(peak_group=groups.reindex(last["Player_ID"]).values)
+
+    ref = last.merge(curves[["peak_group", "year_since_debut", "rating_avg"]], on=["peak_group", "year_since_debut"], how="left")
+    shift = (ref["rating_per_90"] - ref["rating_avg"]).fillna(0).values
+
+    visible = curves[pd.to_numeric(curves["year_since_debut"], errors="coerce") <= MAX_PROJECTION_YEAR]
+    curve_peak = visible.groupby("peak_group")["rating_avg"].max()
+
+    return pd.DataFrame({
+        "projected_peak": last["peak_group"].map(curve_peak).values + shift,
+        "current_rating": last["rating_per_90"].values,
+        "seasons": last["year_since_debut"].values,
+    }, index=pd.Index(last["Player_ID"].values, name="Player_ID"))
+
+
+def projection_curves(careers: pd.DataFrame, groups: pd.Series, curves: pd.DataFrame) -> pd.DataFrame:
+    """
+    Curva proyectada de cada jugador en formato largo (Player_ID, year_since_debut,
+    projection): la curva de su grupo desplazada hasta el rating de su último
+    año, igual que `adjust_projection` y `projected_peaks`.
+    """
+    curves = curves.assign(year_since_debut=pd.to_numeric(curves["year_since_debut"], errors="coerce"))
+    curves = curves[curves["year_since_debut"] <= MAX_PROJECTION_YEAR]
+    last = careers.loc[careers.groupby("Player_ID")["year_since_debut"].idxmax(), ["Player_ID", "year_since_debut", "rating_per_90"]]
+    last = last.assign(peak_group=groups.reindex(last["Player_ID"]).values)
+    ref = last.merge(curves[["peak_group", "year_since_debut", "rating_avg"]], on=["peak_group", "year_since_debut"], how="left")
+    shift = pd.Series((ref["rating_per_90"] - ref["rating_avg"]).fillna(0).values, index=ref["Player_ID"].values)
+
+    long = last[["Player_ID", "peak_group"]].merge(curves[["peak_group", "year_since_debut", "rating_avg"]], on="peak_group")
+    long["projection"] = long["rating_avg"] + long["Player_ID"].map(shift).values
+    return long[["Player_ID", "year_since_debut", "projection"]]
+
+
+def score_matrix(assets, X: pd.DataFrame, careers: pd.DataFrame, positions: pd.Series) -> pd.DataFrame:
+    """
+    peak_group y pico proyectado de cada fila de `X` con unos artefactos
+    (ModelAssets): una llamada al modelo para toda la matriz. `positions` es
+    una Series Player_ID → grupo de posición, para elegir curvas.
+    """
+    model, le, df_curves, model_features = assets
+    groups = pd.Series(le.inverse_transform(model.predict(to_model_input(X, model_features))), index=X.index)
+    # Cada jugador se proyecta con las curvas de su grupo de posición (o las generales)
+    positions = positions.astype(str).reindex(X.index).fillna("UNKNOWN")
+    scores = pd.concat([
+        projected_peaks(careers[careers["Player_ID"].isin(ids)], groups.loc[ids], curves_for_position(df_curves, position))
+        for position, ids in positions.groupby(positions, sort=False).groups.items()
+    ])
+    return scores.join(groups.rename("peak_group"), how="inner")
+
+
+def score_players(matchlogs: pd.DataFrame, metadata: pd.DataFrame, n_jobs: int = -1) -> pd.DataFrame:
+    """
+    Predicción de grupo y pico proyectado para todos los jugadores de `metadata`
+    con una sola llamada al modelo.
+    """
+    assets = get_model_assets()
+
+    frames = prepare_player_frames(matchlogs, metadata)
+    with_form = uses_form(assets.features)
+    X, careers = build_feature_matrix(frames, n_jobs=n_jobs, with_form=with_form)
+    if assets.feature_max_year is not None:
+        # Features como al entrenar; la proyección usa la carrera completa
+        X, _ = build_feature_matrix(frames, max_year=assets.feature_max_year, n_jobs=n_jobs, with_form=with_form)
+    if X.empty:
+        return pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+
+    scores = score_matrix(assets, X, careers, position_groups_by_player(metadata))
+    board = _player_info(metadata).join(scores, how="inner")
+    return board.reset_index()[LEADERBOARD_COLUMNS]
+
+
+# -------------------------
+# Índice de ranking
+# -------------------------
+class RankingIndex:
+    """
+    Jugadores ordenados por pico proyectado, globalmente y por cada valor de
+    cada faceta (peak_group, position_group, age_band).
+
+    `upsert` y `remove` son O(log n) por lista, así que el índice se mantiene
+    al día al repuntuar jugadores sueltos. Es compartido entre sesiones
+    (st.cache_resource): lecturas y escrituras van bajo el mismo lock, y
+    `update` aplica un lote entero sin que nadie vea un estado intermedio.
+    """
+
+    def __init__(self, board: pd.DataFrame | None = None, score: str = "projected_peak"):
+        self.score = score
+        self._records: dict[str, dict] = {}
+        self._all = self._new_list()
+        self._facets: dict[tuple[str, str], SortedKeyList] = {}
+        self._lock = threading.RLock()
+        if board is not None:
+            for record in board.to_dict("records"):
+                self.upsert(record)
+
+    def _new_list(self) -> SortedKeyList:
+        return SortedKeyList(key=lambda r: (-r[self.score], r["Player_ID"]))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def __contains__(self, player_id: str) -> bool:
+        with self._lock:
+            return player_id in self._records
+
+    def upsert(self, record: dict):
+        record = dict(record)
+        if pd.isna(record[self.score]):
+            record[self.score] = -np.inf
+        with self._lock:
+            self.remove(record["Player_ID"])
+            self._records[record["Player_ID"]] = record
+            self._all.add(record)
+            for facet in FACETS:
+                self._facets.setdefault((facet, record[facet]), self._new_list()).add(record)
+
+    def remove(self, player_id: str):
+        with self._lock:
+            record = self._records.pop(player_id, None)
+            if record is None:
+                return
+            self._all.remove(record)
+            for facet in FACETS:
+                self._facets[(facet, record[facet])].remove(record)
+
+    def update(self, records, removed=()):
+        """
+        Quita `removed` e inserta o actualiza `records` de una vez.
+        """
+        with self._lock:
+            for player_id in removed:
+                self.remove(player_id)
+            for record in records:
+                self.upsert(record)
+
+    def facet_values(self, facet: str) -> list[str]:
+        with self._lock:
+            return sorted(value for (name, value), items in self._facets.items() if name == facet and items)
+
+    def top(self, k: int = 20, **filters) -> pd.DataFrame:
+        """
+        Los `k` mejores jugadores que cumplen todos los filtros, p. ej.
+        `top(10, peak_group="joven estrella", age_band="<20")`.
+        """
+        filters = {f: v for f, v in filters.items() if v is not None}
+        unknown = set(filters) - set(FACETS)
+        if unknown:
+            raise ValueError(f"Facetas no soportadas: {sorted(unknown)}")
+
+        rows = []
+        with self._lock:
+            source = self._all
+            if filters:
+                lists = [self._facets.get((f, v)) for f, v in filters.items()]
+                if any(lst is None for lst in lists):
+                    return pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+                source = min(lists, key=len)
+
+            for record in source:
+                if all(record[f] == v for f, v in filters.items()):
+                    rows.append(record)
+                    if len(rows) == k:
+                        break
+        return pd.DataFrame(rows, columns=LEADERBOARD_COLUMNS)
+
+
+def refresh_players(index: RankingIndex, player_ids, future: bool = True) -> int:
+    """
+    Repuntúa solo `player_ids` y actualiza el índice en sitio. El modelo
+    corre fuera del lock; el cambio del índice se aplica de una vez.
+    """
+    matchlogs = load_future_matchlogs() if future else load_cleaned_matchlogs()
+    metadata = load_future_metadata() if future else load_cleaned_metadata()
+    player_ids = set(player_ids)
+
+    board = score_players(matchlogs[matchlogs["Player_ID"].isin(player_ids)], metadata[metadata["Player_ID"].isin(player_ids)], n_jobs=1)
+    index.update(board.to_dict("records"), removed=player_ids - set(board["Player_ID"]))
+    return len(board)
+
+
+# Uno por tenant: data_version incluye la partición activa (ver tenants.py)
+@st.cache_resource(max_entries=tenant_cache_entries())
+def get_leaderboard(data_version: str, model_version: str, future: bool = True) -> RankingIndex:
+    """
+    Índice compartido por todas las sesiones del mismo tenant. Las versiones
+    solo forman parte de la clave: al cambiar datos o modelo se construye uno nuevo.
+    """
+    matchlogs = load_future_matchlogs() if future else load_cleaned_matchlogs()
+    metadata = load_future_metadata() if future else load_cleaned_metadata()
+    board = score_players(matchlogs, metadata)
+    print(f"🏆 Ranking construido con {len(board)} jugadores")
+    return RankingIndex(board)
@@ -0,0 +1,372 @@
+# src/loadtest.py
+#
+# Prueba de carga de app.py: arranca un `streamlit run` local (headless) y lo
+# conduce por su websocket con N sesiones concurrentes que van cambiando de
+# jugador. El endpoint de IA se sustituye por un servidor local.
+#
+# Desde src/:
+#   python loadtest.py --sessions 8 --switches 10 --llm-delay 0.5 --output ../loadtest.json
+#
+# Se usa el servidor real y no AppTest porque AppTest comparte un Runtime
+# global entre instancias y no admite varias sesiones a la vez en un proceso.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import requests
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.websocket import websocket_connect
+
+APP_PATH = Path(__file__).parent / "app.py"
+PLAYER_KEY = "selected_player"
+PAGE_TIMEOUT = 300
+STARTUP_TIMEOUT = 120
+
+
+# -------------------------
+# Endpoint de IA local
+# -------------------------
+class LLMStub:
+    """
+    Servidor HTTP local con la misma interfaz que el endpoint real:
+    POST {"prompt": ...} → {"result": ...} tras `delay` segundos.
+    """
+
+    def __init__(self, delay: float = 0.5, host: str = "127.0.0.1", port: int = 0):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                prompt = json.loads(self.rfile.read(length) or b"{}").get("prompt", "")
+                time.sleep(stub.delay)
+                with stub._lock:
+                    stub.calls += 1
+                body = json.dumps({"result": f"Respuesta simulada ({len(prompt)} caracteres de prompt)."}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}/generate"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# -------------------------
+# Servidor de Streamlit
+# -------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class AppServer:
+    """
+    `streamlit run app.py` en un subproceso, con el endpoint de IA apuntando al stub.
+    """
+
+    def __init__(self, llm_url: str, port: int | None = None, log_path: Path | None = None):
+        self.port = port or _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.ws_url = f"ws://127.0.0.1:{self.port}/_stcore/stream"
+        self.llm_url = llm_url
+        self.log_path = log_path
+        self.process: subprocess.Popen | None = None
+
+    def __enter__(self):
+        env = dict(os.environ, FUTPEAK_LLM_URL=self.llm_url, STREAMLIT_SERVER_HEADLESS="1")
+        log = open(self.log_path, "w") if self.log_path else subprocess.DEVNULL
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+             "--server.headless", "true", "--server.port", str(self.port),
+             "--server.address", "127.0.0.1", "--browser.gatherUsageStats", "false",
+             "--server.fileWatcherType", "none"],
+            cwd=APP_PATH.parent, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        deadline = time.time() + STARTUP_TIMEOUT
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("❌ El servidor de Streamlit terminó al arrancar")
+            try:
+                if requests.get(f"{self.url}/_stcore/health", timeout=1).ok:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.5)
+        self.__exit__()
+        raise TimeoutError("❌ El servidor de Streamlit no respondió a tiempo")
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+# -------------------------
+# CPU y memoria del servidor
+# -------------------------
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def read_process_usage(pid: int) -> tuple[float, int]:
+    """
+    (segundos de CPU acumulados, RSS en bytes) de un proceso, leídos de /proc.
+    """
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    rss = 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1]) * 1024
+                break
+    return cpu_seconds, rss
+
+
+class ResourceSampler(threading.Thread):
+    """
+    Muestrea cada `interval` segundos el % de CPU (100 = un núcleo) y el RSS del proceso `pid`.
+    """
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: list[dict] = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        start = last_wall = time.perf_counter()
+        last_cpu, _ = read_process_usage(self.pid)
+        while not self._stop_event.wait(self.interval):
+            try:
+                cpu, rss = read_process_usage(self.pid)
+            except OSError:
+                break
+            wall = time.perf_counter()
+            self.samples.append({
+                "t": round(wall - start, 2),
+                "cpu_percent": round(100 * (cpu - last_cpu) / (wall - last_wall), 1),
+                "rss_mb": round(rss / 2**20, 1),
+            })
+            last_wall, last_cpu = wall, cpu
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# -------------------------
+# Sesión simulada (protocolo del navegador)
+# -------------------------
+class Session:
+    """
+    Un navegador mínimo: envía reruns con el estado de los widgets y espera
+    el final del script. Guarda los ids de widget que el servidor va creando.
+    """
+
+    def __init__(self, ws_url: str):
+        self.ws_url = ws_url
+        self.conn = None
+        self.widgets: dict[str, tuple[str, str]] = {}  # key → (id, tipo de valor)
+        self.options: dict[str, list[str]] = {}
+
+    async def connect(self):
+        self.conn = await websocket_connect(self.ws_url, subprotocols=["streamlit"], max_message_size=512 * 2**20)
+
+    async def rerun(self, widget_values: dict[str, object] | None = None) -> list[str]:
+        """
+        Lanza un rerun y espera a que termine. Devuelve las excepciones que
+        haya pintado la app (st.exception o errores no capturados).
+        """
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        for key, value in (widget_values or {}).items():
+            widget_id, value_type = self.widgets[key]
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            setattr(state, value_type, value)
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+
+        errors = []
+        while True:
+            raw = await self.conn.read_message()
+            if raw is None:
+                raise ConnectionError("websocket cerrado por el servidor")
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._track(fwd.delta.new_element, errors)
+            elif kind == "script_finished":
+                if fwd.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue  # st.rerun() dentro de la app: la página sigue
+                return errors
+
+    def _track(self, element, errors: list[str]):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            errors.append(element.exception.message)
+        elif kind in ("selectbox", "radio"):
+            widget = getattr(element, kind)
+            key = widget.id.rsplit("-", 1)[-1]
+            self.widgets[key] = (widget.id, "int_value")
+            self.options[key] = list(widget.options)
+
+    async def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+async def run_session(session_id: int, ws_url: str, switches: int, results: list, seed: int):
+    rng = random.Random(seed + session_id)
+    session = Session(ws_url)
+
+    async def timed(action: str, player: str, coro_factory):
+        start = time.perf_counter()
+        try:
+            errors = await asyncio.wait_for(coro_factory(), PAGE_TIMEOUT)
+            error = errors[0] if errors else None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results.append({
+            "session": session_id,
+            "action": action,
+            "player": player,
+            "start": start,
+            "latency": time.perf_counter() - start,
+            "error": error,
+        })
+        return error
+
+    try:
+        await session.connect()
+        if await timed("load", "", session.rerun):
+            return
+        players = session.options.get(PLAYER_KEY, [])
+        for _ in range(switches if players else 0):
+            index = rng.randrange(len(players))
+            await timed("switch", players[index], lambda: session.rerun({PLAYER_KEY: index}))
+    finally:
+        await session.close()
+
+
+async def _run_sessions(ws_url: str, sessions: int, switches: int, seed: int, ramp: float) -> list[dict]:
+    results: list[dict] = []
+
+    async def delayed(i):
+        await asyncio.sleep(i * ramp)
+        await run_session(i, ws_url, switches, results, seed)
+
+    await asyncio.gather(*(delayed(i) for i in range(sessions)))
+    return results
+
+
+# -------------------------
+# Informe
+# -------------------------
+def summarize(results: list[dict], wall_time: float, samples: list[dict]) -> dict:
+    latencies = np.array([r["latency"] for r in results if r["error"] is None])
+    errors = [r for r in results if r["error"] is not None]
+    pct = np.percentile(latencies, [50, 95, 99]) if len(latencies) else [np.nan] * 3
+    return {
+        "pages": len(results),
+        "errors": len(errors),
+        "wall_time_s": round(wall_time, 2),
+        "throughput_pages_s": round(len(latencies) / wall_time, 3) if wall_time > 0 else 0,
+        "latency_p50_s": round(float(pct[0]), 3),
+        "latency_p95_s": round(float(pct[1]), 3),
+        "latency_p99_s": round(float(pct[2]), 3),
+        "latency_max_s": round(float(latencies.max()), 3) if len(latencies) else None,
+        "cpu_percent_mean": round(float(np.mean([s["cpu_percent"] for s in samples])), 1) if samples else None,
+        "cpu_percent_max": max((s["cpu_percent"] for s in samples), default=None),
+        "rss_mb_start": samples[0]["rss_mb"] if samples else None,
+        "rss_mb_max": max((s["rss_mb"] for s in samples), default=None),
+        "first_errors": [e["error"] for e in errors[:5]],
+    }
+
+
+def run_load_test(
+    sessions: int = 4,
+    switches: int = 5,
+    llm_delay: float = 0.5,
+    interval: float = 1.0,
+    seed: int = 42,
+    ramp: float = 0.0,
+    server_log: Path | None = None,
+) -> dict:
+    with LLMStub(delay=llm_delay) as stub, AppServer(stub.url, log_path=server_log) as server:
+        sampler = ResourceSampler(server.process.pid, interval)
+        sampler.start()
+
+        start = time.perf_counter()
+        results = asyncio.run(_run_sessions(server.ws_url, sessions, switches, seed, ramp))
+        wall_time = time.perf_counter() - start
+        sampler.stop()
+
+        report = summarize(results, wall_time, sampler.samples)
+        report.update({
+            "sessions": sessions,
+            "switches_per_session": switches,
+            "llm_delay_s": llm_delay,
+            "llm_calls": stub.calls,
+        })
+        return {"summary": report, "timeline": sampler.samples, "pages": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga de la app de Futpeak.")
+    parser.add_argument("--sessions", type=int, default=4, help="Sesiones concurrentes")
+    parser.add_argument("--switches", type=int, default=5, help="Cambios de jugador por sesión")
+    parser.add_argument("--llm-delay", type=float, default=0.5, help="Latencia simulada del endpoint de IA (s)")
+    parser.add_argument("--interval", type=float, default=1.0, help="Intervalo de muestreo de CPU/RSS (s)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Segundos entre el arranque de cada sesión")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--server-log", type=Path, help="Fichero para la salida del servidor de Streamlit")
+    parser.add_argument("--output", type=Path, help="JSON con resumen, serie temporal y páginas")
+    args = parser.parse_args()
+
+    result = run_load_test(args.sessions, args.switches, args.llm_delay, args.interval, args.seed, args.ramp, args.server_log)
+
+    print("\n📈 Resultado de la prueba de carga")
+    for key, value in result["summary"].items():
+        print(f"  {key}: {value}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False, default=str)
+        print(f"💾 Informe guardado en {args.output}")
@@ -0,0 +1,149 @@
+# src/mixture.py
+#
+# Proyección probabilística: en lugar de la curva del grupo más probable, la
+# mezcla de las curvas de `curvas_promedio` ponderada por predict_proba, con
+# bandas que recogen la dispersión dentro de cada grupo y entre grupos.
+# Todo son operaciones matriciales (jugadores × grupos × años).
+
+import numpy as np
+import pandas as pd
+
+from model_runner import get_model_assets
+from positions import curves_for_position
+
+MAX_PROJECTION_YEAR = 13
+# Rango intercuartílico de una normal en desviaciones típicas
+IQR_TO_STD = 1.349
+# Desviaciones típicas que separan la media de los percentiles 25/75
+P75_Z = 0.6745
+
+
+def curve_tensor(df_curves: pd.DataFrame, classes, max_year: int = MAX_PROJECTION_YEAR):
+    """
+    Curvas en forma de matriz: (años, media, desviación) con forma (K, Y).
+    Los años que faltan en un grupo quedan en NaN.
+    """
+    curves = df_curves.copy()
+    curves["year_since_debut"] = pd.to_numeric(curves["year_since_debut"], errors="coerce")
+    curves = curves[curves["year_since_debut"] <= max_year]
+    years = np.sort(curves["year_since_debut"].dropna().unique()).astype(int)
+
+    index = pd.MultiIndex.from_product([list(classes), years], names=["peak_group", "year_since_debut"])
+    grid = curves.set_index(["peak_group", "year_since_debut"]).reindex(index)
+
+    mu = grid["rating_avg"].to_numpy(float).reshape(len(classes), len(years))
+    if {"rating_p25", "rating_p75"} <= set(grid.columns):
+        sigma = ((grid["rating_p75"] - grid["rating_p25"]) / IQR_TO_STD).to_numpy(float).reshape(mu.shape)
+    else:
+        sigma = np.zeros_like(mu)
+    return years, mu, np.nan_to_num(sigma, nan=0.0)
+
+
+def mix_curves(proba: np.ndarray, mu: np.ndarray, sigma: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Media y desviación de la mezcla para cada jugador: (N, K) × (K, Y) → (N, Y).
+    Si un grupo no tiene dato en un año, sus pesos se reparten entre el resto.
+    """
+    available = ~np.isnan(mu)
+    weights = proba[:, :, None] * available[None, :, :]
+    total = weights.sum(axis=1)
+    weights = np.divide(weights, total[:, None, :], out=np.zeros_like(weights), where=total[:, None, :] > 0)
+
+    mu0 = np.nan_to_num(mu)
+    mean = np.einsum("nky,ky->ny", weights, mu0)
+    second = np.einsum("nky,ky->ny", weights, sigma ** 2 + mu0 ** 2)
+    std = np.sqrt(np.clip(second - mean ** 2, 0, None))
+    mean[total == 0] = np.nan
+    std[total == 0] = np.nan
+    return mean, std
+
+
+def mixture_projection(
+    proba: np.ndarray,
+    last_year: np.ndarray,
+    last_rating: np.ndarray,
+    df_curves: pd.DataFrame,
+    classes,
+) -> dict[str, np.ndarray]:
+    """
+    Curva esperada, bandas 25–75 y proyección desplazada al último año real,
+    con la misma regla que `adjust_projection`, para N jugadores a la vez.
+    """
+    years, mu, sigma = curve_tensor(df_curves, classes)
+    mean, std = mix_curves(np.asarray(proba, float), mu, sigma)
+
+    pos = np.searchsorted(years, last_year)
+    on_grid = (pos < len(years)) & (years[np.minimum(pos, len(years) - 1)] == last_year)
+    ref = np.where(on_grid, mean[np.arange(len(mean)), np.minimum(pos, len(years) - 1)], np.nan)
+    shift = np.nan_to_num(np.asarray(last_rating, float) - ref)[:, None]
+
+    return {
+        "years": years,
+        "rating_avg": mean,
+        "rating_p25": mean - P75_Z * std,
+        "rating_p75": mean + P75_Z * std,
+        "projection": mean + shift,
+        "projection_p25": mean + shift - P75_Z * std,
+        "projection_p75": mean + shift + P75_Z * std,
+    }
+
+
+def _last_season(seasonal: pd.DataFrame) -> tuple[int, float]:
+    years = pd.to_numeric(seasonal["year_since_debut"], errors="coerce")
+    last = years.idxmax()
+    return int(years[last]), float(seasonal.loc[last, "rating_per_90"])
+
+
+def project_player_mixture(df_model: pd.DataFrame, seasonal: pd.DataFrame, player_name: str = "", position_group: str | None = None):
+    """
+    Versión probabilística de `project_player`: devuelve (etiqueta, perfil por
+    temporada, curva mezclada, probabilidades por grupo). La curva tiene las
+    mismas columnas que la de un grupo más las bandas de la proyección.
+    """
+    assets = get_model_assets()
+    model, le = assets.model, assets.label_encoder
+    df_curves = curves_for_position(assets.curves, position_group)
+    proba = model.predict_proba(df_model)[:1]
+    classes = le.inverse_transform(model.classes_)
+    probabilities = dict(zip(classes, proba[0]))
+
+    last_year, last_rating = _last_season(seasonal)
+    mix = mixture_projection(proba, np.array([last_year]), np.array([last_rating]), df_curves, classes)
+
+    curve = pd.DataFrame({"peak_group": "mezcla", "year_since_debut": mix["years"]})
+    for col in ["rating_avg", "rating_p25", "rating_p75", "projection", "projection_p25", "projection_p75"]:
+        curve[col] = mix[col][0]
+
+    top = max(probabilities, key=probabilities.get)
+    label = f"{top} ({probabilities[top]:.0%})"
+    print(f"🎲 Probabilidades de {player_name}: { {k: round(float(v), 3) for k, v in probabilities.items()} }")
+
+    seasonal = seasonal.assign(year_since_debut=pd.to_numeric(seasonal["year_since_debut"], errors="coerce").fillna(0).astype(int))
+    seasonal = seasonal[seasonal["year_since_debut"] <= MAX_PROJECTION_YEAR]
+    return label, seasonal, curve, probabilities
+
+
+def project_batch(X_model: pd.DataFrame, careers: pd.DataFrame) -> pd.DataFrame:
+    """
+    Proyección mezclada para todos los jugadores de una matriz de features
+    (índice Player_ID) en formato largo: una fila por jugador y año.
+    """
+    assets = get_model_assets()
+    model, le = assets.model, assets.label_encoder
+    df_curves = curves_for_position(assets.curves)
+    proba = model.predict_proba(X_model)
+    classes = le.inverse_transform(model.classes_)
+
+    last = careers.loc[careers.groupby("Player_ID")["year_since_debut"].idxmax()].set_index("Player_ID").reindex(X_model.index)
+    mix = mixture_projection(proba, last["year_since_debut"].to_numpy(), last["rating_per_90"].to_numpy(), df_curves, classes)
+
+    n, n_years = mix["rating_avg"].shape
+    out = pd.DataFrame({
+        "Player_ID": np.repeat(X_model.index.to_numpy(), n_years),
+        "year_since_debut": np.tile(mix["years"], n),
+    })
+    for col in ["rating_avg", "rating_p25", "rating_p75", "projection", "projection_p25", "projection_p75"]:
+        out[col] = mix[col].ravel()
+    for k, cls in enumerate(classes):
+        out[f"p_{cls}"] = np.repeat(proba[:, k], n_years)
+    return out
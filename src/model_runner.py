@@ -1,6 +1,9 @@
 import pandas as pd
-from player_processing import build_player_df, calculate_rating_per_90, build_annual_profile
+from form import form_columns, latest_form, uses_form
+from player_processing import build_player_df, calculate_rating_per_90, compute_annual_profile
 from model_utils import load_model_assets
+from positions import curves_for_position
+from singleflight import single_flight
 import streamlit as st
 
 # ✅ Función cacheada en vez de variables globales
@@ -8,29 +11,55 @@ import streamlit as st
 def get_model_assets():
     return load_model_assets()
 
+def get_model_features() -> list[str]:
+    """
+    Columnas del modelo sin cargar el modelo (manifest.json o model_features.joblib).
+    """
+    return get_model_assets().features
+
 # -------------------------
 # Preparar input del jugador para el modelo
 # -------------------------
 def prepare_features(player_id: str):
-    df = build_player_df(player_id)
-
+    return prepare_features_from_df(build_player_df(player_id), player_id)
+
+def prepare_features_from_df(df: pd.DataFrame, player_id: str):
+    """
+    Igual que `prepare_features` pero sobre un player_df ya cargado.
+    Trabaja sobre una copia: el DataFrame recibido (p. ej. el de un
+    PlayerContext) no cambia.
+    """
     print(f"\n🧪 HEAD desde Streamlit para {player_id}:")
     print(df[["Date", "Minutes", "Goals", "Assists", "Age"]].head())
 
+    df = df.copy()
     df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
     df = calculate_rating_per_90(df)
-    player_model_df, seasonal_df = build_annual_profile(df)
+    player_model_df, seasonal_df = compute_annual_profile(df)
+
+    # Features con la carrera recortada como al entrenar; seasonal_df sigue completo
+    max_year = get_model_assets().feature_max_year
+    if max_year is not None and df["year_since_debut"].max() > max_year:
+        df = df[df["year_since_debut"] <= max_year].copy()
+        player_model_df, _ = compute_annual_profile(df)
 
     if player_model_df.shape[0] != 1:
         raise ValueError(f"❌ Error: el perfil vectorizado tiene {player_model_df.shape[0]} filas. Esperada 1.")
 
+    model_features = get_model_features()
+
+    # 📈 Modelos entrenados con --form: misma forma reciente que en el entrenamiento
+    if uses_form(model_features) and not df.empty:
+        form = latest_form(df)[form_columns()].reset_index(drop=True)
+        player_model_df = pd.concat([player_model_df, form], axis=1)
+
     X_input = (
         player_model_df
-        .reindex(columns=get_model_assets()[3], fill_value=0)
+        .reindex(columns=model_features, fill_value=0)
         .mean(axis=0)
         .to_frame()
         .T
-        .reindex(columns=get_model_assets()[3], fill_value=0)
+        .reindex(columns=model_features, fill_value=0)
     )
 
     print(f"🧠 Vector model input para {player_id} (Streamlit):")
@@ -43,15 +72,16 @@ def prepare_features(player_id: str):
 # Predecir grupo de evolución
 # -------------------------
 def predict_peak_group(df_model: pd.DataFrame) -> str:
-    model, le, _, _ = get_model_assets()
-    pred = model.predict(df_model)[0]
-    return le.inverse_transform([pred])[0]
+    assets = get_model_assets()
+    pred = assets.model.predict(df_model)[0]
+    return assets.label_encoder.inverse_transform([pred])[0]
 
 # -------------------------
 # Obtener curva del grupo predicho
 # -------------------------
-def get_curve_by_group(group: str) -> pd.DataFrame:
-    _, _, df_curves, _ = get_model_assets()
+def get_curve_by_group(group: str, position_group: str | None = None) -> pd.DataFrame:
+    # Curvas del grupo de posición si el artefacto las trae; si no, las generales
+    df_curves = curves_for_position(get_model_assets().curves, position_group)
     print("🧪 Buscando grupo:", group)
     print("📊 Valores únicos en df_curves:", df_curves['peak_group'].unique())
     return df_curves[df_curves['peak_group'] == group].copy()
@@ -74,17 +104,26 @@ def adjust_projection(group_curve: pd.DataFrame, player_seasonal: pd.DataFrame)
 # -------------------------
 # Predicción completa + ajuste de curva
 # -------------------------
+@single_flight("predict_and_project_player", copy=True)
 def predict_and_project_player(player_id: str):
     from data_loader import load_future_metadata
 
     metadata = load_future_metadata()
-    player_name = metadata[metadata['Player_ID'] == player_id]['Player_name'].values[0]
+    row = metadata[metadata['Player_ID'] == player_id].iloc[0]
     df_model, seasonal = prepare_features(player_id)
+    return project_player(df_model, seasonal, row['Player_name'], row.get('position_group'))
+
+def project_player(df_model: pd.DataFrame, seasonal: pd.DataFrame, player_name: str = "", position_group: str | None = None):
+    """
+    Grupo predicho, perfil por temporada y curva ajustada a partir de las
+    features ya preparadas (ver `prepare_features_from_df`). Devuelve
+    DataFrames nuevos: `seasonal` no se modifica.
+    """
     print("🧪 INPUT final que se envía al modelo:")
     print(df_model.T)
 
     group = predict_peak_group(df_model)
-    curve = get_curve_by_group(group)
+    curve = get_curve_by_group(group, position_group)
 
     try:
         curve = adjust_projection(curve, seasonal)
@@ -92,6 +131,7 @@ def predict_and_project_player(player_id: str):
         print(f"❌ Error en proyección de {player_name}: {e}")
         curve['projection'] = curve['rating_avg']
 
+    seasonal = seasonal.copy()
     seasonal['year_since_debut'] = pd.to_numeric(seasonal['year_since_debut'], errors='coerce').fillna(0).astype(int)
     curve['year_since_debut'] = pd.to_numeric(curve['year_since_debut'], errors='coerce').fillna(0).astype(int)
 
@@ -104,4 +144,3 @@ def predict_and_project_player(player_id: str):
         curve = adjust_projection(curve, seasonal)
 
     return group, seasonal, curve
-
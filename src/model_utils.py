@@ -1,17 +1,112 @@
 # model_utils.py
 
+from functools import cached_property
 from pathlib import Path
+from typing import Any
+import hashlib
+import json
+import threading
 import joblib
 import streamlit as st
 
+MODEL_DIR = Path(__file__).parents[1] / "model"
+
+MODEL_FILES = (
+    "futpeak_model_multi.joblib",
+    "label_encoder.joblib",
+    "curvas_promedio.joblib",
+    "model_features.joblib",
+)
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ModelAssets:
+    """
+    Artefactos del modelo cargados bajo demanda.
+
+    Cada uno se lee la primera vez que se pide y queda compartido por todas
+    las sesiones del proceso. Sin mmap: el clasificador se guarda como texto
+    del booster y las curvas son DataFrames pequeños, así que no habría
+    páginas que compartir y las curvas quedarían en memmaps de solo lectura.
+    La lista de features sale del manifest.json si existe, sin deserializar nada.
+    Se puede desempaquetar como la tupla de antes: (modelo, le, curvas, columnas).
+    """
+
+    def __init__(self, model_dir: Path = MODEL_DIR):
+        self.model_dir = Path(model_dir)
+        self._values: dict[str, Any] = {}
+        self._locks = {name: threading.Lock() for name in MODEL_FILES}
+
+    def _load(self, filename: str) -> Any:
+        if filename not in self._values:
+            with self._locks[filename]:
+                if filename not in self._values:
+                    self._values[filename] = joblib.load(self.model_dir / filename)
+        return self._values[filename]
+
+    @property
+    def model(self):
+        return self._load("futpeak_model_multi.joblib")
+
+    @property
+    def label_encoder(self):
+        return self._load("label_encoder.joblib")
+
+    @property
+    def curves(self):
+        return self._load("curvas_promedio.joblib")
+
+    @property
+    def features(self) -> list[str]:
+        features = self.manifest.get("model_features")
+        return list(features) if features else list(self._load("model_features.joblib"))
+
+    @cached_property
+    def manifest(self) -> dict:
+        path = self.model_dir / MANIFEST_NAME
+        if not path.exists():
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    @property
+    def feature_max_year(self) -> int | None:
+        """
+        Último año desde el debut que ven las features al entrenar (manifest);
+        None si no consta, y entonces se usa la carrera completa.
+        """
+        return self.manifest.get("feature_max_year")
+
+    def loaded(self) -> list[str]:
+        return [name for name in MODEL_FILES if name in self._values]
+
+    def load_all(self) -> "ModelAssets":
+        for name in MODEL_FILES:
+            self._load(name)
+        return self
+
+    def __iter__(self):
+        return iter((self.model, self.label_encoder, self.curves, self.features))
+
+
 @st.cache_resource
-def load_model_assets(model_dir: Path = Path(__file__).parents[1] / "model"):
+def load_model_assets(model_dir: Path = MODEL_DIR) -> ModelAssets:
+    """
+    Artefactos del modelo compartidos por todas las sesiones del proceso
+    (modelo, label encoder, curvas promedio y columnas), cargados bajo demanda.
+    """
+    return ModelAssets(model_dir)
+
+def get_model_version(model_dir: Path = MODEL_DIR) -> str:
     """
-    Carga el modelo de clasificación, label encoder, curvas promedio y columnas del modelo.
-    Retorna una tupla con (modelo, label encoder, curvas, columnas).
+    Huella corta de los artefactos del modelo (tamaño y fecha de modificación).
     """
-    model = joblib.load(model_dir / "futpeak_model_multi.joblib")
-    le = joblib.load(model_dir / "label_encoder.joblib")
-    df_curves = joblib.load(model_dir / "curvas_promedio.joblib")
-    model_features = joblib.load(model_dir / "model_features.joblib")
-    return model, le, df_curves, model_features
+    h = hashlib.sha1()
+    for name in MODEL_FILES:
+        try:
+            stat = (model_dir / name).stat()
+            h.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        except OSError:
+            h.update(f"{name}:missing".encode())
+    return h.hexdigest()[:12]
@@ -0,0 +1,143 @@
+# src/percentiles.py
+#
+# Percentiles frente a jugadores históricos del mismo año desde el debut y
+# grupo de posición. Las distribuciones se ordenan una vez; cada consulta es
+# una búsqueda binaria (np.searchsorted).
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from analytics import assign_position_group, compute_rating
+from data_loader import load_cleaned_matchlogs, load_cleaned_metadata
+from positions import position_groups_by_player
+
+METRICS = ["rating_per_90", "Minutes", "G+A"]
+ALL_POSITIONS = "ALL"
+# Con menos temporadas que esto en un grupo de posición se usa el año completo
+MIN_SAMPLES = 20
+_RATING_INPUTS = ['Goals', 'Assists', 'Shots', 'Shots_on_target', 'Yellow_cards', 'Red_cards', 'Minutes']
+
+
+def season_table(
+    matchlogs: pd.DataFrame,
+    position_groups: pd.Series | None = None,
+    rating_by_position: bool = False,
+) -> pd.DataFrame:
+    """
+    Una fila por jugador y año desde el debut con rating medio, minutos y G+A,
+    con la misma definición de año que `compute_annual_profile`.
+    `position_groups` es una Series Player_ID → grupo de posición; con
+    `rating_by_position` el rating usa los pesos de ese grupo.
+    """
+    df = pd.DataFrame({"Player_ID": matchlogs["Player_ID"].values})
+    date = pd.to_datetime(matchlogs["Date"], errors="coerce").values
+    for col in _RATING_INPUTS:
+        df[col] = pd.to_numeric(matchlogs[col], errors="coerce").fillna(0).values if col in matchlogs else 0
+
+    natural_year = pd.Series(pd.DatetimeIndex(date).year, index=df.index)
+    debut = natural_year.where(df["Minutes"] > 0).groupby(df["Player_ID"]).transform("min")
+    df["year_since_debut"] = natural_year - debut + 1
+    groups = position_groups if position_groups is not None else pd.Series(dtype=str)
+    df["rating_per_90"] = compute_rating(df, df["Player_ID"].map(groups) if rating_by_position else None)
+
+    seasons = (
+        df.dropna(subset=["year_since_debut"])
+        .groupby(["Player_ID", "year_since_debut"])
+        .agg(rating_per_90=("rating_per_90", "mean"), Minutes=("Minutes", "sum"),
+             Goals=("Goals", "sum"), Assists=("Assists", "sum"))
+        .reset_index()
+    )
+    seasons["year_since_debut"] = seasons["year_since_debut"].astype(int)
+    seasons["G+A"] = seasons["Goals"] + seasons["Assists"]
+    seasons["position_group"] = seasons["Player_ID"].map(groups).fillna("UNKNOWN")
+    return seasons
+
+
+class PercentileEngine:
+    """
+    Distribuciones ordenadas por (métrica, year_since_debut, grupo de posición).
+    """
+
+    def __init__(self, seasons: pd.DataFrame, min_samples: int = MIN_SAMPLES, rating_by_position: bool = False):
+        self.min_samples = min_samples
+        self.rating_by_position = rating_by_position
+        self._arrays: dict[tuple[str, int, str], np.ndarray] = {}
+        for (year, group), block in seasons.groupby(["year_since_debut", "position_group"]):
+            for metric in METRICS:
+                self._arrays[(metric, int(year), group)] = np.sort(block[metric].dropna().to_numpy(float))
+        for year, block in seasons.groupby("year_since_debut"):
+            for metric in METRICS:
+                self._arrays[(metric, int(year), ALL_POSITIONS)] = np.sort(block[metric].dropna().to_numpy(float))
+
+    def distribution(self, metric: str, year: int, position_group: str = ALL_POSITIONS) -> np.ndarray:
+        arr = self._arrays.get((metric, int(year), position_group))
+        if arr is None or len(arr) < self.min_samples:
+            arr = self._arrays.get((metric, int(year), ALL_POSITIONS))
+        return arr if arr is not None else np.empty(0)
+
+    def percentile(self, metric: str, year: int, position_group: str, values) -> np.ndarray:
+        """
+        Percentil (0-100) de cada valor; los empates cuentan como medio rango.
+        """
+        arr = self.distribution(metric, year, position_group)
+        values = np.asarray(values, dtype=float)
+        if len(arr) == 0:
+            return np.full(values.shape, np.nan)
+        left = np.searchsorted(arr, values, side="left")
+        right = np.searchsorted(arr, values, side="right")
+        return (left + right) / 2 / len(arr) * 100
+
+    def rank(self, seasons: pd.DataFrame) -> pd.DataFrame:
+        """
+        Percentiles en lote para una tabla como la de `season_table`:
+        añade una columna `pct_<métrica>` por métrica.
+        """
+        out = seasons.copy()
+        for metric in METRICS:
+            out[f"pct_{metric}"] = np.nan
+        for (year, group), idx in out.groupby(["year_since_debut", "position_group"]).groups.items():
+            for metric in METRICS:
+                out.loc[idx, f"pct_{metric}"] = self.percentile(metric, year, group, out.loc[idx, metric])
+        return out
+
+
+def build_percentile_engine(matchlogs: pd.DataFrame, metadata: pd.DataFrame, rating_by_position: bool = False) -> PercentileEngine:
+    positions = position_groups_by_player(metadata).astype(str)
+    seasons = season_table(matchlogs, positions, rating_by_position=rating_by_position)
+    return PercentileEngine(seasons, rating_by_position=rating_by_position)
+
+
+# Se pide con get_base_data_version(): el histórico es común a todos los
+# tenants, así que basta la versión actual y la anterior durante un cambio
+@st.cache_resource(max_entries=2)
+def get_percentile_engine(data_version: str) -> PercentileEngine:
+    """
+    Motor construido sobre el histórico (cleaned_*). La versión de datos solo
+    forma parte de la clave de caché.
+    """
+    engine = build_percentile_engine(load_cleaned_matchlogs(), load_cleaned_metadata())
+    print(f"📐 Percentiles precalculados: {len(engine._arrays)} distribuciones")
+    return engine
+
+
+def latest_season_percentiles(player_df: pd.DataFrame, position: str | None, engine: PercentileEngine) -> dict:
+    """
+    Percentiles del último año desde el debut de un jugador.
+    """
+    group = assign_position_group(position)
+    # Mismos pesos de rating que las distribuciones del motor
+    seasons = season_table(
+        player_df,
+        pd.Series(group, index=player_df["Player_ID"].unique()),
+        rating_by_position=engine.rating_by_position,
+    )
+    if seasons.empty:
+        return {}
+    last = engine.rank(seasons.tail(1)).iloc[0]
+    return {
+        "Año de referencia": int(last["year_since_debut"]),
+        "Percentil rating/90": last["pct_rating_per_90"],
+        "Percentil minutos": last["pct_Minutes"],
+        "Percentil G+A": last["pct_G+A"],
+    }
@@ -0,0 +1,91 @@
+# src/player_context.py
+
+from functools import cached_property
+
+import pandas as pd
+
+from data_loader import load_future_metadata
+from form import latest_form
+from mixture import project_player_mixture
+from model_runner import prepare_features_from_df, project_player
+from player_processing import build_player_df, compute_stats_by_year, summarize_basic_stats
+from singleflight import single_flight
+
+
+class PlayerContext:
+    """
+    Datos de un jugador para un renderizado de página.
+
+    Cada pieza (matchlogs, estadísticas anuales, features, predicción y curva)
+    se calcula una sola vez al pedirla y la comparten app, stats y descriptions.
+    Los DataFrames son del contexto: quien los consume no debe mutarlos.
+    """
+
+    def __init__(self, player_id: str):
+        self.player_id = player_id
+
+    @cached_property
+    def name(self) -> str:
+        metadata = load_future_metadata()
+        names = metadata.loc[metadata["Player_ID"] == self.player_id, "Player_name"].values
+        return names[0] if len(names) else self.player_id
+
+    @cached_property
+    def position(self) -> str | None:
+        metadata = load_future_metadata()
+        positions = metadata.loc[metadata["Player_ID"] == self.player_id, "Position"].values
+        return positions[0] if len(positions) else None
+
+    @cached_property
+    def position_group(self) -> str:
+        metadata = load_future_metadata()
+        groups = metadata.loc[metadata["Player_ID"] == self.player_id, "position_group"].values
+        return str(groups[0]) if len(groups) else "UNKNOWN"
+
+    @cached_property
+    def player_df(self) -> pd.DataFrame:
+        # build_player_df entrega una copia propia (copy=True): no hace falta otra
+        return build_player_df(self.player_id)
+
+    @cached_property
+    def yearly_stats(self) -> pd.DataFrame:
+        return compute_stats_by_year(self.player_df)
+
+    @cached_property
+    def summary(self) -> pd.DataFrame:
+        return summarize_basic_stats(self.player_df, self.position)
+
+    @cached_property
+    def form(self) -> pd.Series:
+        """
+        Forma tras el último partido (columnas `form_*` de `latest_form`).
+        """
+        form = latest_form(self.player_df)
+        return form.iloc[-1] if len(form) else pd.Series(dtype=float)
+
+    @cached_property
+    def features(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        return prepare_features_from_df(self.player_df, self.player_id)
+
+    @cached_property
+    def prediction(self) -> tuple[str, pd.DataFrame, pd.DataFrame]:
+        """
+        (grupo, perfil por temporada, curva ajustada), como `predict_and_project_player`.
+        """
+        return _predict(self)
+
+    @cached_property
+    def prediction_mixture(self) -> tuple[str, pd.DataFrame, pd.DataFrame, dict]:
+        """
+        (etiqueta, perfil por temporada, curva mezclada, probabilidades por grupo).
+        """
+        X_input, seasonal = self.features
+        return project_player_mixture(X_input, seasonal, self.name, self.position_group)
+
+
+# Sesiones que abren el mismo jugador a la vez comparten una predicción;
+# cada una recibe sus propios DataFrames (copy=True)
+@single_flight("player_context_prediction", key=lambda ctx: ctx.player_id, copy=True)
+def _predict(ctx: PlayerContext):
+    X_input, seasonal = ctx.features
+    return project_player(X_input, seasonal, ctx.name, ctx.position_group)
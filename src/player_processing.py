@@ -2,11 +2,15 @@ from typing import Tuple
 from pandas import DataFrame
 import pandas as pd
 from data_loader import load_future_matchlogs, load_future_metadata
-from analytics import compute_rating_row
+from analytics import compute_rating
+from cache_policy import bounded_cache, frame_key
+from data_loader import get_base_data_version
+from percentiles import get_percentile_engine, latest_season_percentiles
+from positions import translate_position
 import streamlit as st
 
 
-@st.cache_data
+@bounded_cache("build_player_df", key=lambda player_id: player_id, max_entries=256, copy=True)
 def build_player_df(player_id: str) -> DataFrame:
     """
     Carga y prepara los datos de matchlogs para un jugador.
@@ -37,11 +41,15 @@ def build_player_df(player_id: str) -> DataFrame:
 def calculate_rating_per_90(player_df: DataFrame) -> DataFrame:
     cols = ['Goals', 'Assists', 'Shots', 'Shots_on_target', 'Yellow_cards', 'Red_cards', 'Minutes']
     player_df[cols] = player_df[cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-    player_df["rating_per_90"] = player_df.apply(compute_rating_row, axis=1)
+    player_df["rating_per_90"] = compute_rating(player_df)
     return player_df
 
-@st.cache_data
-def summarize_basic_stats(player_df: DataFrame) -> DataFrame:
+@bounded_cache("summarize_basic_stats", key=lambda player_df, position=None: (frame_key(player_df), position), max_entries=256)
+def summarize_basic_stats(player_df: DataFrame, position: str | None = None) -> DataFrame:
+    """
+    Totales de carrera y, si hay histórico, percentiles del último año
+    frente a jugadores de su misma posición y año desde el debut.
+    """
     cols = ['Goals', 'Assists', 'Minutes', 'Yellow_cards', 'Red_cards']
     player_df[cols] = player_df[cols].apply(pd.to_numeric, errors='coerce').fillna(0)
 
@@ -57,7 +65,7 @@ def summarize_basic_stats(player_df: DataFrame) -> DataFrame:
     assists_per_90 = total_assists / (total_minutes / 90) if total_minutes > 0 else 0
     ga_per_90 = total_ga / (total_minutes / 90) if total_minutes > 0 else 0
 
-    return pd.DataFrame({
+    summary = pd.DataFrame({
         'Total partidos': [total_matches],
         'Minutos totales': [total_minutes],
         'Goles': [total_goals],
@@ -70,8 +78,26 @@ def summarize_basic_stats(player_df: DataFrame) -> DataFrame:
         'G+A/90': [ga_per_90],
     })
 
-@st.cache_data
+    try:
+        peers = latest_season_percentiles(player_df, position, get_percentile_engine(get_base_data_version()))
+    except Exception as e:
+        print(f"⚠️ Percentiles no disponibles: {e}")
+        peers = {}
+    for col, value in peers.items():
+        summary[col] = [value]
+    return summary
+
+@bounded_cache("build_annual_profile", key=frame_key, max_entries=256)
 def build_annual_profile(player_df: DataFrame) -> Tuple[DataFrame, DataFrame]:
+    player_model_df, career_df = compute_annual_profile(player_df)
+    print(f"✅ Filas finales en player_model_df: {player_model_df.shape[0]}")
+    return player_model_df, career_df
+
+def compute_annual_profile(player_df: DataFrame) -> Tuple[DataFrame, DataFrame]:
+    """
+    Perfil anual vectorizado de un jugador (sin caché).
+    Es el mismo cálculo que usa la app y el que reutiliza el entrenamiento.
+    """
     player_df = calculate_rating_per_90(player_df)
     player_df['Natural_year'] = player_df['Date'].dt.year
     debut_year = player_df.loc[player_df['Minutes'] > 0, 'Natural_year'].min()
@@ -110,7 +136,6 @@ def build_annual_profile(player_df: DataFrame) -> Tuple[DataFrame, DataFrame]:
     )
 
     player_model_df = pd.concat([pivot_rating, pivot_age, pivot_minutes], axis=1)
-    print(f"✅ Filas finales en player_model_df: {player_model_df.shape[0]}")
 
     for col1, col2, new in [
         ('rating_year_2', 'rating_year_1', 'growth_2_1'),
@@ -131,19 +156,25 @@ def build_annual_profile(player_df: DataFrame) -> Tuple[DataFrame, DataFrame]:
 
     return player_model_df, career_df
 
-@st.cache_data
+@bounded_cache("aggregate_stats_by_year", key=frame_key, max_entries=256)
 def aggregate_stats_by_year(player_df: DataFrame) -> DataFrame:
     df = player_df.copy()
     df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
     df['Minutes'] = pd.to_numeric(df['Minutes'], errors='coerce').fillna(0)
     df['Goals'] = pd.to_numeric(df['Goals'], errors='coerce').fillna(0)
     df['Assists'] = pd.to_numeric(df['Assists'], errors='coerce').fillna(0)
+    return compute_stats_by_year(df)
 
-    df['Natural_year'] = df['Date'].dt.year
-    debut_year = df.loc[df['Minutes'] > 0, 'Natural_year'].min()
-    df['year_since_debut'] = df['Natural_year'] - debut_year + 1
+def compute_stats_by_year(df: DataFrame) -> DataFrame:
+    """
+    Goles, asistencias, minutos y partidos por año desde el debut.
+    Espera un player_df ya tipado (como el de `build_player_df`) y no lo copia.
+    """
+    natural_year = df['Date'].dt.year
+    debut_year = natural_year[df['Minutes'] > 0].min()
+    year_since_debut = (natural_year - debut_year + 1).rename('year_since_debut')
 
-    stats = df.groupby('year_since_debut').agg(
+    stats = df.groupby(year_since_debut).agg(
         Goals=('Goals','sum'),
         Assists=('Assists','sum'),
         Minutes=('Minutes','sum'),
@@ -152,21 +183,12 @@ def aggregate_stats_by_year(player_df: DataFrame) -> DataFrame:
     stats['G+A'] = stats['Goals'] + stats['Assists']
     return stats
 
-@st.cache_data
+@bounded_cache("get_player_stats", key=lambda player_id: player_id, max_entries=256)
 def get_player_stats(player_id: str) -> DataFrame:
     df = build_player_df(player_id)
     return aggregate_stats_by_year(df)
 
-@st.cache_data
+@st.cache_data(max_entries=512)
 def traducir_posicion(pos_raw: str) -> str:
-    position_map = {
-        'AM': 'Mediocentro ofensivo',
-        'ST': 'Delantero centro',
-        'MF': 'Centrocampista',
-        'RW': 'Extremo derecho'
-    }
-
-    if not pos_raw or pd.isna(pos_raw):
-        return "Desconocida"
-
-    return position_map.get(pos_raw.strip(), pos_raw.strip())
+    # Compuestas ("FW-MF") y con detalle ("MF (AM)"), ver positions.POSITION_NAMES
+    return translate_position(pos_raw)
@@ -0,0 +1,153 @@
+# src/positions.py
+#
+# Posiciones: de la cadena de FBref ("FW-MF", "MF (AM)", "DF,MF") al grupo de
+# posición, en una sola pasada vectorizada sobre toda la tabla de metadatos.
+# Se comparan códigos completos, no subcadenas: "DM" es centrocampista aunque
+# contenga una "D", y "FW" no cae en cualquier código que lleve una "F".
+# La posición principal es el primer código; el resto son secundarias.
+
+import re
+
+import pandas as pd
+
+POSITION_GROUPS = ["GOALKEEPER", "DEFENSIVE", "MIDFIELD", "ATTACKING", "UNKNOWN"]
+POSITION_GROUP_DTYPE = pd.CategoricalDtype(POSITION_GROUPS)
+
+CODE_GROUPS = {
+    "GK": "GOALKEEPER",
+    **dict.fromkeys(["DF", "D", "CB", "LB", "RB", "FB", "WB", "LWB", "RWB", "SW"], "DEFENSIVE"),
+    **dict.fromkeys(["MF", "M", "CM", "DM", "AM", "LM", "RM", "CDM", "CAM"], "MIDFIELD"),
+    **dict.fromkeys(["FW", "F", "CF", "ST", "S", "LW", "RW", "W", "WF", "IF", "SS", "OL", "OR"], "ATTACKING"),
+}
+
+POSITION_NAMES = {
+    "GK": "Portero",
+    "DF": "Defensa",
+    "D": "Defensa",
+    "CB": "Defensa central",
+    "LB": "Lateral izquierdo",
+    "RB": "Lateral derecho",
+    "FB": "Lateral",
+    "WB": "Carrilero",
+    "LWB": "Carrilero izquierdo",
+    "RWB": "Carrilero derecho",
+    "SW": "Líbero",
+    "MF": "Centrocampista",
+    "M": "Centrocampista",
+    "CM": "Mediocentro",
+    "DM": "Mediocentro defensivo",
+    "CDM": "Mediocentro defensivo",
+    "AM": "Mediocentro ofensivo",
+    "CAM": "Mediocentro ofensivo",
+    "LM": "Interior izquierdo",
+    "RM": "Interior derecho",
+    "FW": "Delantero",
+    "F": "Delantero",
+    "CF": "Delantero centro",
+    "ST": "Delantero centro",
+    "S": "Delantero centro",
+    "SS": "Segundo delantero",
+    "LW": "Extremo izquierdo",
+    "RW": "Extremo derecho",
+    "OL": "Extremo izquierdo",
+    "OR": "Extremo derecho",
+    "W": "Extremo",
+    "WF": "Extremo",
+    "IF": "Delantero interior",
+}
+
+_CODES = r"[A-Za-z]+"
+_PRIMARY = re.compile(rf"^\W*({_CODES})")
+_DETAIL = re.compile(rf"\(\s*({_CODES})")
+
+
+def position_codes(positions: pd.Series) -> pd.DataFrame:
+    """
+    Códigos de cada cadena: principal (primer código) y detalle (el que va
+    entre paréntesis, p. ej. "AM" en "MF (AM)"), en mayúsculas.
+    """
+    text = positions.astype("string").str.upper()
+    return pd.DataFrame({
+        "primary": text.str.extract(_PRIMARY, expand=False),
+        "detail": text.str.extract(_DETAIL, expand=False),
+    }, index=positions.index)
+
+
+def classify_positions(positions: pd.Series) -> pd.Series:
+    """
+    Grupo de posición categórico (POSITION_GROUP_DTYPE) de cada cadena. Si el
+    código principal no se reconoce, se usa el del paréntesis.
+    """
+    codes = position_codes(positions)
+    primary = codes["primary"].map(CODE_GROUPS).astype(POSITION_GROUP_DTYPE)
+    detail = codes["detail"].map(CODE_GROUPS).astype(POSITION_GROUP_DTYPE)
+    return primary.where(primary.notna(), detail).fillna("UNKNOWN")
+
+
+def position_group(position) -> str:
+    """
+    Versión escalar de `classify_positions`: mismas reglas, búsqueda directa
+    en CODE_GROUPS sin construir una Series.
+    """
+    if not isinstance(position, str):
+        return "UNKNOWN"
+    text = position.upper()
+    for pattern in (_PRIMARY, _DETAIL):
+        match = pattern.search(text)
+        if match and match.group(1) in CODE_GROUPS:
+            return CODE_GROUPS[match.group(1)]
+    return "UNKNOWN"
+
+
+def add_position_groups(metadata: pd.DataFrame) -> pd.DataFrame:
+    """
+    Añade `position_group` a la tabla de metadatos (una vez, al cargarla).
+    """
+    metadata["position_group"] = classify_positions(metadata["Position"]) if "Position" in metadata else "UNKNOWN"
+    return metadata
+
+
+def position_groups_by_player(metadata: pd.DataFrame) -> pd.Series:
+    """
+    Series Player_ID → grupo de posición; reutiliza la columna si ya existe.
+    """
+    info = metadata.drop_duplicates("Player_ID").set_index("Player_ID")
+    if "position_group" in info:
+        return info["position_group"]
+    return classify_positions(info["Position"])
+
+
+def translate_position(position) -> str:
+    """
+    Nombre en castellano de una cadena de posición: "FW-MF" → "Delantero /
+    Centrocampista", "MF (AM)" → "Centrocampista (Mediocentro ofensivo)".
+    Los códigos desconocidos se dejan tal cual.
+    """
+    if not isinstance(position, str) or not position.strip():
+        return "Desconocida"
+    text = position.strip()
+    main, _, detail = text.partition("(")
+    names = [POSITION_NAMES.get(code.upper(), code) for code in re.findall(_CODES, main)]
+    label = " / ".join(names) if names else text
+    detail_codes = re.findall(_CODES, detail)
+    if detail_codes:
+        label += " (" + ", ".join(POSITION_NAMES.get(code.upper(), code) for code in detail_codes) + ")"
+    return label
+
+
+# -------------------------
+# Selección de curvas por grupo de posición
+# -------------------------
+ALL_POSITIONS = "ALL"
+
+
+def curves_for_position(df_curves: pd.DataFrame, group: str | None = None) -> pd.DataFrame:
+    """
+    Curvas de `group` si el artefacto trae curvas por posición (columna
+    `position_group`) y las hay para ese grupo; si no, las generales.
+    """
+    if "position_group" not in df_curves:
+        return df_curves
+    available = set(df_curves["position_group"].astype(str))
+    key = group if group in available else ALL_POSITIONS
+    return df_curves[df_curves["position_group"] == key].drop(columns="position_group").reset_index(drop=True)
@@ -0,0 +1,324 @@
+# src/reports.py
+#
+# Informes de scouting por jugador en HTML autocontenido (CSS en línea e
+# imágenes en base64) o PDF (matplotlib PdfPages, sin dependencias nuevas):
+# perfil, resumen de `summarize_basic_stats`, las tres gráficas de `stats`,
+# proyección y texto de conclusiones.
+#
+#   python reports.py --players all --format html --jobs 8
+#   python reports.py --players f000001 f000002 --format pdf --text llm
+#   python reports.py --players all --template mi_plantilla.txt
+#
+# El texto sale por defecto de una plantilla local (sin red); con --text llm
+# se piden las conclusiones a la IA desde el proceso principal, con el
+# cliente compartido y su límite de ritmo. El render va en un pool de
+# procesos: matplotlib no es seguro entre hilos, y cada worker reutiliza sus
+# cachés (PlayerContext, figuras, percentiles) para todo su bloque.
+
+import argparse
+import base64
+import html
+import io
+import textwrap
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from string import Template
+
+import matplotlib
+matplotlib.use("Agg")
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from data_loader import BASE_DIR, load_future_metadata
+from player_context import PlayerContext
+from player_processing import traducir_posicion
+from positions import POSITION_GROUPS
+from stats import FIGURE_LOCK, plot_minutes_per_year, plot_player_stats, plot_rating_projection
+from tenants import DEFAULT_TENANT, current_tenant, use_tenant
+
+REPORTS_DIR = BASE_DIR.parent / "reports"
+FORMATS = ("html", "pdf")
+TEXT_MODES = ("template", "llm")
+FIGURE_BG = "#0e1117"
+CHUNK_SIZE = 20
+
+DEFAULT_TEXT_TEMPLATE = (
+    "$name ($position, $club) lleva $seasons temporadas desde su debut. El modelo lo sitúa en el "
+    "grupo «$group». Suma $minutes minutos y $ga goles + asistencias ($ga90 G+A/90). "
+    "Su rating por 90 en la última temporada es $current_rating y la proyección ajustada "
+    "alcanza un pico de $projected_peak. $percentile_sentence"
+)
+
+HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Futpeak · $name</title>
+<style>
+  body { background: $bg; color: #f0f0f0; font-family: Inter, Arial, sans-serif; margin: 2rem auto; max-width: 1000px; }
+  h1 { margin-bottom: 0.2rem; }
+  .meta { color: #bbb; margin-bottom: 1.5rem; }
+  .card { background: rgba(255,255,255,0.05); border-radius: 10px; padding: 1rem 1.5rem; margin-bottom: 1.5rem; }
+  table { border-collapse: collapse; width: 100%; }
+  td, th { border-bottom: 1px solid #333; padding: 0.35rem 0.5rem; text-align: left; }
+  img { width: 100%; }
+  footer { color: #777; font-size: 0.8rem; }
+</style>
+</head>
+<body>
+<h1>$name</h1>
+<div class="meta">$position · $club · $age años · $nationality</div>
+<div class="card"><h2>📊 Resumen</h2>$summary</div>
+<div class="card"><h2>📈 Proyección: $group</h2><img src="data:image/png;base64,$fig_projection"></div>
+<div class="card"><h2>⚽ Goles y asistencias por año</h2><img src="data:image/png;base64,$fig_stats"></div>
+<div class="card"><h2>⏱️ Minutos por año</h2><img src="data:image/png;base64,$fig_minutes"></div>
+<div class="card"><h2>🌠 Conclusiones</h2><p>$conclusion</p></div>
+<footer>Generado por Futpeak el $date</footer>
+</body>
+</html>
+""")
+
+
+# -------------------------
+# Datos del informe
+# -------------------------
+def _fmt(value, digits: int = 2) -> str:
+    try:
+        return f"{float(value):,.{digits}f}".replace(",", " ")
+    except (TypeError, ValueError):
+        return "N/A"
+
+
+def report_fields(ctx: PlayerContext) -> dict:
+    """
+    Valores que usan la plantilla de texto y la de HTML.
+    """
+    metadata = load_future_metadata()
+    meta = metadata[metadata["Player_ID"] == ctx.player_id].iloc[0].to_dict()
+    summary = ctx.summary.iloc[0]
+    label, seasonal, curve = ctx.prediction
+    seasonal = seasonal.sort_values("year_since_debut")
+    percentile = summary.get("Percentil rating/90")
+    age = str(meta.get("Age", "N/A"))
+    return {
+        "name": ctx.name,
+        "position": traducir_posicion(meta.get("Position")),
+        "position_group": ctx.position_group,
+        "club": meta.get("Club") or "Sin club",
+        "age": age.split("-")[0] if "-" in age else age,
+        "nationality": meta.get("Nationality") or "",
+        "group": label,
+        "seasons": int(seasonal["year_since_debut"].max()),
+        "minutes": _fmt(summary["Minutos totales"], 0),
+        "ga": _fmt(summary["G+A"], 0),
+        "ga90": _fmt(summary["G+A/90"]),
+        "current_rating": _fmt(seasonal["rating_per_90"].iloc[-1]),
+        "projected_peak": _fmt(curve["projection"].max() if "projection" in curve else None),
+        "percentile_sentence": (
+            f"Frente a jugadores de su posición en el mismo año desde el debut, su rating está en el percentil {percentile:.0f}."
+            if pd.notna(percentile) else ""
+        ),
+    }
+
+
+def template_text(fields: dict, template: str = DEFAULT_TEXT_TEMPLATE) -> str:
+    return Template(template).safe_substitute(fields)
+
+
+def _figure_png(fig) -> str:
+    buffer = io.BytesIO()
+    with FIGURE_LOCK:
+        fig.savefig(buffer, format="png", dpi=110, facecolor=FIGURE_BG, bbox_inches="tight")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def _figures(ctx: PlayerContext) -> dict:
+    label, seasonal, curve = ctx.prediction
+    return {
+        "fig_projection": plot_rating_projection(ctx.name, seasonal, curve, label),
+        "fig_stats": plot_player_stats(ctx.player_id, _ctx=ctx),
+        "fig_minutes": plot_minutes_per_year(ctx.player_id, _ctx=ctx),
+    }
+
+
+def _summary_html(summary: pd.DataFrame) -> str:
+    row = summary.iloc[0]
+    cells = "".join(
+        f"<tr><th>{html.escape(str(col))}</th><td>{html.escape(_fmt(value, 0 if float(value).is_integer() else 2))}</td></tr>"
+        for col, value in row.items() if pd.notna(value)
+    )
+    return f"<table>{cells}</table>"
+
+
+# -------------------------
+# Render de un jugador
+# -------------------------
+def render_html(ctx: PlayerContext, fields: dict, conclusion: str) -> str:
+    figures = {name: _figure_png(fig) if fig is not None else "" for name, fig in _figures(ctx).items()}
+    escaped = {key: html.escape(str(value)) for key, value in fields.items()}
+    return HTML_TEMPLATE.safe_substitute(
+        escaped,
+        bg=FIGURE_BG,
+        summary=_summary_html(ctx.summary),
+        conclusion=html.escape(conclusion).replace("\n", "<br>"),
+        date=time.strftime("%d/%m/%Y"),
+        **figures,
+    )
+
+
+def render_pdf(ctx: PlayerContext, fields: dict, conclusion: str, path: Path) -> None:
+    with PdfPages(path) as pdf:
+        page = Figure(figsize=(8.27, 11.69), facecolor=FIGURE_BG)
+        lines = [
+            (fields["name"], 20, "bold"),
+            (f"{fields['position']} · {fields['club']} · {fields['age']} años", 11, "normal"),
+            ("", 10, "normal"),
+            *[(f"{col}: {_fmt(value)}", 10, "normal") for col, value in ctx.summary.iloc[0].items() if pd.notna(value)],
+            ("", 10, "normal"),
+            (f"Grupo predicho: {fields['group']}", 12, "bold"),
+        ]
+        y = 0.95
+        for text, size, weight in lines:
+            page.text(0.08, y, text, fontsize=size, fontweight=weight, color="white", va="top")
+            y -= 0.028 if size <= 11 else 0.04
+        page.text(0.08, y - 0.02, "Conclusiones", fontsize=13, fontweight="bold", color="white", va="top")
+        page.text(0.08, y - 0.06, _wrap(conclusion, 95), fontsize=9.5, color="white", va="top", linespacing=1.5)
+        pdf.savefig(page, facecolor=FIGURE_BG)
+        for fig in _figures(ctx).values():
+            if fig is not None:
+                with FIGURE_LOCK:
+                    pdf.savefig(fig, facecolor=FIGURE_BG, bbox_inches="tight")
+
+
+def _wrap(text: str, width: int) -> str:
+    return "\n".join(textwrap.fill(par, width) for par in text.splitlines() if par.strip())
+
+
+def render_report(player_id: str, output_dir: Path, fmt: str = "html", conclusion: str | None = None, template: str = DEFAULT_TEXT_TEMPLATE) -> Path:
+    """
+    Escribe el informe de un jugador y devuelve su ruta. Sin `conclusion`
+    se usa la plantilla de texto.
+    """
+    ctx = PlayerContext(player_id)
+    fields = report_fields(ctx)
+    text = conclusion or template_text(fields, template)
+    path = Path(output_dir) / f"{player_id}.{fmt}"
+    if fmt == "pdf":
+        render_pdf(ctx, fields, text, path)
+    else:
+        path.write_text(render_html(ctx, fields, text), encoding="utf-8")
+    return path
+
+
+def _render_chunk(player_ids: list[str], output_dir: Path, fmt: str, conclusions: dict, template: str, tenant: str) -> list[dict]:
+    with use_tenant(tenant):
+        return _render_players(player_ids, output_dir, fmt, conclusions, template)
+
+
+def _render_players(player_ids: list[str], output_dir: Path, fmt: str, conclusions: dict, template: str) -> list[dict]:
+    rows = []
+    for player_id in player_ids:
+        start = time.perf_counter()
+        try:
+            path = render_report(player_id, output_dir, fmt, conclusions.get(player_id), template)
+            rows.append({"Player_ID": player_id, "path": str(path), "seconds": time.perf_counter() - start, "error": None})
+        except Exception as e:
+            print(f"⚠️ Informe de {player_id} no generado: {e}")
+            rows.append({"Player_ID": player_id, "path": None, "seconds": time.perf_counter() - start, "error": str(e)})
+    return rows
+
+
+# -------------------------
+# Lote
+# -------------------------
+def llm_conclusions(player_ids: list[str], max_workers: int = 8) -> dict[str, str]:
+    """
+    Conclusiones de la IA para varios jugadores. Hilos en el proceso principal:
+    es espera de red y así todos pasan por el mismo TokenBucket.
+    """
+    from descriptions import generar_conclusion_completa
+
+    tenant = current_tenant()
+
+    def conclusion(player_id: str) -> str:
+        with use_tenant(tenant):
+            return generar_conclusion_completa(player_id)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="futpeak-report-llm") as pool:
+        return dict(zip(player_ids, pool.map(conclusion, player_ids)))
+
+
+def generate_reports(
+    player_ids: list[str],
+    output_dir: Path = REPORTS_DIR,
+    fmt: str = "html",
+    text: str = "template",
+    template: str = DEFAULT_TEXT_TEMPLATE,
+    n_jobs: int = -1,
+    chunk_size: int = CHUNK_SIZE,
+) -> pd.DataFrame:
+    """
+    Informes de todos los jugadores en paralelo (bloques de `chunk_size` por
+    proceso). Devuelve una fila por jugador con ruta, duración y error.
+    """
+    start = time.perf_counter()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    conclusions = llm_conclusions(player_ids) if text == "llm" else {}
+
+    # Bloques de como mucho `chunk_size`, repartidos entre todos los workers
+    chunk_size = max(1, min(chunk_size, -(-len(player_ids) // effective_n_jobs(n_jobs))))
+    chunks = [player_ids[i:i + chunk_size] for i in range(0, len(player_ids), chunk_size)]
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_render_chunk)(chunk, output_dir, fmt, {pid: conclusions[pid] for pid in chunk if pid in conclusions}, template, current_tenant())
+        for chunk in chunks
+    )
+    done = pd.DataFrame([row for rows in results for row in rows], columns=["Player_ID", "path", "seconds", "error"])
+    _write_index(done, output_dir)
+    ok = int(done["error"].isna().sum())
+    print(f"📄 {ok}/{len(done)} informes en {output_dir} ({time.perf_counter() - start:.1f}s)")
+    return done
+
+
+def _write_index(done: pd.DataFrame, output_dir: Path) -> None:
+    names = load_future_metadata().drop_duplicates("Player_ID").set_index("Player_ID")["Player_name"]
+    items = "".join(
+        f'<li><a href="{html.escape(Path(row.path).name)}">{html.escape(str(names.get(row.Player_ID, row.Player_ID)))}</a></li>'
+        for row in done.itertuples() if row.path
+    )
+    (output_dir / "index.html").write_text(
+        f"<!DOCTYPE html><html lang='es'><meta charset='utf-8'><title>Informes Futpeak</title><ul>{items}</ul></html>",
+        encoding="utf-8",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera informes de scouting en HTML o PDF.")
+    parser.add_argument("--players", nargs="+", default=["all"], help="Player_ID o 'all'")
+    parser.add_argument("--position", choices=POSITION_GROUPS, default=None, help="Solo jugadores de este grupo")
+    parser.add_argument("--format", choices=FORMATS, default="html")
+    parser.add_argument("--text", choices=TEXT_MODES, default="template")
+    parser.add_argument("--template", type=Path, default=None, help="Plantilla de texto ($name, $group, ...)")
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--output", type=Path, default=REPORTS_DIR)
+    parser.add_argument("--tenant", default=DEFAULT_TENANT, help="Partición de jugadores (ver tenants.py)")
+    args = parser.parse_args()
+
+    with use_tenant(args.tenant):
+        metadata = load_future_metadata()
+        if args.position:
+            metadata = metadata[metadata["position_group"] == args.position]
+        ids = list(metadata["Player_ID"].drop_duplicates()) if args.players == ["all"] else args.players
+        template = args.template.read_text(encoding="utf-8") if args.template else DEFAULT_TEXT_TEMPLATE
+        generate_reports(ids, args.output, fmt=args.format, text=args.text, template=template, n_jobs=args.jobs)
+
+
+if __name__ == "__main__":
+    # Se ejecuta desde el módulo importado: así los workers reciben
+    # `_render_chunk` por referencia y no por valor desde __main__ (con
+    # FIGURE_LOCK dentro, que no se puede serializar)
+    import reports
+    reports.main()
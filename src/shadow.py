@@ -0,0 +1,160 @@
+# src/shadow.py
+#
+# Evaluación en sombra de un modelo nuevo frente al actual: la matriz de
+# features se construye una sola vez y cada versión puntúa a todos los
+# jugadores en una llamada en lote. El informe recoge qué etiquetas cambian,
+# la matriz de confusión entre versiones y la diferencia de pico proyectado.
+#
+#   python shadow.py --candidate ruta/al/modelo_nuevo
+#   python shadow.py --candidate ruta/nuevo --baseline ruta/actual --dataset historical
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_loader import load_cleaned_matchlogs, load_cleaned_metadata, load_future_matchlogs, load_future_metadata
+from features import build_feature_matrix, prepare_player_frames, to_model_input
+from form import uses_form
+from leaderboard import score_matrix
+from model_utils import MODEL_DIR, ModelAssets, get_model_version
+from positions import position_groups_by_player
+
+DATASETS = {
+    "future": (load_future_matchlogs, load_future_metadata),
+    "historical": (load_cleaned_matchlogs, load_cleaned_metadata),
+}
+VERSIONS = ("baseline", "candidate")
+
+
+def _confidence(assets: ModelAssets, X: pd.DataFrame) -> np.ndarray:
+    """
+    Probabilidad de la clase predicha (NaN si el modelo no tiene predict_proba).
+    """
+    if not hasattr(assets.model, "predict_proba"):
+        return np.full(len(X), np.nan)
+    return assets.model.predict_proba(to_model_input(X, assets.features)).max(axis=1)
+
+
+def shadow_score(
+    matchlogs: pd.DataFrame,
+    metadata: pd.DataFrame,
+    baseline: ModelAssets,
+    candidate: ModelAssets,
+    n_jobs: int = -1,
+) -> pd.DataFrame:
+    """
+    Una fila por jugador con peak_group, confianza y pico proyectado de cada
+    versión (sufijos _baseline / _candidate), `changed` y `projected_delta`.
+    Si alguna versión usa features de forma, se calculan para ambas: cada
+    modelo toma solo sus columnas con `to_model_input`.
+    """
+    frames = prepare_player_frames(matchlogs, metadata)
+    with_form = uses_form(baseline.features) or uses_form(candidate.features)
+    X, careers = build_feature_matrix(frames, n_jobs=n_jobs, with_form=with_form)
+    positions = position_groups_by_player(metadata)
+
+    info = metadata.drop_duplicates("Player_ID").set_index("Player_ID")
+    out = pd.DataFrame({"Player_name": info["Player_name"], "position_group": positions.astype(str)}).reindex(X.index)
+    for name, assets in zip(VERSIONS, (baseline, candidate)):
+        scores = score_matrix(assets, X, careers, positions)
+        scores["confidence"] = pd.Series(_confidence(assets, X), index=X.index)
+        out = out.join(scores[["peak_group", "confidence", "projected_peak"]].add_suffix(f"_{name}"))
+
+    out["changed"] = out["peak_group_baseline"] != out["peak_group_candidate"]
+    out["projected_delta"] = out["projected_peak_candidate"] - out["projected_peak_baseline"]
+    out.index.name = "Player_ID"
+    return out.reset_index().sort_values("projected_delta", key=np.abs, ascending=False, ignore_index=True)
+
+
+def confusion_between(players: pd.DataFrame) -> pd.DataFrame:
+    """
+    Jugadores por (etiqueta actual, etiqueta nueva); filas = baseline.
+    """
+    return pd.crosstab(
+        players["peak_group_baseline"], players["peak_group_candidate"],
+        rownames=["baseline"], colnames=["candidate"], margins=True, margins_name="total",
+    )
+
+
+def summarize(players: pd.DataFrame) -> dict:
+    delta = players["projected_delta"].dropna()
+    changed = players[players["changed"]]
+    return {
+        "n_players": int(len(players)),
+        "n_changed": int(len(changed)),
+        "changed_share": round(float(players["changed"].mean()), 4) if len(players) else 0.0,
+        "changes": {
+            f"{a} → {b}": int(n)
+            for (a, b), n in changed.groupby(["peak_group_baseline", "peak_group_candidate"]).size().items()
+        },
+        "changed_by_position": {k: int(v) for k, v in changed["position_group"].value_counts().items() if v},
+        # Grupos predichos por versión: delata un modelo que asigna a todos el mismo
+        "distribution": {
+            name: {g: int(n) for g, n in players[f"peak_group_{name}"].value_counts().items()} for name in VERSIONS
+        },
+        "projected_delta_mean": round(float(delta.mean()), 4) if len(delta) else 0.0,
+        "projected_delta_abs_mean": round(float(delta.abs().mean()), 4) if len(delta) else 0.0,
+        "projected_delta_abs_p95": round(float(delta.abs().quantile(0.95)), 4) if len(delta) else 0.0,
+    }
+
+
+def shadow_report(
+    candidate_dir: Path,
+    baseline_dir: Path = MODEL_DIR,
+    dataset: str = "future",
+    n_jobs: int = -1,
+) -> dict:
+    """
+    Informe completo: {"summary", "players", "confusion"}.
+    """
+    start = time.perf_counter()
+    load_matchlogs, load_metadata = DATASETS[dataset]
+    baseline, candidate = ModelAssets(baseline_dir), ModelAssets(candidate_dir)
+    players = shadow_score(load_matchlogs(), load_metadata(), baseline, candidate, n_jobs=n_jobs)
+
+    summary = {
+        "dataset": dataset,
+        "baseline": {"path": str(baseline_dir), "version": get_model_version(Path(baseline_dir))},
+        "candidate": {"path": str(candidate_dir), "version": get_model_version(Path(candidate_dir))},
+        **summarize(players),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    return {"summary": summary, "players": players, "confusion": confusion_between(players)}
+
+
+def save_report(report: dict, output_dir: Path) -> Path:
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report["players"].to_csv(output_dir / "players.csv", index=False)
+    report["confusion"].to_csv(output_dir / "confusion.csv")
+    with open(output_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(report["summary"], f, indent=2, ensure_ascii=False)
+    return output_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara dos versiones del modelo sobre todos los jugadores.")
+    parser.add_argument("--candidate", type=Path, required=True)
+    parser.add_argument("--baseline", type=Path, default=MODEL_DIR)
+    parser.add_argument("--dataset", choices=DATASETS, default="future")
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--output", type=Path, default=None, help="Por defecto, <candidate>/shadow")
+    args = parser.parse_args()
+
+    report = shadow_report(args.candidate, args.baseline, dataset=args.dataset, n_jobs=args.jobs)
+    summary = report["summary"]
+    print(f"🌓 {summary['n_changed']}/{summary['n_players']} jugadores cambian de grupo ({summary['changed_share']:.1%})")
+    for change, n in summary["changes"].items():
+        print(f"   {change}: {n}")
+    for name, counts in summary["distribution"].items():
+        print(f"🏷️ {name}: {counts}")
+        if len(counts) < 2:
+            print(f"⚠️ {name} asigna el mismo grupo a todos los jugadores")
+    print(f"📈 Δ pico proyectado: media {summary['projected_delta_mean']:+.3f} | |Δ| medio {summary['projected_delta_abs_mean']:.3f} | p95 {summary['projected_delta_abs_p95']:.3f}")
+    print(report["confusion"])
+    output = save_report(report, args.output or args.candidate / "shadow")
+    print(f"💾 Informe guardado en {output} ({summary['seconds']}s)")
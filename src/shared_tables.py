@@ -0,0 +1,185 @@
+# src/shared_tables.py
+#
+# Tablas compartidas entre procesos: un proceso publica los cuatro datasets
+# como ficheros Arrow IPC sin comprimir (por defecto en /dev/shm) y cada
+# worker de Streamlit los proyecta con mmap en solo lectura. Los buffers de
+# Arrow se convierten a pandas sin copiar (números sin nulos y cadenas como
+# string[pyarrow]), así que las páginas las comparte el sistema operativo y
+# cada worker adicional apenas suma memoria.
+#
+#   FUTPEAK_SHARED_TABLES=1 streamlit run app.py   # activa el modo compartido
+#   python shared_tables.py --publish              # publica (o republica) a mano
+#
+# Si no hay nada publicado, el primer worker que lo pide publica con un
+# cerrojo de fichero y los demás esperan y se conectan a lo suyo.
+
+import argparse
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from data_loader import CSV_URLS, DATA_DIR, DATA_FILES, download_csv_from_drive, get_base_data_version
+from positions import add_position_groups
+
+_SHM = Path("/dev/shm")
+DEFAULT_DIR = _SHM / "futpeak" if _SHM.is_dir() else DATA_DIR.parent / "cache" / "shared"
+POINTER_NAME = "current.json"
+METADATA_TABLES = ("players", "future_players")
+# Versiones publicadas que se conservan (la actual y la anterior, por si algún
+# worker aún no ha cambiado de versión; los mmap abiertos sobreviven al borrado)
+KEEP_VERSIONS = 2
+
+
+def shared_dir() -> Path | None:
+    """
+    Directorio de tablas compartidas según FUTPEAK_SHARED_TABLES:
+    vacío → modo desactivado, "1" → DEFAULT_DIR, otra cosa → esa ruta.
+    """
+    value = os.getenv("FUTPEAK_SHARED_TABLES", "").strip()
+    if not value or value == "0":
+        return None
+    return DEFAULT_DIR if value == "1" else Path(value)
+
+
+# -------------------------
+# Publicación
+# -------------------------
+def _normalized(name: str) -> pa.Table:
+    df = download_csv_from_drive(CSV_URLS[name], DATA_FILES[name])
+    if name in METADATA_TABLES:
+        df = add_position_groups(df.copy())
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # pandas guarda string[pyarrow] como large_string: se escribe ya así para
+    # que la conversión no tenga que copiar cada columna de texto
+    schema = pa.schema([
+        field.with_type(pa.large_string()) if field.type == pa.string() else field
+        for field in table.schema
+    ])
+    return table.cast(schema)
+
+
+def _write_ipc(table: pa.Table, path: Path) -> None:
+    tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+    with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def publish(directory: Path | None = None, data_version: str | None = None) -> Path:
+    """
+    Escribe los cuatro datasets en <directory>/<versión>/ y actualiza el
+    puntero current.json al final, de forma atómica: los workers ven la
+    versión anterior completa o la nueva completa.
+    """
+    directory = Path(directory or shared_dir() or DEFAULT_DIR)
+    version = data_version or get_base_data_version()
+    target = directory / version
+    target.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+
+    sizes = {}
+    for name in DATA_FILES:
+        path = target / f"{name}.arrow"
+        _write_ipc(_normalized(name), path)
+        sizes[name] = path.stat().st_size
+
+    pointer = directory / POINTER_NAME
+    tmp_pointer = pointer.with_suffix(f".tmp{os.getpid()}")
+    tmp_pointer.write_text(json.dumps({"version": version, "tables": sizes}), encoding="utf-8")
+    os.replace(tmp_pointer, pointer)
+    _prune(directory, version)
+
+    total = sum(sizes.values()) / 2**20
+    print(f"📤 Tablas compartidas publicadas en {target} ({total:.1f} MB, {time.perf_counter() - start:.1f}s)")
+    return target
+
+
+def _prune(directory: Path, current: str) -> None:
+    versions = sorted(
+        (p for p in directory.iterdir() if p.is_dir()),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for old in [p for p in versions if p.name != current][KEEP_VERSIONS - 1:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def _current_version(directory: Path) -> str | None:
+    try:
+        return json.loads((directory / POINTER_NAME).read_text(encoding="utf-8"))["version"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def ensure_published(directory: Path | None = None) -> tuple[Path, str]:
+    """
+    (directorio, versión) publicados para la versión de datos actual. Si no
+    existen, publica bajo un cerrojo de fichero: solo un proceso lo hace.
+    """
+    directory = Path(directory or shared_dir() or DEFAULT_DIR)
+    version = get_base_data_version()
+    if _current_version(directory) != version:
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if _current_version(directory) != version:
+                    publish(directory, version)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    return directory, version
+
+
+# -------------------------
+# Conexión desde los workers
+# -------------------------
+_STRING_TYPES = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+_attached: dict[tuple[str, str], pd.DataFrame] = {}
+_attach_lock = threading.Lock()
+
+
+def read_shared_table(path: Path) -> pd.DataFrame:
+    """
+    DataFrame sobre un fichero Arrow IPC proyectado en memoria, sin copias:
+    columnas numéricas como vistas de solo lectura y cadenas como string[pyarrow].
+    """
+    source = pa.memory_map(str(path), "r")
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True, types_mapper=_STRING_TYPES.get)
+
+
+def attach_table(name: str, directory: Path | None = None) -> pd.DataFrame:
+    """
+    Tabla `name` (clave de DATA_FILES) de la versión publicada actual. El
+    DataFrame se crea una vez por proceso y versión; cada llamada recibe una
+    copia superficial, así que añadir columnas no afecta a otras sesiones
+    (los datos en sí son de solo lectura).
+    """
+    directory, version = ensure_published(directory)
+    key = (version, name)
+    with _attach_lock:
+        if key not in _attached:
+            for old in [k for k in _attached if k[1] == name]:
+                del _attached[old]
+            _attached[key] = read_shared_table(directory / version / f"{name}.arrow")
+        df = _attached[key]
+    return df.copy(deep=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publica los datasets como tablas Arrow compartidas.")
+    parser.add_argument("--publish", action="store_true", help="Republica aunque ya exista la versión actual")
+    parser.add_argument("--dir", type=Path, default=None)
+    args = parser.parse_args()
+
+    if args.publish:
+        print(publish(args.dir))
+    else:
+        print("%s (versión %s)" % ensure_published(args.dir))
@@ -0,0 +1,139 @@
+# src/singleflight.py
+
+import threading
+from concurrent.futures import Future
+from functools import wraps
+from typing import Any, Callable, Hashable, Iterator
+
+from data_loader import get_data_version
+from model_utils import get_model_version
+
+
+class _Abandoned(Exception):
+    """El líder de un `stream` dejó de leer antes de terminar."""
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes con la misma clave en una única ejecución.
+    El primer hilo calcula el resultado; el resto espera y recibe el mismo objeto.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stream(self, key: Hashable, func: Callable[..., Iterator], *args, **kwargs) -> Iterator:
+        """
+        Como `do` para generadores: el líder emite los trozos según llegan y
+        el resto recibe todos de una vez cuando termina. Si el líder deja de
+        leer a medias, uno de los que esperan toma el relevo.
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._calls[key] = future
+            if leader:
+                break
+            try:
+                yield from future.result()
+                return
+            except _Abandoned:
+                continue
+
+        chunks = []
+        try:
+            for chunk in func(*args, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            future.set_exception(_Abandoned())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(chunks)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# ✅ Un único grupo por proceso: todas las sesiones de Streamlit comparten hilos
+_flights = SingleFlight()
+
+
+def current_versions() -> tuple[str, str]:
+    return get_data_version(), get_model_version()
+
+
+def _copy_result(value: Any) -> Any:
+    if isinstance(value, tuple):
+        return tuple(_copy_result(v) for v in value)
+    return value.copy() if hasattr(value, "copy") else value
+
+
+def single_flight(namespace: str, key: Callable[..., Hashable] | None = None, copy: bool = False):
+    """
+    Decorador: las llamadas simultáneas con la misma clave (argumentos + versión
+    de datos y modelo) comparten un solo cálculo en curso.
+
+    `key` recibe los mismos argumentos que la función y devuelve la parte
+    hashable de la clave (p. ej. el player_id cuando hay DataFrames de por medio).
+    El resultado se comparte entre hilos: los llamantes no deben mutarlo, salvo
+    con `copy=True`, que entrega a cada uno su copia (también dentro de tuplas).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            base = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            flight_key = (namespace, base, *current_versions())
+            value = _flights.do(flight_key, func, *args, **kwargs)
+            return _copy_result(value) if copy else value
+        return wrapper
+    return decorator
+
+
+def single_flight_stream(namespace: str, key: Callable[..., Hashable] | None = None):
+    """
+    Igual que `single_flight` para funciones generadoras (respuestas de la IA
+    en streaming): quien llega mientras otro genera espera al texto completo.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            base = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            flight_key = (namespace, base, *current_versions())
+            return _flights.stream(flight_key, func, *args, **kwargs)
+        return wrapper
+    return decorator
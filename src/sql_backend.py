@@ -0,0 +1,269 @@
+# src/sql_backend.py
+#
+# Backend SQL opcional para filtros de scouting: una base SQLite embebida,
+# construida a partir de los CSV procesados, con índices por jugador, fecha,
+# grupo de posición y edad. Las consultas devuelven solo las filas (o los
+# agregados) que cumplen el filtro, sin cargar los CSV completos en pandas.
+#
+#   python sql_backend.py            # construye la base de la versión actual
+#   python sql_backend.py --rebuild  # la regenera aunque exista
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from analytics import compute_rating
+from data_loader import (
+    DATA_DIR,
+    get_data_version,
+    load_cleaned_matchlogs,
+    load_cleaned_metadata,
+    load_future_matchlogs,
+    load_future_metadata,
+)
+from positions import position_groups_by_player
+
+CACHE_DIR = DATA_DIR.parent / "cache"
+DATASETS = {
+    "historical": (load_cleaned_matchlogs, load_cleaned_metadata),
+    "future": (load_future_matchlogs, load_future_metadata),
+}
+NUMERIC_COLS = ['Goals', 'Assists', 'Shots', 'Shots_on_target', 'Yellow_cards', 'Red_cards', 'Minutes']
+
+INDEXES = {
+    "players": [("Player_ID",), ("position_group", "Age"), ("Age",)],
+    "matchlogs": [("Player_ID", "Date"), ("Date",), ("position_group", "Age"), ("Age",)],
+    "seasons": [("Player_ID", "year_since_debut"), ("position_group", "year_since_debut", "Minutes"), ("Age",)],
+}
+# Sufijos de filtro admitidos en `select`: Minutes__gt=1500, Player_ID__in=[...]
+OPERATORS = {"eq": "=", "ne": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "in": "IN"}
+AGGREGATES = {"sum", "avg", "min", "max", "count"}
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_+/]*$")
+
+
+# -------------------------
+# Construcción de la base
+# -------------------------
+def database_path(data_version: str | None = None) -> Path:
+    return CACHE_DIR / f"futpeak_{data_version or get_data_version()}.sqlite"
+
+
+def _tables(matchlogs: pd.DataFrame, metadata: pd.DataFrame, dataset: str) -> dict[str, pd.DataFrame]:
+    """
+    Tablas players, matchlogs (una fila por partido) y seasons (una por jugador
+    y año desde el debut) de un dataset, con grupo de posición y edad.
+    """
+    info = metadata.drop_duplicates("Player_ID")
+    players = pd.DataFrame({
+        "Player_ID": info["Player_ID"].astype(str).values,
+        "dataset": dataset,
+        "Player_name": info["Player_name"].values,
+        "Position": info["Position"].values,
+        "position_group": position_groups_by_player(metadata).astype(str).values,
+        "Birth_date": pd.to_datetime(info["Birth_date"], errors="coerce").values,
+        "Age": pd.to_numeric(info["Age"].astype(str).str.split("-").str[0], errors="coerce").values,
+        "Club": info.get("Club", pd.Series("", index=info.index)).values,
+        "Nationality": info.get("Nationality", pd.Series("", index=info.index)).values,
+    })
+
+    df = matchlogs[matchlogs["Player_ID"].isin(players["Player_ID"])].copy()
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df = df.dropna(subset=["Date"])
+    for col in NUMERIC_COLS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0) if col in df else 0
+    by_id = players.set_index("Player_ID")
+    df["dataset"] = dataset
+    df["position_group"] = df["Player_ID"].map(by_id["position_group"])
+    df["Age"] = (df["Date"] - df["Player_ID"].map(by_id["Birth_date"])).dt.days / 365.25
+    df["Natural_year"] = df["Date"].dt.year
+    debut = df["Natural_year"].where(df["Minutes"] > 0).groupby(df["Player_ID"]).transform("min")
+    df["year_since_debut"] = (df["Natural_year"] - debut + 1).astype("Int64")
+    df["rating_per_90"] = compute_rating(df)
+    df["G+A"] = df["Goals"] + df["Assists"]
+
+    columns = ["Player_ID", "dataset", "Date", "Natural_year", "year_since_debut", "Age", "position_group",
+               "Competition", "Rival_team", *NUMERIC_COLS, "G+A", "rating_per_90"]
+    matches = df.reindex(columns=columns)
+
+    seasons = (
+        matches.dropna(subset=["year_since_debut"])
+        .groupby(["Player_ID", "year_since_debut"], sort=False)
+        .agg(
+            dataset=("dataset", "first"),
+            Natural_year=("Natural_year", "min"),
+            position_group=("position_group", "first"),
+            Age=("Age", "mean"),
+            Matches=("Date", "size"),
+            Minutes=("Minutes", "sum"),
+            Goals=("Goals", "sum"),
+            Assists=("Assists", "sum"),
+            rating_per_90=("rating_per_90", "mean"),
+        )
+        .reset_index()
+    )
+    seasons["G+A"] = seasons["Goals"] + seasons["Assists"]
+    seasons["G+A/90"] = (seasons["G+A"] / (seasons["Minutes"] / 90)).where(seasons["Minutes"] > 0, 0.0)
+
+    players["Birth_date"] = players["Birth_date"].dt.strftime("%Y-%m-%d")
+    matches["Date"] = matches["Date"].dt.strftime("%Y-%m-%d")
+    return {"players": players, "matchlogs": matches, "seasons": seasons}
+
+
+def build_database(path: Path | None = None) -> Path:
+    """
+    Construye la base con los dos datasets (histórico y futuras estrellas)
+    en un fichero temporal y lo renombra al final, así que los lectores
+    nunca ven una base a medias.
+    """
+    path = Path(path or database_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+    start = time.perf_counter()
+
+    con = sqlite3.connect(tmp_path)
+    try:
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        for dataset, (load_matchlogs, load_metadata) in DATASETS.items():
+            for name, table in _tables(load_matchlogs(), load_metadata(), dataset).items():
+                table.to_sql(name, con, if_exists="append", index=False, chunksize=50_000)
+        for name, indexes in INDEXES.items():
+            for cols in indexes:
+                con.execute(f'CREATE INDEX IF NOT EXISTS idx_{name}_{"_".join(cols)} ON {name} ({", ".join(cols)})')
+            con.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_dataset ON {name} (dataset)")
+        con.execute("ANALYZE")
+        con.commit()
+    finally:
+        con.close()
+
+    os.replace(tmp_path, path)
+    print(f"🗄️ Base SQL construida en {path} ({path.stat().st_size / 2**20:.1f} MB, {time.perf_counter() - start:.1f}s)")
+    return path
+
+
+_build_lock = threading.Lock()
+
+
+def ensure_database(rebuild: bool = False) -> Path:
+    """
+    Ruta de la base de la versión de datos actual; la construye si no existe.
+    """
+    path = database_path()
+    with _build_lock:
+        if rebuild or not path.exists():
+            build_database(path)
+    return path
+
+
+# -------------------------
+# Consultas
+# -------------------------
+_local = threading.local()
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Conexión de solo lectura por hilo a la base de la versión actual.
+    """
+    path = ensure_database()
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    if path not in connections:
+        con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        con.execute("PRAGMA query_only = ON")
+        connections[path] = con
+    return connections[path]
+
+
+def query(sql: str, params: tuple | dict = ()) -> pd.DataFrame:
+    """
+    SQL libre (solo lectura) sobre las tablas players, matchlogs y seasons.
+    """
+    return pd.read_sql_query(sql, get_connection(), params=params)
+
+
+def _columns(table: str) -> set[str]:
+    if table not in INDEXES:
+        raise ValueError(f"Tabla desconocida: {table}")
+    return {row[1] for row in get_connection().execute(f"PRAGMA table_info({table})")}
+
+
+def _quote(column: str, allowed: set[str]) -> str:
+    if column not in allowed or not _IDENTIFIER.match(column):
+        raise ValueError(f"Columna desconocida: {column}")
+    return f'"{column}"'
+
+
+def _where(filters: dict, allowed: set[str]) -> tuple[str, list]:
+    clauses, params = [], []
+    for key, value in filters.items():
+        if value is None:
+            continue
+        column, _, op = key.partition("__")
+        sql_op = OPERATORS.get(op or "eq")
+        if sql_op is None:
+            raise ValueError(f"Operador no soportado: {op}")
+        if sql_op == "IN":
+            values = list(value)
+            clauses.append(f"{_quote(column, allowed)} IN ({', '.join('?' * len(values))})" if values else "0")
+            params.extend(values)
+        else:
+            clauses.append(f"{_quote(column, allowed)} {sql_op} ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def select(
+    table: str,
+    columns: list[str] | None = None,
+    order_by: str | None = None,
+    descending: bool = False,
+    limit: int | None = None,
+    **filters,
+) -> pd.DataFrame:
+    """
+    Filas de `table` que cumplen todos los filtros, p. ej.
+    `select("seasons", position_group="ATTACKING", year_since_debut=2, Minutes__gt=1500, Age__lt=21)`.
+    """
+    allowed = _columns(table)
+    cols = ", ".join(_quote(c, allowed) for c in columns) if columns else "*"
+    where, params = _where(filters, allowed)
+    sql = f"SELECT {cols} FROM {table}{where}"
+    if order_by:
+        sql += f" ORDER BY {_quote(order_by, allowed)}{' DESC' if descending else ''}"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return query(sql, tuple(params))
+
+
+def aggregate(table: str, group_by: list[str], metrics: dict[str, str], **filters) -> pd.DataFrame:
+    """
+    Agregados por grupo calculados en SQLite, p. ej.
+    `aggregate("matchlogs", ["Player_ID"], {"Minutes": "sum", "rating_per_90": "avg"}, Date__gte="2023-01-01")`.
+    """
+    allowed = _columns(table)
+    keys = [_quote(c, allowed) for c in group_by]
+    exprs = []
+    for column, func in metrics.items():
+        if func.lower() not in AGGREGATES:
+            raise ValueError(f"Agregado no soportado: {func}")
+        exprs.append(f'{func.upper()}({_quote(column, allowed)}) AS "{func.lower()}_{column}"')
+    where, params = _where(filters, allowed)
+    sql = f"SELECT {', '.join(keys + exprs)} FROM {table}{where}"
+    if keys:
+        sql += f" GROUP BY {', '.join(keys)}"
+    return query(sql, tuple(params))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construye la base SQLite de consultas de Futpeak.")
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+    print(ensure_database(rebuild=args.rebuild))
@@ -0,0 +1,153 @@
+# src/startup.py
+#
+# Carga en segundo plano de datasets y artefactos del modelo al arrancar.
+# Cada recurso se lanza en un pool de hilos llamando a su propia función
+# cacheada (st.cache_data / st.cache_resource), así que cuando la página la
+# pide ya está en caché o espera solo a ese recurso, no a los demás. Se
+# precarga por tenant: los datasets "future" son los de su partición.
+#
+# Solo solapa cargas que esperan E/S (descargas de Drive, CSV grandes): con
+# los CSV locales del repositorio no adelanta el primer pintado, porque la
+# carga del modelo (import de LightGBM) retiene el GIL.
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+from typing import Any, Callable
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from data_loader import (
+    get_base_data_version,
+    load_cleaned_matchlogs,
+    load_cleaned_metadata,
+    load_future_matchlogs,
+    load_future_metadata,
+)
+from model_runner import get_model_assets
+from percentiles import get_percentile_engine
+from tenants import DEFAULT_TENANT, tenant_cache_entries, use_tenant
+
+# Orden de lanzamiento: primero lo que necesita la barra lateral
+STARTUP_TASKS: dict[str, Callable[[], Any]] = {
+    "future_metadata": load_future_metadata,
+    "future_matchlogs": load_future_matchlogs,
+    "model_assets": lambda: get_model_assets().load_all(),
+    "cleaned_metadata": load_cleaned_metadata,
+    "cleaned_matchlogs": load_cleaned_matchlogs,
+    # Reutiliza los cleaned_* de arriba: la caché hace esperar al que llega segundo
+    "percentile_engine": lambda: get_percentile_engine(get_base_data_version()),
+}
+
+# Recursos que necesita cada vista antes de pintarse. percentile_engine solo
+# se precarga: los percentiles son opcionales (summarize_basic_stats) y un
+# fallo del histórico no debe tumbar la vista del jugador
+PAGE_REQUIREMENTS = {
+    "sidebar": ("future_metadata",),
+    "player": ("future_metadata", "future_matchlogs", "model_assets"),
+    "ranking": ("future_metadata", "future_matchlogs", "model_assets"),
+    "compare": ("future_metadata", "future_matchlogs", "model_assets"),
+}
+
+
+class StartupLoader:
+    """
+    Lanza todas las tareas a la vez y expone su estado.
+
+    `result(name)` bloquea solo hasta que termina esa tarea; si falló, la
+    repite en el hilo que la pide (los errores no quedan en caché).
+    `status()` devuelve una tabla con estado y duración de cada una.
+    """
+
+    def __init__(
+        self,
+        tasks: dict[str, Callable[[], Any]] = STARTUP_TASKS,
+        max_workers: int | None = None,
+        tenant: str = DEFAULT_TENANT,
+    ):
+        self.started_at = time.perf_counter()
+        self.tenant = tenant
+        self._tasks = dict(tasks)
+        self._durations: dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Los hilos heredan el contexto de la sesión que lanza la carga: las
+        # funciones cacheadas lo consultan y sin él avisan en cada llamada
+        ctx = get_script_run_ctx(suppress_warning=True)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or len(tasks),
+            thread_name_prefix="futpeak-startup",
+            initializer=lambda: add_script_run_ctx(ctx=ctx) if ctx else None,
+        )
+        self._futures: dict[str, Future] = {name: self._pool.submit(self._run, name, func) for name, func in tasks.items()}
+        self._pool.shutdown(wait=False)
+
+    def _run(self, name: str, func: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            # Explícito: el ContextVar del tenant no pasa a los hilos del pool
+            with use_tenant(self.tenant):
+                return func()
+        finally:
+            with self._lock:
+                self._durations[name] = time.perf_counter() - start
+
+    def ready(self, *names: str) -> bool:
+        return all(self._futures[name].done() for name in names or self._futures)
+
+    def wait(self, *names: str, timeout: float | None = None) -> bool:
+        """
+        Espera a las tareas indicadas (todas si no se indica ninguna).
+        Devuelve True si terminaron dentro del plazo.
+        """
+        futures = [self._futures[name] for name in names or self._futures]
+        _, pending = wait_futures(futures, timeout=timeout)
+        return not pending
+
+    def result(self, name: str, timeout: float | None = None) -> Any:
+        future = self._futures[name]
+        wait_futures([future], timeout=timeout)
+        if future.done() and future.exception() is not None:
+            print(f"⚠️ Carga de {name} fallida en segundo plano, reintentando: {future.exception()}")
+            with use_tenant(self.tenant):
+                return self._tasks[name]()
+        return future.result(timeout=0)
+
+    def status(self) -> pd.DataFrame:
+        rows = []
+        with self._lock:
+            durations = dict(self._durations)
+        for name, future in self._futures.items():
+            if not future.done():
+                state = "cargando"
+            elif future.exception() is not None:
+                state = f"error: {future.exception()}"
+            else:
+                state = "listo"
+            rows.append({"recurso": name, "estado": state, "segundos": durations.get(name)})
+        return pd.DataFrame(rows, columns=["recurso", "estado", "segundos"])
+
+
+@st.cache_resource(max_entries=tenant_cache_entries())
+def get_startup_loader(tenant: str, data_version: str, model_version: str) -> StartupLoader:
+    """
+    Un cargador por proceso, tenant y versión de datos/modelo. Las versiones
+    solo forman parte de la clave: si cambian, se vuelve a lanzar la carga.
+    """
+    print(f"🚀 Carga inicial en segundo plano ({tenant}): " + ", ".join(STARTUP_TASKS))
+    return StartupLoader(tenant=tenant)
+
+
+def wait_for_page(loader: StartupLoader, page: str, message: str = "⏳ Cargando datos...") -> None:
+    """
+    Bloquea la vista hasta que están listos sus recursos, con un spinner
+    solo si aún falta alguno. Las tareas fallidas se reintentan aquí y, si
+    vuelven a fallar, su error llega a la vista.
+    """
+    names = PAGE_REQUIREMENTS[page]
+    if not loader.ready(*names):
+        with st.spinner(message):
+            loader.wait(*names)
+    for name in names:
+        loader.result(name)
@@ -1,50 +1,38 @@
+import threading
+import numpy as np
 import pandas as pd
 import seaborn as sns
-import matplotlib.pyplot as plt
-from data_loader import get_matchlogs_by_player, get_metadata_by_player
-from player_processing import build_player_df, aggregate_stats_by_year
-import streamlit as st
+from matplotlib.figure import Figure
+from player_context import PlayerContext
+from singleflight import single_flight
+from cache_policy import bounded_cache
 
-@st.cache_data
-def get_player_stats(player_id):
-    df = get_matchlogs_by_player(player_id=player_id, future=True).copy()
+# Estilo común aplicado una vez: las figuras se crean con la API de objetos
+# (Figure) y no pasan por el estado global de pyplot
+sns.set_theme(style="whitegrid", rc={"axes.facecolor": "none", "figure.facecolor": "none"})
 
-    df['Goals']   = pd.to_numeric(df['Goals'], errors='coerce')
-    df['Assists'] = pd.to_numeric(df['Assists'], errors='coerce')
-    df['Minutes'] = pd.to_numeric(df['Minutes'], errors='coerce')
-    df['Date']    = pd.to_datetime(df['Date'], errors='coerce')
+# Las figuras están en caché y las comparten todas las sesiones: redimensionar
+# y dibujar la misma figura desde dos hilos a la vez rompe el renderer de Agg
+FIGURE_LOCK = threading.Lock()
 
-    if df.empty:
+@bounded_cache("stats_get_player_stats", key=lambda player_id, _ctx=None: player_id, max_entries=256)
+def get_player_stats(player_id, _ctx: PlayerContext | None = None):
+    ctx = _ctx or PlayerContext(player_id)
+    try:
+        return ctx.yearly_stats
+    except ValueError:
         return pd.DataFrame()
 
-    df['Natural_year'] = df['Date'].dt.year
-    debut_year = df[df['Minutes'] > 0]['Natural_year'].min()
-    df['year_since_debut'] = df['Natural_year'] - debut_year + 1
-
-    stats = (
-        df.groupby('year_since_debut')
-          .agg({
-              'Goals': 'sum',
-              'Assists': 'sum',
-              'Minutes': 'sum',
-              'Date': 'count'
-          })
-          .rename(columns={'Date': 'Matches'})
-          .reset_index()
-    )
-    stats['G+A'] = stats['Goals'] + stats['Assists']
-    return stats
-
-@st.cache_resource
-def plot_player_stats(player_id) -> plt.Figure:
+@bounded_cache("plot_player_stats", key=lambda player_id, _ctx=None: player_id, max_entries=128)
+@single_flight("plot_player_stats", key=lambda player_id, _ctx=None: player_id)
+def plot_player_stats(player_id, _ctx: PlayerContext | None = None) -> Figure:
     try:
-        stats = get_player_stats(player_id)
-        player_name = get_metadata_by_player(player_id, future=True).get("Player_name", player_id)
+        stats = (_ctx or PlayerContext(player_id)).yearly_stats
         if stats.empty:
             return None
 
-        sns.set_theme(style="whitegrid", rc={"axes.facecolor": "none", "figure.facecolor": "none"})
-        fig, ax = plt.subplots(figsize=(7, 4), facecolor='none')
+        fig = Figure(figsize=(7, 4), facecolor="none")
+        ax = fig.subplots()
         ax.set_facecolor('none')
 
         for spine in ax.spines.values():
@@ -75,16 +63,16 @@ def plot_player_stats(player_id) -> plt.Figure:
         print(f"❌ Error en plot_player_stats: {e}")
         return None
 
-@st.cache_resource
-def plot_minutes_per_year(player_id) -> plt.Figure:
+@bounded_cache("plot_minutes_per_year", key=lambda player_id, _ctx=None: player_id, max_entries=128)
+@single_flight("plot_minutes_per_year", key=lambda player_id, _ctx=None: player_id)
+def plot_minutes_per_year(player_id, _ctx: PlayerContext | None = None) -> Figure:
     try:
-        df = build_player_df(player_id)
-        stats_df = aggregate_stats_by_year(df)
+        stats_df = (_ctx or PlayerContext(player_id)).yearly_stats
         if stats_df.empty:
             return None
 
-        sns.set_theme(style="whitegrid", rc={"axes.facecolor": "none", "figure.facecolor": "none"})
-        fig, ax = plt.subplots(figsize=(7, 4), facecolor="none")
+        fig = Figure(figsize=(7, 4), facecolor="none")
+        ax = fig.subplots()
         ax.set_facecolor("none")
 
         for spine in ax.spines.values():
@@ -115,40 +103,70 @@ def plot_minutes_per_year(player_id) -> plt.Figure:
         print(f"❌ Error en plot_minutes_per_year: {e}")
         return None
 
-@st.cache_resource
+def _projection_key(player_name, player_seasonal, group_curve, pred_label):
+    # Las temporadas simuladas («¿y si...?») y la curva (modo mixto) también distinguen la figura
+    simulated = ()
+    if "hypothetical" in player_seasonal:
+        hyp = player_seasonal.loc[player_seasonal["hypothetical"].astype(bool), ["Minutes", "rating_per_90"]]
+        simulated = tuple(hyp.round(3).to_numpy().ravel().tolist())
+    curve = tuple(
+        round(float(pd.to_numeric(group_curve[col], errors="coerce").sum()), 3)
+        for col in ("rating_avg", "projection", "projection_p25", "projection_p75") if col in group_curve
+    )
+    return (player_name, pred_label, simulated, curve)
+
+
+@bounded_cache("plot_rating_projection", key=_projection_key, max_entries=128)
+@single_flight("plot_rating_projection", key=_projection_key)
 def plot_rating_projection(
     player_name: str,
     player_seasonal: pd.DataFrame,
     group_curve: pd.DataFrame,
     pred_label: str
-) -> plt.Figure:
+) -> Figure:
     try:
-        sns.set_theme(style="whitegrid", rc={"axes.facecolor": "none", "figure.facecolor": "none"})
-        df = player_seasonal.copy()
-        df["year_since_debut"] = pd.to_numeric(df["year_since_debut"], errors="coerce")
-        df["rating_per_90"] = pd.to_numeric(df["rating_per_90"], errors="coerce")
-        player_filtered = df[df["year_since_debut"] <= 13]
+        # Sin copias: solo se leen columnas del perfil y de la curva
+        player_years = pd.to_numeric(player_seasonal["year_since_debut"], errors="coerce")
+        player_ratings = pd.to_numeric(player_seasonal["rating_per_90"], errors="coerce")
+        in_range = player_years <= 13
+        simulated = (
+            player_seasonal["hypothetical"].astype(bool).to_numpy()
+            if "hypothetical" in player_seasonal else np.zeros(len(player_seasonal), dtype=bool)
+        )
 
-        gc = group_curve.copy()
-        gc["year_since_debut"] = pd.to_numeric(gc["year_since_debut"], errors="coerce")
+        gc = group_curve
+        curve_years = pd.to_numeric(gc["year_since_debut"], errors="coerce")
 
-        fig, ax = plt.subplots(figsize=(10, 6), facecolor="none")
+        fig = Figure(figsize=(10, 6), facecolor="none")
+        ax = fig.subplots()
         ax.set_facecolor("none")
 
         for spine in ax.spines.values():
             spine.set_visible(False)
 
+        real = in_range & ~simulated
         ax.plot(
-            player_filtered["year_since_debut"],
-            player_filtered["rating_per_90"],
+            player_years[real],
+            player_ratings[real],
             marker="o", linestyle="-",
             color="#1a85eb", linewidth=3,
             label=player_name
         )
 
+        if simulated.any():
+            # Tramo simulado: desde el último año real, con marcadores huecos
+            tail = in_range & (simulated | (player_years == player_years[real].max()))
+            ax.plot(
+                player_years[tail],
+                player_ratings[tail],
+                marker="o", markerfacecolor="none", linestyle="--",
+                color="#1a85eb", linewidth=2,
+                label="Temporadas simuladas"
+            )
+
         if "rating_avg" in gc:
             ax.plot(
-                gc["year_since_debut"],
+                curve_years,
                 gc["rating_avg"],
                 linestyle="--", color="#C62D30", linewidth=3,
                 label=f"Grupo promedio: {pred_label}"
@@ -156,7 +174,7 @@ def plot_rating_projection(
 
         if "rating_p25" in gc.columns and "rating_p75" in gc.columns:
             ax.fill_between(
-                gc["year_since_debut"],
+                curve_years,
                 gc["rating_p25"],
                 gc["rating_p75"],
                 color="#C62D30",
@@ -164,9 +182,19 @@ def plot_rating_projection(
                 label="Percentil 25–75"
             )
 
+        if "projection_p25" in gc.columns and "projection_p75" in gc.columns:
+            ax.fill_between(
+                curve_years,
+                gc["projection_p25"],
+                gc["projection_p75"],
+                color="#4BC551",
+                alpha=0.12,
+                label="Banda de la proyección"
+            )
+
         if "projection" in gc:
             ax.plot(
-                gc["year_since_debut"],
+                curve_years,
                 gc["projection"],
                 linestyle=":", color="#4BC551", linewidth=3,
                 label="Proyección ajustada"
@@ -197,3 +225,65 @@ def plot_rating_projection(
     except Exception as e:
         print(f"❌ Error en plot_rating_projection: {e}")
         return None
+
+
+COMPARISON_COLORS = ["#1a85eb", "#C62D30", "#4BC551", "#F2B134", "#A259FF"]
+
+
+@single_flight(
+    "plot_comparison",
+    key=lambda players, careers, projections: tuple(players["Player_ID"])
+)
+def plot_comparison(players: pd.DataFrame, careers: pd.DataFrame, projections: pd.DataFrame) -> Figure:
+    """
+    Trayectorias de rating_per_90 (línea continua) y proyecciones ajustadas
+    (punteada) de varios jugadores en una sola figura, un color por jugador.
+    """
+    try:
+        fig = Figure(figsize=(10, 6), facecolor="none")
+        ax = fig.subplots()
+        ax.set_facecolor("none")
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+
+        by_player = dict(tuple(careers.groupby("Player_ID", sort=False)))
+        proj_by_player = dict(tuple(projections.groupby("Player_ID", sort=False)))
+        for color, row in zip(COMPARISON_COLORS, players.itertuples(index=False)):
+            career = by_player.get(row.Player_ID)
+            if career is not None:
+                ax.plot(
+                    career["year_since_debut"], career["rating_per_90"],
+                    marker="o", linestyle="-", color=color, linewidth=3,
+                    label=row.Player_name
+                )
+            proj = proj_by_player.get(row.Player_ID)
+            if proj is not None:
+                proj = proj.sort_values("year_since_debut")
+                ax.plot(
+                    proj["year_since_debut"], proj["projection"],
+                    linestyle=":", color=color, linewidth=2.5,
+                    label=f"Proyección ({row.peak_group})"
+                )
+
+        ax.grid(True, color="white", linestyle="--", alpha=0.4)
+        ax.set_xlabel("Años desde el debut", fontsize=12, color="#ffffff", labelpad=12, fontname="Inter")
+        ax.set_ylabel("Rating por 90 minutos", fontsize=12, color="#ffffff", labelpad=12, fontname="Inter")
+        ax.tick_params(axis="x", colors="white", labelsize=10, pad=6)
+        ax.tick_params(axis="y", colors="white", labelsize=10, pad=6)
+        for label in ax.get_xticklabels() + ax.get_yticklabels():
+            label.set_fontname("Inter")
+
+        leg = ax.legend(loc="upper left", fontsize=9, frameon=True, ncol=2)
+        for txt in leg.get_texts():
+            txt.set_color("white")
+        lf = leg.get_frame()
+        lf.set_facecolor("black")
+        lf.set_alpha(0.3)
+        lf.set_edgecolor("white")
+        lf.set_linewidth(0.5)
+
+        fig.tight_layout()
+        return fig
+    except Exception as e:
+        print(f"❌ Error en plot_comparison: {e}")
+        return None
@@ -0,0 +1,278 @@
+# src/tenants.py
+#
+# Particiones por cliente (tenant): cada uno tiene su propia lista de
+# jugadores y matchlogs, que sustituye al dataset "future stars" mientras ese
+# tenant está activo. El histórico (cleaned_*) y el modelo son comunes.
+#
+#   data/tenants/<tenant>/metadata.csv    # mismo formato que future_stars_cleaned_*
+#   data/tenants/<tenant>/matchlogs.csv
+#   data/tenants/<tenant>/players_faces/  # opcional
+#   data/tenants/registry.json            # tenants accesibles: clave de acceso e IDs de Drive
+#
+# Solo se puede abrir un tenant que esté en el registro con su
+# `access_key_sha256`: un directorio sin entrada, o una entrada sin clave, no
+# es accesible desde la app.
+#
+# Las particiones se cargan al pedirlas y se guardan en una LRU con
+# presupuesto de memoria propio (FUTPEAK_TENANT_CACHE_MB), así que un worker
+# solo tiene en memoria los tenants que está sirviendo. El tenant activo se
+# decide por contexto (use_tenant) o por sesión de Streamlit, y forma parte de
+# get_data_version(): todas las cachés con la versión en la clave quedan
+# separadas por tenant.
+#
+#   python tenants.py --list
+#   python tenants.py --load acme
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+
+from cache_policy import BoundedCache
+from data_loader import DATA_DIR, fetch_csv, get_base_data_version
+from data_quality import check_matchlogs
+from positions import add_position_groups
+from singleflight import SingleFlight
+
+TENANTS_DIR = Path(os.getenv("FUTPEAK_TENANTS_DIR", DATA_DIR.parent / "tenants"))
+REGISTRY_NAME = "registry.json"
+# El tenant por defecto es el dataset "future stars" de siempre
+DEFAULT_TENANT = os.getenv("FUTPEAK_TENANT", "default")
+SESSION_KEY = "tenant"
+PARTITION_FILES = {"players": "metadata.csv", "matches": "matchlogs.csv"}
+DEFAULT_BUDGET_MB = float(os.getenv("FUTPEAK_TENANT_CACHE_MB", "256"))
+# Tenants activos a la vez que caben en las cachés por tenant (fijo al importar)
+MAX_TENANTS = int(os.getenv("FUTPEAK_MAX_TENANTS", "16"))
+
+_TENANT_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+_current: ContextVar[str | None] = ContextVar("futpeak_tenant", default=None)
+
+
+class TenantPartition(NamedTuple):
+    tenant: str
+    version: str
+    matchlogs: pd.DataFrame
+    metadata: pd.DataFrame
+
+
+# -------------------------
+# Registro
+# -------------------------
+def validate_tenant(tenant: str) -> str:
+    """
+    Identificador en minúsculas, dígitos, "_" y "-": se usa como nombre de
+    directorio y no puede salirse de TENANTS_DIR.
+    """
+    if not isinstance(tenant, str) or not _TENANT_ID.match(tenant):
+        raise ValueError(f"Tenant no válido: {tenant!r}")
+    return tenant
+
+
+@lru_cache(maxsize=1)
+def _read_registry(path: Path, size: int, mtime_ns: int) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _registry() -> dict:
+    """
+    Registro de tenants. Se lee una vez por versión del fichero (tamaño y
+    fecha), no en cada carga de datos.
+    """
+    path = TENANTS_DIR / REGISTRY_NAME
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return {}
+    return _read_registry(path, stat.st_size, stat.st_mtime_ns)
+
+
+def list_tenants() -> list[str]:
+    """
+    Tenants del registro. Los subdirectorios de TENANTS_DIR sin entrada no
+    cuentan.
+    """
+    return [DEFAULT_TENANT, *sorted(set(_registry()) - {DEFAULT_TENANT})]
+
+
+def tenant_cache_entries(per_tenant: int = 1) -> int:
+    """
+    Tamaño de las cachés con entradas por tenant: MAX_TENANTS más uno, para
+    que el cambio de versión de datos no expulse a otro tenant. Es fijo porque
+    los decoradores de caché lo evalúan al importar; los tenants registrados
+    después caben mientras no se superen MAX_TENANTS activos.
+    """
+    return per_tenant * (MAX_TENANTS + 1)
+
+
+def tenant_dir(tenant: str) -> Path:
+    return TENANTS_DIR / validate_tenant(tenant)
+
+
+def partition_paths(tenant: str) -> dict[str, Path]:
+    directory = tenant_dir(tenant)
+    return {name: directory / filename for name, filename in PARTITION_FILES.items()}
+
+
+def resolve_tenant(tenant: str | None, access_key: str | None = None) -> str:
+    """
+    Tenant pedido (p. ej. desde la URL). Todo tenant que no sea el por
+    defecto necesita una entrada en el registro con `access_key_sha256` y la
+    clave correcta. Sin tenant, el por defecto.
+    """
+    if not tenant or tenant == DEFAULT_TENANT:
+        return DEFAULT_TENANT
+    validate_tenant(tenant)
+    entry = _registry().get(tenant)
+    if entry is None:
+        raise KeyError(f"Tenant desconocido: {tenant}")
+    expected = entry.get("access_key_sha256")
+    if not expected:
+        raise PermissionError(f"El tenant {tenant} no tiene clave de acceso registrada")
+    if not hmac.compare_digest(hashlib.sha256((access_key or "").encode()).hexdigest(), expected):
+        raise PermissionError(f"Clave de acceso incorrecta para {tenant}")
+    return tenant
+
+
+# -------------------------
+# Tenant activo
+# -------------------------
+def _session_tenant() -> str | None:
+    # Fragmentos y hilos de arranque llevan el contexto de la sesión, no el ContextVar
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_state[SESSION_KEY] if ctx is not None and SESSION_KEY in ctx.session_state else None
+
+
+def current_tenant() -> str:
+    return _current.get() or _session_tenant() or DEFAULT_TENANT
+
+
+def set_session_tenant(tenant: str) -> None:
+    """
+    Fija el tenant de la sesión de Streamlit (se llama al principio de app.py).
+    """
+    import streamlit as st
+
+    st.session_state[SESSION_KEY] = validate_tenant(tenant) if tenant != DEFAULT_TENANT else tenant
+
+
+@contextmanager
+def use_tenant(tenant: str):
+    """
+    Activa `tenant` en el hilo o proceso actual (scripts y workers).
+    """
+    token = _current.set(validate_tenant(tenant) if tenant != DEFAULT_TENANT else tenant)
+    try:
+        yield tenant
+    finally:
+        _current.reset(token)
+
+
+def partition_version(tenant: str) -> str:
+    """
+    Huella de los ficheros del tenant (tamaño y fecha), como get_data_version.
+    """
+    h = hashlib.sha1(tenant.encode())
+    for name, path in sorted(partition_paths(tenant).items()):
+        try:
+            stat = path.stat()
+            h.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        except OSError:
+            h.update(f"{name}:missing".encode())
+    return h.hexdigest()[:12]
+
+
+def tenant_data_version(tenant: str) -> str:
+    """
+    Versión de datos vista por un tenant: la base (histórico y modelo
+    comunes) combinada con la de su partición.
+    """
+    base = get_base_data_version()
+    if tenant == DEFAULT_TENANT:
+        return base
+    return hashlib.sha1(f"{base}:{partition_version(tenant)}".encode()).hexdigest()[:12]
+
+
+# -------------------------
+# Particiones en memoria
+# -------------------------
+# ✅ Presupuesto propio: las particiones no compiten con las cachés por jugador
+_partitions = BoundedCache(int(DEFAULT_BUDGET_MB * 2**20), policy="lru")
+_loads = SingleFlight()
+
+
+def _ensure_files(tenant: str) -> dict[str, Path]:
+    paths = partition_paths(tenant)
+    entry = _registry().get(tenant, {})
+    for name, path in paths.items():
+        if entry.get(name):
+            fetch_csv(entry[name], path)
+        elif not path.exists():
+            raise FileNotFoundError(f"Falta {path.name} para el tenant {tenant}")
+    return paths
+
+
+def _read_partition(tenant: str, version: str) -> TenantPartition:
+    paths = partition_paths(tenant)
+    metadata = add_position_groups(pd.read_csv(paths["players"]))
+    matchlogs = pd.read_csv(paths["matches"])
+    # Nunca se sirven partidos de jugadores ajenos a la lista del tenant
+    matchlogs = matchlogs[matchlogs["Player_ID"].isin(metadata["Player_ID"])]
+    # Los datos del cliente no pasan por la ingesta: se limpian al cargarlos
+    matchlogs, report = check_matchlogs(matchlogs)
+    dropped = sum(report["summary"]["dropped"].values())
+    print(f"🗂️ Partición {tenant} cargada: {metadata['Player_ID'].nunique()} jugadores, {len(matchlogs)} partidos ({dropped} filas descartadas)")
+    return TenantPartition(tenant, version, matchlogs, metadata)
+
+
+def get_partition(tenant: str) -> TenantPartition:
+    """
+    Partición del tenant en la versión actual de sus ficheros. Se carga una
+    vez por proceso (las cargas simultáneas se agrupan) y sale de memoria por
+    LRU cuando otros tenants necesitan el presupuesto.
+    """
+    _ensure_files(validate_tenant(tenant))
+    key = (tenant, partition_version(tenant))
+    found, partition = _partitions.get("partitions", key)
+    if not found:
+        partition = _loads.do(key, _read_partition, *key)
+        _partitions.put("partitions", key, partition)
+    return partition
+
+
+def tenant_matchlogs(tenant: str) -> pd.DataFrame:
+    # Copia superficial, como attach_table: añadir columnas no afecta a otras sesiones
+    return get_partition(tenant).matchlogs.copy(deep=False)
+
+
+def tenant_metadata(tenant: str) -> pd.DataFrame:
+    return get_partition(tenant).metadata.copy(deep=False)
+
+
+def partition_stats() -> pd.DataFrame:
+    return _partitions.stats()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Particiones de datos por tenant.")
+    parser.add_argument("--list", action="store_true", help="Lista los tenants registrados")
+    parser.add_argument("--load", default=None, help="Carga la partición de un tenant y muestra su tamaño")
+    args = parser.parse_args()
+
+    if args.load:
+        partition = get_partition(args.load)
+        print(f"{partition.tenant} (versión {partition.version}, datos {tenant_data_version(args.load)})")
+        print(partition_stats().to_string(index=False))
+    else:
+        for tenant in list_tenants():
+            print(tenant)
@@ -0,0 +1,324 @@
+# src/training.py
+#
+# Entrenamiento reproducible de los artefactos de model/:
+#   python src/training.py --trials 100 --jobs -1
+#
+# 1. Features de los jugadores históricos con el mismo código que la app
+#    (compute_annual_profile), cacheadas en disco según la versión de los datos.
+# 2. peak_group de cada jugador a partir de su carrera completa.
+# 3. Se reserva un HOLDOUT_SIZE de jugadores (estratificado) que no se usa
+#    para buscar, entrenar ni construir las curvas.
+# 4. Búsqueda de hiperparámetros con Optuna en paralelo (LightGBM, XGBoost o
+#    CatBoost; los que no estén instalados se omiten).
+# 5. Distribución de grupos predichos en los reservados: si el modelo solo
+#    predice un grupo, no se guarda nada.
+# 6. Modelo, label encoder, columnas, curvas promedio y manifest de versión.
+
+import argparse
+import importlib.util
+import json
+import os
+from datetime import datetime, timezone
+from importlib import metadata as importlib_metadata
+from pathlib import Path
+
+import joblib
+import optuna
+import pandas as pd
+from sklearn.metrics import balanced_accuracy_score, f1_score
+from sklearn.model_selection import StratifiedKFold, cross_val_score, train_test_split
+from sklearn.preprocessing import LabelEncoder
+
+from analytics import label_peak_groups
+from backtest import backtest_summary, run_backtest
+from curves import build_group_curves, build_position_curves
+from data_loader import DATA_DIR, get_base_data_version, load_cleaned_matchlogs, load_cleaned_metadata
+from features import add_year_since_debut, build_feature_matrix, prepare_player_frames, to_model_input
+from model_utils import MANIFEST_NAME, MODEL_DIR, ModelAssets, get_model_version
+from player_processing import calculate_rating_per_90
+from positions import position_groups_by_player
+
+# === Configuración ===
+CACHE_DIR = DATA_DIR.parent / "cache"
+FEATURE_MAX_YEAR = 3          # El modelo ve los 3 primeros años desde el debut
+N_TRIALS = 60
+CV_FOLDS = 5
+SEED = 42
+MODEL_TYPES = ("lightgbm", "xgboost", "catboost")
+HOLDOUT_SIZE = 0.2
+
+
+# -------------------------
+# Features cacheadas en disco
+# -------------------------
+def load_training_data(max_year: int = FEATURE_MAX_YEAR, n_jobs: int = -1, refresh: bool = False, with_form: bool = False):
+    """
+    Devuelve (X, labels, matches):
+    - X: features por Player_ID con la carrera recortada a `max_year`.
+    - labels: peak_group de cada jugador según su carrera completa.
+    - matches: rating por partido y año desde el debut (para las curvas).
+    Con `with_form`, X incluye la forma reciente al final del año de corte.
+
+    El resultado se guarda en parquet bajo data/cache/ y se reutiliza
+    mientras no cambie la versión de los datos.
+    """
+    cache_dir = CACHE_DIR / f"features_{get_base_data_version()}_y{max_year}{'_form' if with_form else ''}"
+    paths = {name: cache_dir / f"{name}.parquet" for name in ("X", "labels", "matches")}
+
+    if not refresh and all(p.exists() for p in paths.values()):
+        print(f"📦 Features cacheadas: {cache_dir}")
+        X = pd.read_parquet(paths["X"])
+        labels = pd.read_parquet(paths["labels"])["peak_group"]
+        matches = pd.read_parquet(paths["matches"])
+        return X, labels, matches
+
+    print("🧪 Construyendo features desde los matchlogs históricos...")
+    frames = prepare_player_frames(load_cleaned_matchlogs(), load_cleaned_metadata())
+    frames = add_year_since_debut(calculate_rating_per_90(frames))
+
+    X, _ = build_feature_matrix(frames, max_year=max_year, n_jobs=n_jobs, with_form=with_form)
+    _, careers = build_feature_matrix(frames, n_jobs=n_jobs)
+    labels = label_peak_groups(careers).reindex(X.index).dropna()
+    X = X.loc[labels.index]
+    matches = frames.loc[frames["Player_ID"].isin(labels.index), ["Player_ID", "year_since_debut", "rating_per_90"]]
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    X.to_parquet(paths["X"])
+    labels.to_frame().to_parquet(paths["labels"])
+    matches.to_parquet(paths["matches"], index=False)
+    print(f"✅ Features guardadas en {cache_dir} | Jugadores: {len(X)}")
+    return X, labels, matches
+
+
+# -------------------------
+# Búsqueda de hiperparámetros
+# -------------------------
+def _suggest_params(trial: optuna.Trial, model_type: str) -> dict:
+    # Prefijo por tipo de modelo: cada espacio de búsqueda es independiente
+    p = f"{model_type}_"
+    if model_type == "lightgbm":
+        return {
+            "n_estimators": trial.suggest_int(p + "n_estimators", 100, 800, step=50),
+            "learning_rate": trial.suggest_float(p + "learning_rate", 0.01, 0.2, log=True),
+            "num_leaves": trial.suggest_int(p + "num_leaves", 8, 128, log=True),
+            "min_child_samples": trial.suggest_int(p + "min_child_samples", 5, 100),
+            "subsample": trial.suggest_float(p + "subsample", 0.5, 1.0),
+            "subsample_freq": 1,
+            "colsample_bytree": trial.suggest_float(p + "colsample_bytree", 0.5, 1.0),
+            "reg_lambda": trial.suggest_float(p + "reg_lambda", 1e-3, 10.0, log=True),
+            "class_weight": trial.suggest_categorical(p + "class_weight", [None, "balanced"]),
+        }
+    if model_type == "xgboost":
+        return {
+            "n_estimators": trial.suggest_int(p + "n_estimators", 100, 800, step=50),
+            "learning_rate": trial.suggest_float(p + "learning_rate", 0.01, 0.2, log=True),
+            "max_depth": trial.suggest_int(p + "max_depth", 2, 10),
+            "min_child_weight": trial.suggest_float(p + "min_child_weight", 1.0, 20.0, log=True),
+            "subsample": trial.suggest_float(p + "subsample", 0.5, 1.0),
+            "colsample_bytree": trial.suggest_float(p + "colsample_bytree", 0.5, 1.0),
+            "reg_lambda": trial.suggest_float(p + "reg_lambda", 1e-3, 10.0, log=True),
+        }
+    if model_type == "catboost":
+        return {
+            "iterations": trial.suggest_int(p + "iterations", 200, 1000, step=100),
+            "learning_rate": trial.suggest_float(p + "learning_rate", 0.01, 0.2, log=True),
+            "depth": trial.suggest_int(p + "depth", 3, 8),
+            "l2_leaf_reg": trial.suggest_float(p + "l2_leaf_reg", 1.0, 10.0, log=True),
+        }
+    raise ValueError(f"Tipo de modelo no soportado: {model_type}")
+
+
+def make_model(model_type: str, params: dict, n_jobs: int = 1, seed: int = SEED):
+    if model_type == "lightgbm":
+        from lightgbm import LGBMClassifier
+        return LGBMClassifier(objective="multiclass", random_state=seed, n_jobs=n_jobs, verbose=-1, **params)
+    if model_type == "xgboost":
+        from xgboost import XGBClassifier
+        return XGBClassifier(objective="multi:softprob", tree_method="hist", random_state=seed, n_jobs=n_jobs, **params)
+    if model_type == "catboost":
+        from catboost import CatBoostClassifier
+        return CatBoostClassifier(loss_function="MultiClass", random_seed=seed, thread_count=n_jobs, verbose=False, **params)
+    raise ValueError(f"Tipo de modelo no soportado: {model_type}")
+
+
+def available_model_types(model_types=MODEL_TYPES) -> tuple[str, ...]:
+    """
+    Tipos de modelo cuya librería está instalada; avisa de los que se omiten.
+    """
+    available = tuple(m for m in model_types if importlib.util.find_spec(m) is not None)
+    for missing in sorted(set(model_types) - set(available)):
+        print(f"⚠️ {missing} no está instalado: se omite de la búsqueda")
+    if not available:
+        raise ValueError(f"Ninguna librería de modelos disponible entre {list(model_types)}")
+    return available
+
+
+def run_search(X, y, n_trials: int = N_TRIALS, n_jobs: int = -1, model_types=MODEL_TYPES, seed: int = SEED) -> optuna.Study:
+    """
+    Optuna reparte los trials entre hilos; cada modelo entrena con un solo hilo
+    para no sobresuscribir los núcleos (los tres boosters liberan el GIL).
+    """
+    model_types = available_model_types(model_types)
+    cv = StratifiedKFold(n_splits=CV_FOLDS, shuffle=True, random_state=seed)
+
+    def objective(trial: optuna.Trial) -> float:
+        model_type = trial.suggest_categorical("model_type", list(model_types))
+        model = make_model(model_type, _suggest_params(trial, model_type), n_jobs=1, seed=seed)
+        scores = cross_val_score(model, X, y, cv=cv, scoring="f1_macro", n_jobs=1)
+        return float(scores.mean())
+
+    study = optuna.create_study(
+        direction="maximize",
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        study_name="futpeak_peak_group",
+    )
+    workers = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+    study.optimize(objective, n_trials=n_trials, n_jobs=workers, show_progress_bar=False)
+    return study
+
+
+def _best_params(study: optuna.Study) -> tuple[str, dict]:
+    model_type = study.best_params["model_type"]
+    prefix = f"{model_type}_"
+    params = {k[len(prefix):]: v for k, v in study.best_params.items() if k.startswith(prefix)}
+    if model_type == "lightgbm":
+        params["subsample_freq"] = 1
+    return model_type, params
+
+
+def check_class_distribution(y_true, y_pred, classes) -> dict:
+    """
+    Grupos reales y predichos en los jugadores reservados. Un modelo que
+    predice un solo grupo no se publica: ValueError.
+    """
+    y_true, y_pred = pd.Series(y_true), pd.Series(y_pred)
+    report = {
+        "true_counts": {c: int((y_true == c).sum()) for c in classes},
+        "predicted_counts": {c: int((y_pred == c).sum()) for c in classes},
+        "balanced_accuracy": round(float(balanced_accuracy_score(y_true, y_pred)), 4),
+        "f1_macro": round(float(f1_score(y_true, y_pred, average="macro")), 4),
+    }
+    print(f"🧪 Reservados: reales {report['true_counts']} | predichos {report['predicted_counts']}")
+    print(f"   balanced accuracy {report['balanced_accuracy']:.3f} | F1 macro {report['f1_macro']:.3f}")
+    if y_pred.nunique() < 2:
+        raise ValueError(f"El modelo predice un solo grupo ({y_pred.iloc[0]}) para todos los reservados: no se guarda")
+    return report
+
+
+def _library_versions() -> dict:
+    versions = {}
+    for lib in ("lightgbm", "xgboost", "catboost", "optuna", "scikit-learn", "pandas"):
+        try:
+            versions[lib] = importlib_metadata.version(lib)
+        except importlib_metadata.PackageNotFoundError:
+            pass
+    return versions
+
+
+# -------------------------
+# Pipeline completo
+# -------------------------
+def train(
+    output_dir: Path = MODEL_DIR,
+    n_trials: int = N_TRIALS,
+    n_jobs: int = -1,
+    max_year: int = FEATURE_MAX_YEAR,
+    model_types=MODEL_TYPES,
+    refresh_cache: bool = False,
+    with_form: bool = False,
+    position_curves: bool = False,
+    backtest: bool = False,
+    holdout: float = HOLDOUT_SIZE,
+) -> dict:
+    X, labels, matches = load_training_data(max_year=max_year, n_jobs=n_jobs, refresh=refresh_cache, with_form=with_form)
+    model_features = list(X.columns)
+
+    le = LabelEncoder()
+    le.fit(labels.values)
+    print(f"🏷️ Clases: { {k: int(v) for k, v in labels.value_counts().items()} }")
+
+    # Jugadores reservados: fuera de la búsqueda, del ajuste y de las curvas
+    train_ids, holdout_ids = train_test_split(labels.index, test_size=holdout, stratify=labels, random_state=SEED)
+    X_train = to_model_input(X.loc[train_ids], model_features)
+    y_train = le.transform(labels.loc[train_ids].values)
+    print(f"✂️ {len(train_ids)} jugadores para entrenar, {len(holdout_ids)} reservados")
+
+    study = run_search(X_train, y_train, n_trials=n_trials, n_jobs=n_jobs, model_types=model_types)
+    model_type, params = _best_params(study)
+    print(f"🏆 Mejor modelo: {model_type} | F1 macro CV: {study.best_value:.3f}")
+
+    model = make_model(model_type, params, n_jobs=n_jobs)
+    model.fit(X_train, y_train)
+    holdout_pred = le.inverse_transform(model.predict(to_model_input(X.loc[holdout_ids], model_features)))
+    holdout_report = check_class_distribution(labels.loc[holdout_ids].values, holdout_pred, le.classes_)
+
+    train_labels = labels.loc[train_ids]
+    train_matches = matches[matches["Player_ID"].isin(train_ids)]
+    if position_curves:
+        curves = build_position_curves(train_matches, train_labels, position_groups_by_player(load_cleaned_metadata()))
+    else:
+        curves = build_group_curves(train_matches, train_labels)
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, output_dir / "futpeak_model_multi.joblib")
+    joblib.dump(le, output_dir / "label_encoder.joblib")
+    joblib.dump(curves, output_dir / "curvas_promedio.joblib")
+    joblib.dump(model_features, output_dir / "model_features.joblib")
+
+    manifest = {
+        "version": get_model_version(output_dir),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "data_version": get_base_data_version(),
+        "feature_max_year": max_year,
+        "form_features": with_form,
+        "position_curves": position_curves,
+        "n_players": int(len(X)),
+        "n_train_players": int(len(train_ids)),
+        "classes": list(le.classes_),
+        "class_counts": {k: int(v) for k, v in labels.value_counts().items()},
+        "model_type": model_type,
+        "params": params,
+        "cv_f1_macro": round(study.best_value, 4),
+        "n_trials": len(study.trials),
+        "holdout": holdout_report,
+        "holdout_players": sorted(holdout_ids),
+        "model_features": model_features,
+        "libraries": _library_versions(),
+    }
+    if backtest:
+        # Métricas por año de corte, solo sobre los jugadores reservados
+        manifest["backtest"] = backtest_summary(run_backtest(assets=ModelAssets(output_dir), n_jobs=n_jobs, player_ids=holdout_ids))
+    with open(output_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    print(f"💾 Artefactos guardados en {output_dir} | versión {manifest['version']}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entrena el modelo de peak_group de Futpeak.")
+    parser.add_argument("--output", type=Path, default=MODEL_DIR)
+    parser.add_argument("--trials", type=int, default=N_TRIALS)
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--max-year", type=int, default=FEATURE_MAX_YEAR)
+    parser.add_argument("--models", nargs="+", default=list(MODEL_TYPES), choices=MODEL_TYPES)
+    parser.add_argument("--refresh-cache", action="store_true")
+    parser.add_argument("--form", action="store_true")
+    parser.add_argument("--position-curves", action="store_true")
+    parser.add_argument("--backtest", action="store_true")
+    parser.add_argument("--holdout", type=float, default=HOLDOUT_SIZE, help="Fracción de jugadores reservada para evaluar")
+    args = parser.parse_args()
+
+    train(
+        output_dir=args.output,
+        n_trials=args.trials,
+        n_jobs=args.jobs,
+        max_year=args.max_year,
+        model_types=tuple(args.models),
+        refresh_cache=args.refresh_cache,
+        with_form=args.form,
+        position_curves=args.position_curves,
+        backtest=args.backtest,
+        holdout=args.holdout,
+    )
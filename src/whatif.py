@@ -0,0 +1,159 @@
+# src/whatif.py
+#
+# Simulador "¿y si...?": añade temporadas hipotéticas (minutos y rating) al
+# vector de features ya calculado del jugador y vuelve a predecir. Solo se
+# tocan las columnas que dependen de esas temporadas (rating/edad/minutos del
+# año, crecimientos, medias y sumas), a partir de acumulados guardados al
+# crear el simulador; las curvas de cada grupo están precalculadas en arrays.
+# Cada simulación cuesta lo que una predicción de una fila (milisegundos).
+
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from positions import curves_for_position
+
+# Columnas derivadas de compute_annual_profile: nombre → (minuendo, sustraendo)
+DIFF_FEATURES = {
+    "growth_2_1": ("rating_year_2", "rating_year_1"),
+    "growth_3_2": ("rating_year_3", "rating_year_2"),
+    "rating_trend": ("rating_year_3", "rating_year_1"),
+    "minutes_trend": ("minutes_year_3", "minutes_year_1"),
+}
+MINUTES_WEIGHT_CAP = 600
+MAX_PROJECTION_YEAR = 13
+
+
+class WhatIfSimulator:
+    """
+    Reproyección incremental de un jugador con temporadas hipotéticas.
+
+    `X_input` y `seasonal` son los de `prepare_features_from_df` (una fila de
+    features alineada con el modelo y el perfil por temporada). Las temporadas
+    simuladas van a continuación del último año real, una por año.
+    Las features de forma (si el modelo las usa) se mantienen: no hay partidos.
+    """
+
+    def __init__(self, X_input: pd.DataFrame, seasonal: pd.DataFrame, assets, position_group: str | None = None):
+        self.features = list(X_input.columns)
+        self._index = {col: i for i, col in enumerate(self.features)}
+        self._base = X_input.iloc[0].to_numpy(dtype=np.float64).copy()
+
+        real = seasonal.assign(year_since_debut=pd.to_numeric(seasonal["year_since_debut"], errors="coerce"))
+        self.seasonal = real.dropna(subset=["year_since_debut"]).sort_values("year_since_debut").reset_index(drop=True)
+        ratings = self.seasonal["rating_per_90"].to_numpy(dtype=np.float64)
+        self._years = set(self.seasonal["year_since_debut"].astype(int))
+        self._values = {
+            f"{kind}_year_{int(year)}": value
+            for year, rating, minutes, age in self.seasonal[["year_since_debut", "rating_per_90", "Minutes", "Age"]].itertuples(index=False)
+            for kind, value in (("rating", rating), ("minutes", minutes), ("age", age))
+        }
+        # Acumulados de avg_rating y sum_minutes (sobre todos los años del perfil)
+        self._rating_sum = float(np.nansum(ratings))
+        self._rating_n = int(np.count_nonzero(~np.isnan(ratings)))
+        self._minutes_sum = float(self.seasonal["Minutes"].sum())
+        last = self.seasonal.iloc[-1]
+        self.last_year = int(last["year_since_debut"])
+        self.last_age = float(last["Age"]) if pd.notna(last["Age"]) else np.nan
+
+        self.model = assets.model
+        self.classes = assets.label_encoder.inverse_transform(self.model.classes_)
+        self._curves = {}
+        curves = curves_for_position(assets.curves, position_group)
+        curves = curves.assign(year_since_debut=pd.to_numeric(curves["year_since_debut"], errors="coerce"))
+        curves = curves[curves["year_since_debut"] <= MAX_PROJECTION_YEAR].sort_values("year_since_debut")
+        for group, block in curves.groupby("peak_group"):
+            self._curves[group] = {
+                col: block[col].to_numpy(dtype=np.float64)
+                for col in ("year_since_debut", "rating_avg", "rating_p25", "rating_p75") if col in block
+            }
+
+    def feature_vector(self, seasons: list[tuple[float, float]]) -> tuple[np.ndarray, list[str]]:
+        """
+        Vector de features con las temporadas (minutos, rating) añadidas y la
+        lista de columnas que han cambiado respecto al real.
+        """
+        x = self._base.copy()
+        values = {}
+        years = set(self._years)
+        for offset, (minutes, rating) in enumerate(seasons, start=1):
+            year = self.last_year + offset
+            years.add(year)
+            values[f"rating_year_{year}"] = float(rating)
+            values[f"minutes_year_{year}"] = float(minutes)
+            values[f"age_year_{year}"] = self.last_age + offset
+            weight = f"minutes_weight_{year}"
+            if weight in self._index:
+                values[weight] = min(max(float(minutes), 0.0), MINUTES_WEIGHT_CAP) / MINUTES_WEIGHT_CAP
+
+        lookup = {**self._values, **values}
+        for name, (a, b) in DIFF_FEATURES.items():
+            # Igual que en el perfil: solo existe si existen los dos años
+            if (a in values or b in values) and a in lookup and b in lookup:
+                values[name] = lookup[a] - lookup[b]
+
+        n = len(seasons)
+        if n:
+            values["avg_rating"] = (self._rating_sum + sum(r for _, r in seasons)) / (self._rating_n + n)
+            values["sum_minutes"] = self._minutes_sum + sum(m for m, _ in seasons)
+
+        changed = [col for col in values if col in self._index]
+        for col in changed:
+            x[self._index[col]] = values[col]
+        return x, changed
+
+    def _curve(self, group: str, last_year: int, last_rating: float) -> pd.DataFrame:
+        curve = self._curves.get(group)
+        if curve is None:
+            return pd.DataFrame(columns=["peak_group", "year_since_debut", "rating_avg", "projection"])
+        years, avg = curve["year_since_debut"], curve["rating_avg"]
+        # Mismo ajuste que adjust_projection: desplazar al rating del último año
+        at_last = np.flatnonzero(years == last_year)
+        shift = last_rating - avg[at_last[0]] if len(at_last) else 0.0
+        out = pd.DataFrame({"peak_group": group, **curve})
+        out["year_since_debut"] = years.astype(int)
+        out["projection"] = avg + shift
+        return out
+
+    def simulate(self, seasons: list[tuple[float, float]]) -> dict:
+        """
+        {"group", "probabilities", "seasonal" (real + simuladas, con la columna
+        `hypothetical`), "curve", "changed" (features tocadas), "ms"}.
+        """
+        start = time.perf_counter()
+        x, changed = self.feature_vector(seasons)
+        frame = pd.DataFrame(x[None, :], columns=self.features)
+        proba = self.model.predict_proba(frame)[0]
+        group = str(self.classes[int(np.argmax(proba))])
+
+        extra = pd.DataFrame({
+            "year_since_debut": self.last_year + np.arange(1, len(seasons) + 1),
+            "Minutes": [m for m, _ in seasons],
+            "rating_per_90": [r for _, r in seasons],
+            "Age": self.last_age + np.arange(1, len(seasons) + 1),
+        })
+        seasonal = pd.concat(
+            [self.seasonal.assign(hypothetical=False), extra.assign(hypothetical=True)] if len(extra) else [self.seasonal.assign(hypothetical=False)],
+            ignore_index=True,
+        )
+        last = seasonal.iloc[-1]
+        curve = self._curve(group, int(last["year_since_debut"]), float(last["rating_per_90"]))
+        return {
+            "group": group,
+            "probabilities": dict(zip(map(str, self.classes), proba.round(4).tolist())),
+            "seasonal": seasonal,
+            "curve": curve,
+            "changed": changed,
+            "ms": (time.perf_counter() - start) * 1000,
+        }
+
+
+# `_ctx` no entra en la clave: el simulador depende del jugador, los datos (tenant) y el modelo
+@st.cache_resource(max_entries=64)
+def get_whatif_simulator(player_id: str, data_version: str, model_version: str, _ctx) -> WhatIfSimulator:
+    from model_runner import get_model_assets
+
+    X_input, seasonal = _ctx.features
+    return WhatIfSimulator(X_input, seasonal, get_model_assets(), _ctx.position_group)
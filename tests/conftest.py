@@ -0,0 +1,35 @@
+# tests/conftest.py
+#
+# Los módulos de src/ se importan como en la app (desde src/, sin paquete).
+
+import sys
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(SRC_DIR))
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="session")
+def fbref_server():
+    """
+    Servidor HTTP local con las páginas de FBref guardadas en fixtures/fbref.
+    Devuelve su URL base.
+    """
+    handler = partial(_QuietHandler, directory=str(FIXTURES_DIR / "fbref"))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,49 @@
+# tests/test_backtest.py
+#
+# Con el modelo y los CSV del repositorio (se salta si no están).
+
+import pandas as pd
+import pytest
+
+from analytics import label_peak_groups
+from backtest import realised_outcomes, run_backtest
+from data_loader import DATA_FILES
+from features import add_year_since_debut, build_feature_matrix, prepare_player_frames
+from model_utils import MODEL_DIR, ModelAssets
+from player_processing import calculate_rating_per_90
+
+pytestmark = pytest.mark.skipif(
+    not (DATA_FILES["matches"].exists() and (MODEL_DIR / "futpeak_model_multi.joblib").exists()),
+    reason="faltan los datos o el modelo",
+)
+
+
+@pytest.fixture(scope="module")
+def population():
+    matchlogs = pd.read_csv(DATA_FILES["matches"], low_memory=False)
+    metadata = pd.read_csv(DATA_FILES["players"], low_memory=False)
+    ids = sorted(matchlogs["Player_ID"].unique())[:120]
+    matchlogs = matchlogs[matchlogs["Player_ID"].isin(ids)]
+    metadata = metadata[metadata["Player_ID"].isin(ids)]
+    frames = add_year_since_debut(calculate_rating_per_90(prepare_player_frames(matchlogs, metadata)))
+    _, careers = build_feature_matrix(frames, n_jobs=1)
+    return matchlogs, metadata, careers
+
+
+def test_holdout_is_labelled_with_the_full_population(population):
+    matchlogs, metadata, careers = population
+    labels = label_peak_groups(careers)
+    # Reservados: los de menor pico. Etiquetados solo entre ellos, el umbral
+    # del percentil baja y algunos pasarían a "estrella"
+    peaks = realised_outcomes(careers)["true_peak"].dropna().sort_values()
+    holdout = list(peaks.index[: len(peaks) // 2])
+    subset = label_peak_groups(careers[careers["Player_ID"].isin(holdout)])
+    assert (subset != labels[subset.index]).any()
+
+    result = run_backtest((1, 2), ModelAssets(MODEL_DIR), n_jobs=1, matchlogs=matchlogs, metadata=metadata, player_ids=holdout)
+
+    players = result["players"]
+    assert len(players) and set(players["Player_ID"]) <= set(holdout)
+    assert (players["true_group"] == players["Player_ID"].map(labels)).all()
+    assert list(result["metrics"]["cutoff"]) == [1, 2]
+    assert result["metrics"]["n_players"].sum() == len(players)
@@ -0,0 +1,125 @@
+# tests/test_cache_policy.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cache_policy
+from cache_policy import BoundedCache, bounded_cache, estimate_size, frame_key
+
+KB = np.zeros(1024, dtype=np.uint8)
+
+
+def value(kb=1):
+    return np.zeros(kb * 1024, dtype=np.uint8)
+
+
+def test_estimate_size():
+    assert estimate_size(KB) == 1024
+    df = pd.DataFrame({"a": np.arange(100, dtype=np.int64)})
+    assert estimate_size(df) >= 800
+    # Los objetos repetidos solo cuentan una vez
+    assert estimate_size([KB, KB]) < 2 * 1024
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        BoundedCache(1024, policy="fifo")
+
+
+def test_lru_evicts_least_recent():
+    cache = BoundedCache(3 * 1024 + 200, policy="lru")
+    for key in "abc":
+        cache.put("ns", key, value())
+    cache.get("ns", "a")
+    cache.put("ns", "d", value())
+
+    assert cache.get("ns", "b") == (False, None)
+    assert cache.get("ns", "a")[0] and cache.get("ns", "d")[0]
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_lfu_evicts_least_used():
+    cache = BoundedCache(3 * 1024 + 200, policy="lfu")
+    for key in "abc":
+        cache.put("ns", key, value())
+    for key in "ab":
+        cache.get("ns", key)
+    cache.get("ns", "a")
+    cache.put("ns", "d", value())
+
+    assert not cache.get("ns", "c")[0]
+    assert cache.get("ns", "a")[0] and cache.get("ns", "b")[0]
+
+
+def test_max_entries_only_evicts_own_namespace():
+    cache = BoundedCache(2**20)
+    cache.put("other", "x", value())
+    for key in range(5):
+        cache.put("ns", key, value(), max_entries=2)
+
+    stats = cache.stats().set_index("namespace")
+    assert stats.loc["ns", "entries"] == 2
+    assert stats.loc["ns", "evictions"] == 3
+    assert cache.get("other", "x")[0]
+
+
+def test_ttl_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_policy.time, "monotonic", lambda: now[0])
+    cache = BoundedCache(2**20)
+    cache.put("ns", "k", value(), ttl=10)
+
+    assert cache.get("ns", "k")[0]
+    now[0] += 11
+    assert not cache.get("ns", "k")[0]
+    assert cache.stats().set_index("namespace").loc["ns", "expirations"] == 1
+
+
+def test_oversized_value_is_rejected():
+    cache = BoundedCache(1024)
+    cache.put("ns", "k", value(4))
+
+    assert not cache.get("ns", "k")[0]
+    assert cache.total_bytes == 0
+    assert cache.stats().set_index("namespace").loc["ns", "rejected"] == 1
+
+
+def test_replacing_a_key_keeps_accounting():
+    cache = BoundedCache(2**20)
+    cache.put("ns", "k", value(2))
+    cache.put("ns", "k", value(1))
+
+    assert cache.total_bytes == estimate_size(value(1))
+    cache.clear("ns")
+    assert cache.total_bytes == 0
+
+
+def test_frame_key_ignores_content_beyond_summary():
+    df = pd.DataFrame({"Player_ID": ["p1", "p1"], "Date": ["2024-01-01", "2024-02-01"], "Minutes": [90, 45]})
+    assert frame_key(df) == ("p1", 2, "2024-02-01", 135.0)
+    assert frame_key(df.iloc[:0]) == (None, 0, "None", 0.0)
+
+
+def test_bounded_cache_keys_on_data_version(monkeypatch):
+    version = ["v1"]
+    monkeypatch.setattr(cache_policy, "get_data_version", lambda: version[0])
+    calls = []
+
+    @bounded_cache("test_decorator", key=lambda player_id: player_id, copy=True)
+    def compute(player_id):
+        calls.append(player_id)
+        return pd.DataFrame({"player": [player_id]})
+
+    try:
+        first = compute("p1")
+        first.loc[0, "player"] = "mutado"
+        # copy=True: la mutación del llamante no llega a la caché
+        assert compute("p1").loc[0, "player"] == "p1"
+        assert calls == ["p1"]
+
+        version[0] = "v2"
+        compute("p1")
+        assert calls == ["p1", "p1"]
+    finally:
+        compute.clear()
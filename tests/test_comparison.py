@@ -0,0 +1,88 @@
+# tests/test_comparison.py
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import comparison
+from comparison import COMPARISON_COLUMNS, compare_players
+
+CLASSES = np.array(["estrellato tardío", "joven estrella", "jugador medio"])
+FEATURES = ["avg_rating", "sum_minutes", "rating_year_1"]
+
+
+def predict_proba(X):
+    score = X["avg_rating"].to_numpy() + X["sum_minutes"].to_numpy() / 1e4
+    logits = np.stack([score, 2 * score - 2, np.full_like(score, 1.5)], axis=1)
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+@pytest.fixture
+def data(monkeypatch):
+    curves = pd.DataFrame([
+        {"peak_group": group, "year_since_debut": year, "rating_avg": 1.0 + k + 0.1 * year, "rating_p25": 0.5, "rating_p75": 2.5}
+        for k, group in enumerate(CLASSES) for year in range(1, 15)
+    ])
+    model = SimpleNamespace(classes_=np.arange(3), predict_proba=predict_proba)
+    le = SimpleNamespace(inverse_transform=lambda codes: CLASSES[np.asarray(codes)])
+    monkeypatch.setattr(comparison, "get_model_assets", lambda: (model, le, curves, FEATURES))
+
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2019-01-01", "2023-12-31", freq="21D")
+    matchlogs = pd.concat([
+        pd.DataFrame({
+            "Player_ID": pid, "Date": dates.strftime("%Y-%m-%d"),
+            "Minutes": rng.integers(0, 91, len(dates)), "Goals": rng.integers(0, 3, len(dates)),
+            "Assists": rng.integers(0, 2, len(dates)), "Shots": 3, "Shots_on_target": 1,
+            "Yellow_cards": 0, "Red_cards": 0,
+        })
+        for pid in ("a", "b", "c")
+    ], ignore_index=True)
+    metadata = pd.DataFrame({
+        "Player_ID": ["a", "b", "c"], "Player_name": ["A", "B", "C"], "Club": ["X", "Y", "Z"],
+        "Birth_date": ["2001-01-01", "2000-06-01", "2002-03-01"], "Position": ["FW", "MF (AM)", "DF"],
+    })
+    return matchlogs, metadata
+
+
+def test_batch_matches_each_player_alone(data):
+    matchlogs, metadata = data
+    together = compare_players(["c", "a", "c", "b", "zz"], matchlogs, metadata)
+
+    players = together["players"]
+    assert list(players.columns) == COMPARISON_COLUMNS
+    # Orden pedido, sin duplicados ni desconocidos
+    assert players["Player_ID"].tolist() == ["c", "a", "b"]
+    for pid in ("a", "b", "c"):
+        alone = compare_players([pid], matchlogs, metadata)
+        pd.testing.assert_frame_equal(
+            players[players["Player_ID"] == pid].reset_index(drop=True), alone["players"], check_dtype=False,
+        )
+        pd.testing.assert_frame_equal(
+            together["projections"].query("Player_ID == @pid").reset_index(drop=True),
+            alone["projections"].reset_index(drop=True),
+            check_dtype=False,
+        )
+
+
+def test_probability_and_peak(data):
+    matchlogs, metadata = data
+    result = compare_players(["a"], matchlogs, metadata)
+    row = result["players"].iloc[0]
+    projection = result["projections"]
+
+    assert row["peak_group"] in CLASSES
+    assert 1 / 3 < row["probability"] <= 1
+    assert row["projected_peak"] == pytest.approx(projection["projection"].max())
+    # La proyección pasa por el rating del último año real
+    last = projection[projection["year_since_debut"] == row["seasons"]]["projection"].item()
+    assert last == pytest.approx(row["current_rating"])
+
+
+def test_no_matches_returns_empty_table(data):
+    _, metadata = data
+    result = compare_players(["zz"], pd.DataFrame(columns=["Player_ID", "Date"]), metadata)
+    assert result["players"].empty and list(result["players"].columns) == COMPARISON_COLUMNS
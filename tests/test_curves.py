@@ -0,0 +1,78 @@
+# tests/test_curves.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from curves import QuantileSketch, build_group_curves
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(0).normal(1.0, 0.5, 20_000)
+
+
+def test_empty_sketch():
+    sketch = QuantileSketch().update([np.nan])
+    assert sketch.count == 0
+    assert np.isnan(sketch.mean)
+    assert np.isnan(sketch.quantile(0.5))
+
+
+def test_exact_before_compression():
+    sketch = QuantileSketch(compression=100).update([3.0, 1.0, np.nan, 2.0, 4.0])
+    assert sketch.count == 4
+    assert sketch.quantile(0.25) == pytest.approx(np.quantile([1, 2, 3, 4], 0.25))
+    assert sketch.mean == pytest.approx(2.5)
+
+
+def test_compressed_quantiles_are_close(values):
+    sketch = QuantileSketch(compression=200)
+    for block in np.array_split(values, 40):
+        sketch.update(block)
+
+    # Memoria acotada, media exacta y cuantiles aproximados
+    assert sketch.means.size <= 4 * sketch.compression
+    assert sketch.count == values.size
+    assert sketch.mean == pytest.approx(values.mean())
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.02)
+    assert sketch.quantile(0) == values.min()
+    assert sketch.quantile(1) == values.max()
+
+
+def test_merge_matches_single_sketch(values):
+    left = QuantileSketch().update(values[:7_000])
+    right = QuantileSketch().update(values[7_000:])
+    merged = left.merge(right).merge(QuantileSketch())
+
+    assert merged.count == values.size
+    assert merged.min == values.min() and merged.max == values.max()
+    assert merged.mean == pytest.approx(values.mean())
+    for q in (0.25, 0.5, 0.75):
+        assert merged.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.02)
+
+
+def test_group_curves_match_groupby():
+    rng = np.random.default_rng(1)
+    matches = pd.DataFrame({
+        "Player_ID": rng.choice(["a", "b", "c", "d"], 500),
+        "year_since_debut": rng.integers(0, 6, 500),
+        "rating_per_90": rng.normal(1.0, 0.5, 500),
+    })
+    labels = pd.Series({"a": "Joven estrella", "b": "Joven estrella", "c": "Tardío", "d": "Tardío"})
+
+    curves = build_group_curves(matches, labels)
+
+    expected = (
+        matches[matches["year_since_debut"] >= 1]
+        .assign(peak_group=lambda df: df["Player_ID"].map(labels))
+        .groupby(["peak_group", "year_since_debut"])["rating_per_90"]
+        .agg(rating_avg="mean", rating_p25=lambda s: s.quantile(0.25), rating_p75=lambda s: s.quantile(0.75), n_matches="size")
+        .reset_index()
+    )
+    pd.testing.assert_frame_equal(
+        curves.sort_values(["peak_group", "year_since_debut"]).reset_index(drop=True),
+        expected,
+        check_dtype=False,
+    )
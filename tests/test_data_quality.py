@@ -0,0 +1,85 @@
+# tests/test_data_quality.py
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_quality import check_matchlogs, default_output, run_quality_stage
+
+
+@pytest.fixture
+def matchlogs():
+    return pd.DataFrame({
+        "Player_ID": ["p1", "p1", "p1", "p1", "p2", "p2", "p2", "p2"],
+        "Date": ["2023-01-10", "2023-01-10", "no es fecha", "2023-02-01", "2021-05-01", "2023-05-01", "2030-01-01", "2023-06-01"],
+        "Rival_team": ["Rayo", " rayo ", "Getafe", "Betis", "Celta", "Celta", "Sevilla", "Cádiz"],
+        "Minutes": [90, 90, 90, 130, 80, 75, 90, None],
+        "Goals": ["1", "1", "0", "0", "n/a", "2", "0", "0"],
+        "Shots": [3, 3, 1, 1, 2, 2, 1, 0],
+        "Shots_on_target": [1, 1, 0, 0, 5, 1, 1, 0],
+    })
+
+
+def test_rows_are_dropped_and_cells_blanked(matchlogs):
+    cleaned, report = check_matchlogs(matchlogs, reference_date="2024-01-01")
+    summary = report["summary"]
+
+    # Duplicado (mismo rival sin mayúsculas ni espacios), fecha ilegible,
+    # minutos imposibles y fila sin minutos
+    assert summary["dropped"] == {"bad_date": 1, "empty_minutes": 1, "impossible_minutes": 1, "duplicate": 1}
+    assert summary["rows_out"] == len(cleaned) == 4
+    assert list(cleaned["Date"]) == ["2023-01-10", "2021-05-01", "2023-05-01", "2030-01-01"]
+    # Celdas no numéricas o imposibles se vacían sin perder la fila
+    assert summary["non_numeric"] == {"Goals": 1}
+    assert summary["impossible_values"] == {"Shots_on_target_gt_Shots": 1}
+    row = cleaned.set_index("Date").loc["2021-05-01"]
+    assert np.isnan(row["Goals"]) and np.isnan(row["Shots_on_target"])
+    assert list(cleaned.columns) == list(matchlogs.columns)
+
+
+def test_future_dates_depend_only_on_reference_date(matchlogs):
+    _, first = check_matchlogs(matchlogs, reference_date="2024-01-01")
+    _, again = check_matchlogs(matchlogs, reference_date="2024-01-01")
+    _, later = check_matchlogs(matchlogs, reference_date="2031-01-01")
+
+    assert first["summary"]["future_dates"] == again["summary"]["future_dates"] == 1
+    assert first["summary"]["reference_date"] == "2024-01-01"
+    assert later["summary"]["future_dates"] == 0
+    # Las fechas futuras se señalan, no se borran
+    assert (first["issues"]["issue"] == "future_date").sum() == 1
+
+
+def test_date_gaps_are_reported(matchlogs):
+    _, report = check_matchlogs(matchlogs, gap_days=365, reference_date="2024-01-01")
+
+    gaps = report["gaps"]
+    assert list(gaps["Player_ID"]) == ["p2", "p2"]
+    assert list(gaps["days"]) == [730, 2437]
+
+
+def test_quality_stage_writes_separate_output(matchlogs, tmp_path):
+    source = tmp_path / "matchlogs.csv"
+    matchlogs.to_csv(source, index=False)
+    original = source.read_bytes()
+
+    summary = run_quality_stage(source, reference_date="2024-01-01")
+
+    assert source.read_bytes() == original
+    assert len(pd.read_csv(default_output(source))) == summary["rows_out"] == 4
+    report = json.loads((tmp_path / "matchlogs_clean_quality" / "summary.json").read_text(encoding="utf-8"))
+    assert report["reference_date"] == "2024-01-01"
+
+
+def test_quality_stage_overwrites_only_when_asked(matchlogs, tmp_path):
+    source = tmp_path / "matchlogs.csv"
+    matchlogs.to_csv(source, index=False)
+
+    with pytest.raises(ValueError):
+        run_quality_stage(source, source)
+    assert len(pd.read_csv(source)) == len(matchlogs)
+
+    run_quality_stage(source, overwrite=True, reference_date="2024-01-01")
+    assert len(pd.read_csv(source)) == 4
+    assert not default_output(source).exists()
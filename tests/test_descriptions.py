@@ -0,0 +1,34 @@
+# tests/test_descriptions.py
+
+import pytest
+
+import descriptions
+from cache_policy import get_cache
+from gemini_utils import FakeTransport, LLMClient, LLMError
+from rate_limit import TokenBucket
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    transport = FakeTransport(reply="Buen jugador con **margen** de mejora")
+    client = LLMClient(transport, TokenBucket(1000, capacity=1000), retries=0)
+    monkeypatch.setattr(descriptions, "get_llm_client", lambda: client)
+    monkeypatch.setattr(descriptions, "generar_prompt_conclusion", lambda player_id, _ctx=None: f"prompt {player_id}")
+    yield transport
+    get_cache().clear(descriptions.CONCLUSION_CACHE)
+
+
+def test_stream_is_cached_after_the_first_call(transport):
+    first = "".join(descriptions.generar_conclusion_stream("p1"))
+    # La siguiente pasada (rerun de Streamlit) no vuelve a llamar a la IA
+    assert list(descriptions.generar_conclusion_stream("p1")) == [first]
+    assert descriptions.generar_conclusion_completa("p1") == first.replace("**", "")
+    assert transport.calls == ["prompt p1"]
+
+
+def test_errors_are_shown_but_not_cached(transport):
+    transport.failures = [LLMError("clave no válida")]
+
+    assert "".join(descriptions.generar_conclusion_stream("p2")) == "❌ Error del servidor IA: clave no válida"
+    assert "margen" in descriptions.generar_conclusion_completa("p2")
+    assert len(transport.calls) == 2
@@ -0,0 +1,65 @@
+# tests/test_form.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import compute_rating
+from form import RollingForm, form_columns, latest_form
+
+
+@pytest.fixture
+def matches():
+    rng = np.random.default_rng(0)
+    rows = []
+    for p in range(15):
+        n = int(rng.integers(1, 60))
+        dates = pd.Timestamp("2020-01-01") + pd.to_timedelta(np.sort(rng.choice(1500, n, replace=False)), unit="D")
+        rows.append(pd.DataFrame({
+            "Player_ID": f"p{p}",
+            "Date": dates,
+            "Minutes": rng.integers(0, 91, n),
+            "Goals": rng.integers(0, 3, n),
+            "Assists": rng.integers(0, 2, n),
+            "Shots": rng.integers(0, 5, n),
+            "Shots_on_target": rng.integers(0, 2, n),
+            "Yellow_cards": rng.integers(0, 2, n),
+            "Red_cards": 0,
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def test_windows_match_a_direct_computation(matches):
+    form = latest_form(matches)
+    player = matches[matches["Player_ID"] == "p0"].sort_values("Date")
+    last5 = player.tail(5)
+
+    assert form.loc["p0", "form_rating_5"] == pytest.approx(compute_rating(last5).mean())
+    ga90 = (last5["Goals"] + last5["Assists"]).sum() / (last5["Minutes"].sum() / 90)
+    assert form.loc["p0", "form_ga90_5"] == pytest.approx(ga90)
+    assert form.loc["p0", "form_min_share_5"] == pytest.approx(last5["Minutes"].sum() / (90 * len(last5)))
+
+
+def test_incremental_update_equals_full_recompute(matches):
+    cutoffs = pd.to_datetime(["2020-06-01", "2021-01-01", "2022-03-01", "2030-01-01"])
+    rolling = RollingForm(matches[matches["Date"] < cutoffs[0]])
+    for start, end in zip(cutoffs[:-1], cutoffs[1:]):
+        batch = matches[(matches["Date"] >= start) & (matches["Date"] < end)]
+        updated = rolling.update(batch)
+        assert set(updated.index) == set(batch["Player_ID"])
+
+    expected = latest_form(matches)
+    result = rolling.latest.loc[expected.index]
+    assert len(rolling) == expected.index.nunique()
+    np.testing.assert_allclose(
+        result[form_columns()].to_numpy(float), expected[form_columns()].to_numpy(float), rtol=1e-9, atol=1e-9,
+    )
+    assert (result["Date"] == expected["Date"]).all()
+
+
+def test_update_with_no_matches_changes_nothing(matches):
+    rolling = RollingForm(matches)
+    before = rolling.latest.copy()
+
+    assert rolling.update(matches.iloc[:0]).empty
+    pd.testing.assert_frame_equal(rolling.latest, before)
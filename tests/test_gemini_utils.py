@@ -0,0 +1,292 @@
+# tests/test_gemini_utils.py
+#
+# Sin red: FakeTransport para la política de reintentos y un http.server local
+# para HTTPTransport.
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+import gemini_utils
+from gemini_utils import FakeTransport, GeminiTransport, HTTPTransport, LLMClient, LLMError
+from rate_limit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def waits():
+    return []
+
+
+@pytest.fixture
+def client_factory(waits, monkeypatch):
+    # Jitter fijo para poder comprobar la espera exacta
+    monkeypatch.setattr(gemini_utils.random, "uniform", lambda a, b: 1.0)
+
+    def make(transport, retries=3, backoff=1.0, max_backoff=20.0, limiter=None):
+        limiter = limiter or TokenBucket(1000, capacity=1000)
+        return LLMClient(transport, limiter, retries=retries, backoff=backoff, max_backoff=max_backoff, sleep=waits.append)
+
+    return make
+
+
+def busy():
+    return LLMError("HTTP 503", retryable=True)
+
+
+# -------------------------
+# Reintentos y backoff
+# -------------------------
+def test_generate_retries_retryable_errors(client_factory, waits):
+    transport = FakeTransport(reply="ok", failures=[busy(), busy()])
+    client = client_factory(transport)
+
+    assert client.generate("hola") == "ok"
+    assert len(transport.calls) == 3
+    assert waits == [1.0, 2.0]
+
+
+def test_backoff_is_capped(client_factory, waits):
+    transport = FakeTransport(reply="ok", failures=[busy() for _ in range(5)])
+    client = client_factory(transport, retries=5, backoff=1.0, max_backoff=4.0)
+
+    client.generate("hola")
+    assert waits == [1.0, 2.0, 4.0, 4.0, 4.0]
+
+
+def test_backoff_jitter_bounds(waits):
+    transport = FakeTransport(reply="ok", failures=[busy() for _ in range(20)])
+    client = LLMClient(transport, TokenBucket(1000, capacity=1000), retries=20, backoff=1.0, max_backoff=8.0, sleep=waits.append)
+
+    client.generate("hola")
+    for attempt, wait in enumerate(waits):
+        base = min(8.0, 2 ** attempt)
+        assert 0.5 * base <= wait <= 1.5 * base
+
+
+def test_gives_up_after_retries(client_factory, waits):
+    transport = FakeTransport(reply="ok", failures=[busy() for _ in range(4)])
+    client = client_factory(transport, retries=2)
+
+    with pytest.raises(LLMError):
+        client.generate("hola")
+    assert len(transport.calls) == 3
+    assert len(waits) == 2
+
+
+def test_non_retryable_error_is_raised_immediately(client_factory, waits):
+    transport = FakeTransport(reply="ok", failures=[LLMError("clave no válida")])
+    client = client_factory(transport)
+
+    with pytest.raises(LLMError, match="clave no válida"):
+        client.generate("hola")
+    assert len(transport.calls) == 1
+    assert waits == []
+
+
+def test_stream_retries_before_first_chunk(client_factory, waits):
+    transport = FakeTransport(reply="uno dos", failures=[busy()])
+    client = client_factory(transport)
+
+    assert "".join(client.stream("hola")) == "uno dos "
+    assert len(transport.calls) == 2
+    assert waits == [1.0]
+
+
+class BrokenStream:
+    """Emite un trozo y después falla con un error reintentable."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def stream(self, prompt, temperature):
+        self.calls += 1
+        yield "primer trozo "
+        raise busy()
+
+
+def test_stream_does_not_retry_after_first_chunk(client_factory, waits):
+    transport = BrokenStream()
+    client = client_factory(transport)
+    received = []
+
+    with pytest.raises(LLMError):
+        for chunk in client.stream("hola"):
+            received.append(chunk)
+    # Reintentar duplicaría el texto ya mostrado
+    assert received == ["primer trozo "]
+    assert transport.calls == 1
+    assert waits == []
+
+
+def test_each_attempt_takes_a_token(client_factory):
+    clock = FakeClock()
+    limiter = TokenBucket(rate=1.0, capacity=2.0, clock=clock, sleep=clock.sleep)
+    transport = FakeTransport(reply="ok", failures=[busy(), busy()])
+    client = client_factory(transport, limiter=limiter)
+
+    client.generate("hola")
+    # 3 intentos con 2 tokens de ráfaga: el tercero espera 1 s a que se repongan
+    assert clock.now == pytest.approx(1.0)
+    assert not limiter.try_acquire()
+
+
+# -------------------------
+# HTTPTransport
+# -------------------------
+class _LLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests: list[dict] = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body: bytes, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunked(self, pieces: list[str]):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for piece in pieces:
+                data = piece.encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+                # El resto llega más tarde: el cliente puede cortar entre trozos
+                time.sleep(0.05)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests.append(payload)
+        if self.path == "/ok":
+            self._send(200, json.dumps({"result": "respuesta"}).encode())
+        elif self.path == "/error":
+            self._send(400, json.dumps({"error": "prompt vacío"}).encode())
+        elif self.path == "/busy":
+            self._send(503, b"")
+        elif self.path == "/text":
+            self._send_chunked(["trozo "] * 3)
+        else:
+            self._send(200, b"<html>no json</html>", content_type="text/html")
+
+
+@pytest.fixture(scope="module")
+def llm_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _LLMHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_sends_temperature(llm_server):
+    _LLMHandler.requests.clear()
+    transport = HTTPTransport(f"{llm_server}/ok", timeout=5)
+
+    assert transport.generate("hola", temperature=0.7) == "respuesta"
+    assert _LLMHandler.requests == [{"prompt": "hola", "generationConfig": {"temperature": 0.7}}]
+
+
+def test_http_error_mapping(llm_server):
+    with pytest.raises(LLMError, match="prompt vacío") as error:
+        HTTPTransport(f"{llm_server}/error", timeout=5).generate("", 0.3)
+    assert not error.value.retryable
+
+    with pytest.raises(LLMError) as error:
+        HTTPTransport(f"{llm_server}/busy", timeout=5).generate("hola", 0.3)
+    assert error.value.retryable
+
+    with pytest.raises(LLMError, match="respuesta no válida"):
+        HTTPTransport(f"{llm_server}/html", timeout=5).generate("hola", 0.3)
+
+
+def test_http_connection_error_is_retryable():
+    # Puerto 9 (discard): nadie escucha
+    with pytest.raises(LLMError) as error:
+        HTTPTransport("http://127.0.0.1:9/generate", timeout=2).generate("hola", 0.3)
+    assert error.value.retryable
+
+
+def test_http_stream_closes_response(llm_server, monkeypatch):
+    transport = HTTPTransport(f"{llm_server}/text", timeout=5)
+    session = transport._session()
+    closed = []
+    post = session.post
+
+    def tracking_post(*args, **kwargs):
+        response = post(*args, **kwargs)
+        close = response.close
+        response.close = lambda: (closed.append(response), close())
+        return response
+
+    monkeypatch.setattr(session, "post", tracking_post)
+
+    stream = transport.stream("hola", 0.3)
+    assert next(stream) == "trozo "
+    # El llamante deja de leer a mitad: la respuesta se cierra explícitamente
+    stream.close()
+    assert len(closed) == 1
+    assert closed[0].raw.closed
+
+    assert "".join(transport.stream("hola", 0.3)) == "trozo " * 3
+    assert len(closed) == 2
+
+
+def test_http_stream_json_fallback(llm_server):
+    assert list(HTTPTransport(f"{llm_server}/ok", timeout=5).stream("hola", 0.3)) == ["respuesta"]
+
+
+# -------------------------
+# GeminiTransport (sin la librería de Google)
+# -------------------------
+class _BlockedChunk:
+    @property
+    def text(self):
+        raise ValueError("The response was blocked (finish_reason: SAFETY)")
+
+
+def _gemini(chunks):
+    # Se salta __init__: solo se prueba la traducción de errores de `stream`
+    transport = GeminiTransport.__new__(GeminiTransport)
+    transport._retryable = (TimeoutError,)
+    transport._api_error = ConnectionError
+    model = SimpleNamespace(generate_content=lambda prompt, stream: iter(chunks))
+    transport._model = lambda temperature: model
+    return transport
+
+
+def test_gemini_blocked_chunk_maps_to_llm_error():
+    transport = _gemini([SimpleNamespace(text="hola "), _BlockedChunk()])
+
+    with pytest.raises(LLMError, match="blocked") as error:
+        transport.generate("hola", 0.3)
+    assert not error.value.retryable
+
+
+def test_gemini_skips_empty_chunks():
+    transport = _gemini([SimpleNamespace(text="hola"), SimpleNamespace(text=""), SimpleNamespace(text=" mundo")])
+    assert transport.generate("hola", 0.3) == "hola mundo"
@@ -0,0 +1,132 @@
+# tests/test_ingestion.py
+
+import pandas as pd
+import pytest
+
+from ingestion import pipeline
+from ingestion.checkpoint import Checkpoint
+from ingestion.fetcher import Fetcher
+from ingestion.parsers import (
+    parse_country_players,
+    parse_matchlog_links,
+    parse_matchlog_table,
+    parse_player_metadata,
+    season_from_link,
+)
+
+PEDRI = "/en/players/1a2b3c4d/Pedri"
+GAVI = "/en/players/5e6f7a8b/Gavi"
+
+
+@pytest.fixture
+def fetcher(fbref_server):
+    return Fetcher(base_url=fbref_server, rate=1000, max_workers=2, retries=0)
+
+
+@pytest.fixture
+def players():
+    return pd.DataFrame({
+        "Player_ID": ["1a2b3c4d", "5e6f7a8b"],
+        "Player_name": ["Pedri", "Gavi"],
+        "Url_template": [PEDRI, GAVI],
+    })
+
+
+def test_parse_country_players(fetcher):
+    html = fetcher.get("/en/country/players/ESP/Spain-Football-Players")
+    players = parse_country_players(html, "Spain")
+
+    assert len(players) == 12
+    assert players[0] == {
+        "Player_ID": "1a2b3c4d",
+        "Player_name": "Pedri",
+        "Url_template": PEDRI,
+        "Years": "2019-2025",
+        "Position": "MF",
+        "Clubs": "Las Palmas, Barcelona",
+        "Country": "Spain",
+    }
+
+
+def test_parse_player_metadata(fetcher):
+    record = parse_player_metadata(fetcher.get(PEDRI))
+
+    assert record == {
+        "Full_name": "Pedro González López",
+        "Position": "MF (CM-WM)",
+        "Footed": "Right",
+        "Birth_date": "2002-11-25",
+        "Age": "22-200",
+        "Birth_place": "Tegueste, Spain",
+        "Nationality": "Spain",
+        "Club": "Barcelona",
+    }
+
+
+def test_parse_matchlog_links(fetcher):
+    links = parse_matchlog_links(fetcher.get(PEDRI))
+
+    # Solo los match logs "summary": el de pases se ignora
+    assert sorted(season_from_link(link) for link in links) == ["2021-2022", "2022-2023"]
+
+
+def test_parse_matchlog_table_visible_and_commented(fetcher):
+    visible = parse_matchlog_table(fetcher.get("/en/players/1a2b3c4d/matchlogs/2021-2022/summary/Pedri-Match-Logs"))
+    commented = parse_matchlog_table(fetcher.get("/en/players/1a2b3c4d/matchlogs/2022-2023/summary/Pedri-Match-Logs"))
+
+    # La fila de cabecera repetida (class="thead") no cuenta; la de "no jugó" sí
+    assert [row["Date"] for row in visible] == ["2021-08-15", "2021-08-21", "2022-05-08", "2022-05-15"]
+    assert visible[0]["Opponent"] == "es Real Sociedad"
+    assert visible[0]["Min"] == "90"
+    assert [row["Date"] for row in commented] == ["2022-08-13", "2022-08-21"]
+    assert commented[1]["SoT"] == "2"
+
+
+def test_missing_page_returns_none(fetcher):
+    assert fetcher.get("/en/players/00000000/Nobody") is None
+
+
+def test_ingest_matchlogs_normalizes(fetcher, players, tmp_path):
+    output = tmp_path / "matchlogs.csv"
+    rows = pipeline.ingest_matchlogs(players, fetcher, output)
+
+    df = pd.read_csv(output, dtype={"Player_ID": str})
+    assert rows == len(df) == 8
+    assert set(df["Rival_team"]) >= {"Real Sociedad", "Rayo Vallecano"}
+    assert (df["Position"] != "On matchday squad, but did not play").all()
+    assert set(Checkpoint(output.with_suffix(".matchlogs.done")).pending(players["Player_ID"])) == set()
+
+
+def test_resume_after_crash_between_append_and_mark(fetcher, players, tmp_path, monkeypatch):
+    output = tmp_path / "matchlogs.csv"
+    checkpoint = tmp_path / "matchlogs.done"
+
+    # 1ª ejecución: las filas se escriben pero el proceso "muere" antes del checkpoint
+    def crash(self, key):
+        raise RuntimeError("proceso interrumpido")
+
+    with monkeypatch.context() as m:
+        m.setattr(Checkpoint, "mark", crash)
+        pipeline.ingest_matchlogs(players, fetcher, output, checkpoint)
+    assert len(pd.read_csv(output)) == 8
+    assert not checkpoint.exists()
+
+    # 2ª ejecución: se reanuda sin duplicar filas
+    pipeline.ingest_matchlogs(players, fetcher, output, checkpoint)
+    df = pd.read_csv(output, dtype={"Player_ID": str})
+    assert len(df) == 8
+    assert not df.duplicated(["Player_ID", "Date"]).any()
+
+    # 3ª ejecución: todo hecho, no se toca nada
+    assert pipeline.ingest_matchlogs(players, fetcher, output, checkpoint) == 0
+    assert len(pd.read_csv(output)) == 8
+
+
+def test_resume_keeps_rows_of_finished_players(fetcher, players, tmp_path):
+    output = tmp_path / "metadata.csv"
+    checkpoint = tmp_path / "metadata.done"
+    pipeline.ingest_metadata(players.iloc[:1], fetcher, output, checkpoint)
+    pipeline.ingest_metadata(players, fetcher, output, checkpoint)
+
+    df = pd.read_csv(output, dtype={"Player_ID": str})
+    assert sorted(df["Player_ID"]) == ["1a2b3c4d", "5e6f7a8b"]
@@ -0,0 +1,81 @@
+# tests/test_leaderboard.py
+
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from leaderboard import LEADERBOARD_COLUMNS, RankingIndex
+
+
+def record(player_id, peak, **facets):
+    return {
+        "Player_ID": player_id, "Player_name": player_id, "Club": "", "Age": 20.0,
+        "position_group": "MIDFIELD", "age_band": "20-21", "peak_group": "jugador medio",
+        "projected_peak": peak, "current_rating": 1.0, "seasons": 3, **facets,
+    }
+
+
+@pytest.fixture
+def index():
+    board = pd.DataFrame([
+        record("a", 3.0), record("b", 5.0, peak_group="joven estrella"),
+        record("c", np.nan), record("d", 4.0, age_band="<20"),
+    ], columns=LEADERBOARD_COLUMNS)
+    return RankingIndex(board)
+
+
+def test_top_orders_and_filters(index):
+    assert index.top(10)["Player_ID"].tolist() == ["b", "d", "a", "c"]
+    assert index.top(1, age_band="<20")["Player_ID"].tolist() == ["d"]
+    assert index.top(5, peak_group="estrellato tardío").empty
+    with pytest.raises(ValueError):
+        index.top(5, club="x")
+
+
+def test_update_moves_and_removes_players(index):
+    index.update([record("a", 9.0, peak_group="joven estrella")], removed=["b"])
+
+    assert index.top(10)["Player_ID"].tolist() == ["a", "d", "c"]
+    assert index.top(10, peak_group="joven estrella")["Player_ID"].tolist() == ["a"]
+    assert index.facet_values("peak_group") == ["joven estrella", "jugador medio"]
+    assert "b" not in index and len(index) == 3
+
+
+@pytest.fixture
+def frequent_switches():
+    # Cambios de hilo muy frecuentes para que las lecturas caigan a mitad de un lote
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(previous)
+
+
+def test_readers_never_see_a_half_applied_update(frequent_switches):
+    n = 200
+    index = RankingIndex(pd.DataFrame([record(f"p{i}", float(i)) for i in range(n)], columns=LEADERBOARD_COLUMNS))
+    stop, sizes, errors = threading.Event(), [], []
+
+    def reader():
+        while not stop.is_set():
+            try:
+                top = index.top(n)
+                sizes.append((len(top), top["Player_ID"].is_unique))
+            except Exception as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    for thread in readers:
+        thread.start()
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        # Repuntúa un lote: cada upsert quita y vuelve a poner al jugador
+        index.update([record(f"p{i}", float(rng.random() * n)) for i in rng.choice(n, 20, replace=False)])
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert sizes and set(sizes) == {(n, True)}
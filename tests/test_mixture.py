@@ -0,0 +1,75 @@
+# tests/test_mixture.py
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import mixture
+from mixture import mix_curves, project_batch, project_player_mixture
+
+CLASSES = ["estrellato tardío", "joven estrella", "jugador medio"]
+
+
+@pytest.fixture
+def curves():
+    rows = []
+    for k, group in enumerate(CLASSES):
+        for year in range(1, 6):
+            avg = 1.0 + k + 0.1 * year
+            rows.append({"peak_group": group, "year_since_debut": year, "rating_avg": avg, "rating_p25": avg - 0.2, "rating_p75": avg + 0.2})
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def assets(curves, monkeypatch):
+    proba = np.array([[0.2, 0.5, 0.3], [0.0, 0.0, 1.0]])
+    model = SimpleNamespace(classes_=np.arange(3), predict_proba=lambda X: proba[: len(X)])
+    label_encoder = SimpleNamespace(inverse_transform=lambda codes: np.array(CLASSES)[codes])
+    assets = SimpleNamespace(model=model, label_encoder=label_encoder, curves=curves)
+    monkeypatch.setattr(mixture, "get_model_assets", lambda: assets)
+    return assets
+
+
+def test_mixture_mean_is_the_probability_weighted_curve():
+    mu = np.array([[1.0, 2.0], [3.0, 4.0]])
+    sigma = np.zeros_like(mu)
+    mean, std = mix_curves(np.array([[0.25, 0.75], [1.0, 0.0]]), mu, sigma)
+
+    np.testing.assert_allclose(mean, [[2.5, 3.5], [1.0, 2.0]])
+    # Un solo grupo: la dispersión es la de su curva; dos grupos: también la distancia entre ellos
+    np.testing.assert_allclose(std[1], [0.0, 0.0])
+    np.testing.assert_allclose(std[0], [np.sqrt(0.25 * 0.75) * 2] * 2)
+
+
+def test_missing_years_redistribute_the_weights():
+    mu = np.array([[1.0, np.nan], [3.0, 4.0]])
+    mean, _ = mix_curves(np.array([[0.5, 0.5]]), mu, np.zeros_like(mu))
+    np.testing.assert_allclose(mean, [[2.0, 4.0]])
+
+
+def test_player_probabilities_match_predict_proba(assets):
+    seasonal = pd.DataFrame({"year_since_debut": [1, 2], "rating_per_90": [1.5, 2.0]})
+    label, _, curve, probabilities = project_player_mixture(pd.DataFrame([[0.0]]), seasonal, "p1")
+
+    assert probabilities == pytest.approx(dict(zip(CLASSES, [0.2, 0.5, 0.3])))
+    assert sum(probabilities.values()) == pytest.approx(1.0)
+    assert label == "joven estrella (50%)"
+    expected = sum(p * (1.0 + k + 0.1 * curve["year_since_debut"]) for k, p in enumerate([0.2, 0.5, 0.3]))
+    np.testing.assert_allclose(curve["rating_avg"], expected)
+    # La proyección pasa por el último rating real
+    assert curve.loc[curve["year_since_debut"] == 2, "projection"].item() == pytest.approx(2.0)
+
+
+def test_batch_probability_columns(assets):
+    X = pd.DataFrame({"f": [0.0, 0.0]}, index=pd.Index(["a", "b"], name="Player_ID"))
+    careers = pd.DataFrame({"Player_ID": ["a", "a", "b"], "year_since_debut": [1, 2, 1], "rating_per_90": [1.0, 1.2, 3.0]})
+
+    out = project_batch(X, careers)
+    probs = out.groupby("Player_ID")[[f"p_{c}" for c in CLASSES]].first()
+    np.testing.assert_allclose(probs.sum(axis=1), 1.0)
+    np.testing.assert_allclose(probs.loc["b"], [0.0, 0.0, 1.0])
+    # Con probabilidad 1 la mezcla es la curva de ese grupo
+    b = out[out["Player_ID"] == "b"]
+    np.testing.assert_allclose(b["rating_avg"], 3.0 + 0.1 * b["year_since_debut"])
@@ -0,0 +1,82 @@
+# tests/test_model_runner.py
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import model_runner
+from model_runner import prepare_features_from_df
+
+FEATURES = ["avg_rating", "sum_minutes", "rating_year_1", "rating_year_3", "rating_year_4"]
+
+
+@pytest.fixture
+def player_df():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2018-01-01", "2023-12-31", freq="14D")
+    return pd.DataFrame({
+        "Player_ID": "p1",
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Minutes": rng.integers(0, 91, len(dates)),
+        "Goals": rng.integers(0, 2, len(dates)),
+        "Assists": rng.integers(0, 2, len(dates)),
+        "Shots": 3,
+        "Shots_on_target": 1,
+        "Yellow_cards": 0,
+        "Red_cards": 0,
+        "Age": np.linspace(18, 24, len(dates)),
+    })
+
+
+def use_assets(monkeypatch, max_year):
+    assets = SimpleNamespace(features=FEATURES, feature_max_year=max_year)
+    monkeypatch.setattr(model_runner, "get_model_assets", lambda: assets)
+
+
+def test_features_use_the_training_years(player_df, monkeypatch):
+    use_assets(monkeypatch, 3)
+    X, seasonal = prepare_features_from_df(player_df.copy(), "p1")
+
+    first_years = player_df[pd.to_datetime(player_df["Date"]).dt.year <= 2020]
+    assert X.loc[0, "sum_minutes"] == first_years["Minutes"].sum()
+    assert X.loc[0, "rating_year_4"] == 0
+    # La temporada a temporada sigue siendo la carrera completa
+    assert seasonal["year_since_debut"].max() == 6
+
+
+def test_without_manifest_uses_the_whole_career(player_df, monkeypatch):
+    use_assets(monkeypatch, None)
+    X, _ = prepare_features_from_df(player_df.copy(), "p1")
+
+    assert X.loc[0, "sum_minutes"] == player_df["Minutes"].sum()
+    assert X.loc[0, "rating_year_4"] != 0
+
+
+def test_prepare_features_does_not_mutate_the_input(player_df, monkeypatch):
+    use_assets(monkeypatch, 3)
+    original = player_df.copy()
+
+    prepare_features_from_df(player_df, "p1")
+    pd.testing.assert_frame_equal(player_df, original)
+
+
+def test_project_player_does_not_mutate_seasonal(player_df, monkeypatch):
+    curves = pd.DataFrame({"peak_group": "jugador medio", "year_since_debut": range(1, 15), "rating_avg": 1.0})
+    assets = SimpleNamespace(
+        features=FEATURES,
+        feature_max_year=None,
+        curves=curves,
+        model=SimpleNamespace(predict=lambda X: [0]),
+        label_encoder=SimpleNamespace(inverse_transform=lambda y: ["jugador medio"]),
+    )
+    monkeypatch.setattr(model_runner, "get_model_assets", lambda: assets)
+    X, seasonal = prepare_features_from_df(player_df, "p1")
+    seasonal["year_since_debut"] = seasonal["year_since_debut"].astype(float)
+    original = seasonal.copy()
+
+    group, projected, curve = model_runner.project_player(X, seasonal, "p1")
+    assert group == "jugador medio"
+    assert projected["year_since_debut"].dtype == int
+    pd.testing.assert_frame_equal(seasonal, original)
@@ -0,0 +1,104 @@
+# tests/test_percentiles.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from percentiles import ALL_POSITIONS, PercentileEngine, latest_season_percentiles, season_table
+
+
+def seasons_frame(n_attacking=30, n_defensive=5):
+    rng = np.random.default_rng(0)
+    n = n_attacking + n_defensive
+    return pd.DataFrame({
+        "Player_ID": [f"p{i}" for i in range(n)],
+        "year_since_debut": 1,
+        "position_group": ["ATTACKING"] * n_attacking + ["DEFENSIVE"] * n_defensive,
+        "rating_per_90": rng.normal(1.0, 0.5, n),
+        "Minutes": rng.integers(0, 3000, n).astype(float),
+        "G+A": rng.integers(0, 20, n).astype(float),
+    })
+
+
+def mid_rank(arr, value):
+    arr = np.asarray(arr)
+    return ((arr < value).sum() + (arr == value).sum() / 2) / len(arr) * 100
+
+
+def test_percentile_is_mid_rank_with_ties():
+    seasons = pd.DataFrame({
+        "year_since_debut": 1,
+        "position_group": "MIDFIELD",
+        "rating_per_90": [1.0, 2.0, 2.0, 3.0],
+        "Minutes": [0.0, 0.0, 0.0, 0.0],
+        "G+A": [0.0, 0.0, 0.0, 0.0],
+    })
+    engine = PercentileEngine(seasons, min_samples=1)
+
+    result = engine.percentile("rating_per_90", 1, "MIDFIELD", [0.5, 2.0, 3.0, 9.0])
+    np.testing.assert_allclose(result, [0.0, 50.0, 87.5, 100.0])
+    assert [mid_rank([1, 2, 2, 3], v) for v in (0.5, 2.0, 3.0, 9.0)] == list(result)
+
+
+def test_small_groups_fall_back_to_all_positions():
+    seasons = seasons_frame(n_attacking=30, n_defensive=5)
+    engine = PercentileEngine(seasons, min_samples=20)
+
+    attacking = engine.distribution("rating_per_90", 1, "ATTACKING")
+    assert len(attacking) == 30
+    # 5 defensas < min_samples: se compara con el año completo
+    np.testing.assert_array_equal(engine.distribution("rating_per_90", 1, "DEFENSIVE"), engine.distribution("rating_per_90", 1, ALL_POSITIONS))
+    assert len(engine.distribution("rating_per_90", 1, ALL_POSITIONS)) == 35
+
+
+def test_unknown_year_gives_nan():
+    engine = PercentileEngine(seasons_frame())
+    assert len(engine.distribution("Minutes", 12)) == 0
+    assert np.isnan(engine.percentile("Minutes", 12, "ATTACKING", [100.0])).all()
+
+
+def test_rank_matches_scalar_percentiles():
+    seasons = seasons_frame()
+    engine = PercentileEngine(seasons, min_samples=20)
+
+    ranked = engine.rank(seasons)
+    for _, row in ranked.iterrows():
+        arr = engine.distribution("G+A", 1, row["position_group"])
+        assert row["pct_G+A"] == pytest.approx(mid_rank(arr, row["G+A"]))
+    assert ranked["pct_rating_per_90"].between(0, 100).all()
+
+
+@pytest.fixture
+def matchlogs():
+    return pd.DataFrame({
+        "Player_ID": ["a", "a", "a", "b"],
+        # El año sin minutos no cuenta como debut
+        "Date": ["2019-05-01", "2020-03-01", "2021-03-01", "2021-04-01"],
+        "Minutes": [0, 90, 90, 45],
+        "Goals": [0, 1, 0, 1],
+        "Assists": [0, 0, 2, 0],
+        "Shots": [0, 2, 1, 1],
+        "Shots_on_target": [0, 1, 0, 1],
+        "Yellow_cards": [0, 0, 0, 0],
+        "Red_cards": [0, 0, 0, 0],
+    })
+
+
+def test_season_table(matchlogs):
+    seasons = season_table(matchlogs, pd.Series({"a": "MIDFIELD"}))
+
+    a = seasons[seasons["Player_ID"] == "a"].set_index("year_since_debut")
+    assert list(a.index) == [0, 1, 2]
+    assert a.loc[2, "G+A"] == 2
+    assert a.loc[1, "rating_per_90"] == pytest.approx(5 + 0.5 + 0.1)
+    assert set(seasons["position_group"]) == {"MIDFIELD", "UNKNOWN"}
+
+
+def test_latest_season_percentiles(matchlogs):
+    engine = PercentileEngine(seasons_frame().assign(year_since_debut=2), min_samples=20)
+    player_df = matchlogs[matchlogs["Player_ID"] == "a"]
+
+    result = latest_season_percentiles(player_df, "FW-MF", engine)
+    assert result["Año de referencia"] == 2
+    arr = engine.distribution("G+A", 2, "ATTACKING")
+    assert result["Percentil G+A"] == pytest.approx(mid_rank(arr, 2))
@@ -0,0 +1,29 @@
+# tests/test_positions.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import assign_position_group
+from positions import classify_positions, position_group
+
+POSITIONS = ["FW-MF", "MF (AM)", "DF,MF", "DM", "gk", " FW", "XX (CB)", "XX", "", None, np.nan, "(LW)"]
+
+
+@pytest.mark.parametrize("position, expected", [
+    ("FW-MF", "ATTACKING"),
+    ("MF (AM)", "MIDFIELD"),
+    ("DM", "MIDFIELD"),
+    ("gk", "GOALKEEPER"),
+    ("XX (CB)", "DEFENSIVE"),
+    ("XX", "UNKNOWN"),
+    (None, "UNKNOWN"),
+])
+def test_position_group(position, expected):
+    assert position_group(position) == expected
+    assert assign_position_group(position) == expected
+
+
+def test_scalar_matches_vectorized():
+    vectorized = classify_positions(pd.Series(POSITIONS, dtype="object")).astype(str).tolist()
+    assert [position_group(p) for p in POSITIONS] == vectorized
@@ -0,0 +1,84 @@
+# tests/test_rate_limit.py
+
+import threading
+import time
+
+import pytest
+
+from rate_limit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_burst_then_refill(clock):
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate=10, capacity=2, clock=clock, sleep=clock.sleep)
+    clock.now += 60
+
+    assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+def test_acquire_waits_for_next_token(clock):
+    bucket = TokenBucket(rate=4, capacity=1, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire()
+    assert bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.25)]
+
+
+def test_acquire_timeout(clock):
+    bucket = TokenBucket(rate=1, capacity=1, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+
+    assert not bucket.acquire(timeout=0.5)
+    assert clock.now == pytest.approx(0.5)
+    assert bucket.acquire(timeout=1)
+
+
+def test_shared_between_threads():
+    # Reloj real: 20 peticiones a 100/s con ráfaga de 5 tardan ≥ 0.15 s
+    bucket = TokenBucket(rate=100, capacity=5)
+    granted = []
+
+    def worker():
+        for _ in range(5):
+            granted.append(bucket.acquire(timeout=5))
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert granted == [True] * 20
+    assert time.monotonic() - start >= 0.14
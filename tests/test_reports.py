@@ -0,0 +1,27 @@
+# tests/test_reports.py
+#
+# Humo del CLI con el render en paralelo: el pool de procesos tiene que poder
+# enviar las tareas a los workers (se salta sin los CSV del repositorio).
+
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from conftest import SRC_DIR
+from data_loader import DATA_FILES
+
+pytestmark = pytest.mark.skipif(not DATA_FILES["future_players"].exists(), reason="faltan los datos")
+
+
+def test_cli_renders_in_parallel(tmp_path):
+    ids = list(pd.read_csv(DATA_FILES["future_players"])["Player_ID"].drop_duplicates()[:2])
+
+    result = subprocess.run(
+        [sys.executable, str(SRC_DIR / "reports.py"), "--players", *ids, "--format", "html", "--jobs", "2", "--output", str(tmp_path)],
+        capture_output=True, text=True, timeout=600,
+    )
+
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([f"{pid}.html" for pid in ids] + ["index.html"])
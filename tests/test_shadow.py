@@ -0,0 +1,90 @@
+# tests/test_shadow.py
+
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from shadow import VERSIONS, confusion_between, save_report, shadow_score, summarize
+
+CLASSES = np.array(["estrellato tardío", "joven estrella", "jugador medio"])
+
+
+class FakeAssets(SimpleNamespace):
+    # Como ModelAssets: atributos y desempaquetado (model, le, curves, features)
+    def __iter__(self):
+        return iter((self.model, self.label_encoder, self.curves, self.features))
+
+
+def fake_assets(cutoff):
+    # Por encima del corte, "joven estrella"; por debajo, "jugador medio"
+    def predict_proba(X):
+        score = (X["avg_rating"].to_numpy() - cutoff) / 10
+        logits = np.stack([np.zeros_like(score), score, -score], axis=1)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    curves = pd.DataFrame([
+        {"peak_group": group, "year_since_debut": year, "rating_avg": 1.0 + k + 0.1 * year}
+        for k, group in enumerate(CLASSES) for year in range(1, 15)
+    ])
+    model = SimpleNamespace(classes_=np.arange(3), predict_proba=predict_proba, predict=lambda X: predict_proba(X).argmax(axis=1))
+    return FakeAssets(
+        model=model, curves=curves, features=["avg_rating", "sum_minutes"],
+        label_encoder=SimpleNamespace(inverse_transform=lambda codes: CLASSES[np.asarray(codes)]),
+    )
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2019-01-01", "2023-12-31", freq="21D")
+    ids = [f"p{i}" for i in range(12)]
+    matchlogs = pd.concat([
+        pd.DataFrame({
+            "Player_ID": pid, "Date": dates.strftime("%Y-%m-%d"),
+            "Minutes": rng.integers(0, 91, len(dates)), "Goals": rng.integers(0, 1 + i % 4, len(dates)),
+            "Assists": rng.integers(0, 2, len(dates)), "Shots": 3, "Shots_on_target": 1,
+            "Yellow_cards": 0, "Red_cards": 0,
+        })
+        for i, pid in enumerate(ids)
+    ], ignore_index=True)
+    metadata = pd.DataFrame({
+        "Player_ID": ids, "Player_name": ids, "Birth_date": "2001-01-01",
+        "Position": ["FW", "MF", "DF"] * 4,
+    })
+    return matchlogs, metadata
+
+
+def test_same_model_changes_nothing(data):
+    players = shadow_score(*data, fake_assets(30), fake_assets(30), n_jobs=1)
+
+    assert len(players) == 12 and not players["changed"].any()
+    assert (players["projected_delta"] == 0).all()
+    summary = summarize(players)
+    assert summary["n_changed"] == 0 and summary["changes"] == {}
+    assert summary["distribution"]["baseline"] == summary["distribution"]["candidate"]
+
+
+def test_changes_are_counted_consistently(data, tmp_path):
+    players = shadow_score(*data, fake_assets(30), fake_assets(50), n_jobs=1)
+    summary = summarize(players)
+    confusion = confusion_between(players)
+
+    assert summary["n_changed"] == players["changed"].sum() > 0
+    assert sum(summary["changes"].values()) == summary["n_changed"]
+    # Fuera de la diagonal (sin totales) están justo los que cambian
+    cells = confusion.drop(index="total", columns="total")
+    off_diagonal = sum(n for (a, b), n in cells.stack().items() if a != b)
+    assert off_diagonal == summary["n_changed"]
+    assert confusion.loc["total", "total"] == len(players)
+    for name in VERSIONS:
+        assert players[f"confidence_{name}"].between(1 / 3, 1).all()
+    # Ordenado por |Δ| de mayor a menor
+    assert players["projected_delta"].abs().is_monotonic_decreasing
+
+    output = save_report({"summary": summary, "players": players, "confusion": confusion}, tmp_path / "shadow")
+    assert json.loads((output / "summary.json").read_text(encoding="utf-8"))["n_changed"] == summary["n_changed"]
+    assert len(pd.read_csv(output / "players.csv")) == len(players)
@@ -0,0 +1,70 @@
+# tests/test_shared_tables.py
+
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import shared_tables
+from data_loader import DATA_FILES
+from shared_tables import POINTER_NAME, attach_table, ensure_published, publish, read_shared_table
+
+FRAME = pd.DataFrame({"Player_ID": ["a", "b", "c"], "Minutes": [90, 45, 0], "Rating": [1.5, 0.5, 0.0]})
+
+
+@pytest.fixture
+def published(tmp_path, monkeypatch):
+    """
+    Publicación en tmp_path con una tabla pequeña en lugar de los CSV.
+    """
+    calls = []
+
+    def normalized(name):
+        calls.append(name)
+        return pa.Table.from_pandas(FRAME, preserve_index=False).cast(
+            pa.schema([("Player_ID", pa.large_string()), ("Minutes", pa.int64()), ("Rating", pa.float64())])
+        )
+
+    monkeypatch.setattr(shared_tables, "_normalized", normalized)
+    monkeypatch.setattr(shared_tables, "get_base_data_version", lambda: "v1")
+    monkeypatch.setattr(shared_tables, "_attached", {})
+    return tmp_path, calls
+
+
+def test_round_trip_without_copies(published):
+    directory, _ = published
+    target = publish(directory, "v1")
+    df = read_shared_table(target / "players.arrow")
+
+    pd.testing.assert_frame_equal(df.astype({"Player_ID": object}), FRAME)
+    assert df["Player_ID"].dtype == pd.StringDtype("pyarrow")
+    # Las columnas numéricas son vistas del fichero proyectado
+    assert not df["Minutes"].to_numpy().flags.writeable
+
+
+def test_publish_updates_pointer_and_prunes_old_versions(published):
+    directory, _ = published
+    for version in ("v1", "v2", "v3"):
+        publish(directory, version)
+
+    pointer = json.loads((directory / POINTER_NAME).read_text(encoding="utf-8"))
+    assert pointer["version"] == "v3" and set(pointer["tables"]) == set(DATA_FILES)
+    assert sorted(p.name for p in directory.iterdir() if p.is_dir()) == ["v2", "v3"]
+
+
+def test_ensure_published_publishes_once(published):
+    directory, calls = published
+    assert ensure_published(directory) == (directory, "v1")
+    assert ensure_published(directory) == (directory, "v1")
+    assert len(calls) == len(DATA_FILES)
+
+
+def test_attached_tables_are_independent_per_caller(published):
+    directory, calls = published
+    first = attach_table("players", directory)
+    first["extra"] = 1
+
+    second = attach_table("players", directory)
+    assert "extra" not in second
+    assert len(calls) == len(DATA_FILES)
@@ -0,0 +1,183 @@
+# tests/test_singleflight.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+import singleflight
+from singleflight import SingleFlight, single_flight, single_flight_stream
+
+
+@pytest.fixture
+def waiting(monkeypatch):
+    """
+    Semáforo que se libera cada vez que un hilo se pone a esperar al líder.
+    """
+    semaphore = threading.Semaphore(0)
+
+    class TrackedFuture(singleflight.Future):
+        def result(self, timeout=None):
+            semaphore.release()
+            return super().result(timeout)
+
+    monkeypatch.setattr(singleflight, "Future", TrackedFuture)
+    return semaphore
+
+
+def wait_for(semaphore: threading.Semaphore, n: int):
+    for _ in range(n):
+        assert semaphore.acquire(timeout=5)
+
+
+def slow_call(release: threading.Event, calls: list, value=None):
+    calls.append(value)
+    release.wait(5)
+    return object() if value is None else value
+
+
+def test_concurrent_calls_share_one_execution(waiting):
+    flight, release, calls = SingleFlight(), threading.Event(), []
+    started = threading.Barrier(5)
+
+    def call():
+        started.wait(5)
+        return flight.do("k", slow_call, release, calls)
+
+    with ThreadPoolExecutor(5) as pool:
+        futures = [pool.submit(call) for _ in range(5)]
+        # Los otros 4 esperan al que calcula antes de soltarlo
+        wait_for(waiting, 4)
+        release.set()
+        results = [f.result(timeout=10) for f in futures]
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flight.in_flight() == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+
+
+def test_errors_reach_waiters_and_are_not_cached(waiting):
+    flight, release = SingleFlight(), threading.Event()
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        release.wait(5)
+        raise RuntimeError("fallo")
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(flight.do, "k", failing) for _ in range(3)]
+        wait_for(waiting, 2)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=10)
+
+    assert len(attempts) == 1
+    assert flight.in_flight() == 0
+    assert flight.do("k", lambda: "ok") == "ok"
+
+
+def test_decorator_key_includes_versions(monkeypatch):
+    versions = ["d1", "m1"]
+    keys = []
+    flights = SingleFlight()
+    monkeypatch.setattr(singleflight, "current_versions", lambda: tuple(versions))
+    monkeypatch.setattr(singleflight, "_flights", flights)
+    monkeypatch.setattr(flights, "do", lambda key, func, *a, **kw: keys.append(key) or func(*a, **kw))
+
+    @single_flight("test_ns", key=lambda player_id, _ctx=None: player_id)
+    def compute(player_id, _ctx=None):
+        return player_id.upper()
+
+    assert compute("p1", _ctx=object()) == "P1"
+    versions[0] = "d2"
+    assert compute("p1") == "P1"
+    # El contexto no entra en la clave; la versión de datos sí
+    assert keys == [("test_ns", "p1", "d1", "m1"), ("test_ns", "p1", "d2", "m1")]
+
+
+def test_copy_gives_each_caller_its_own_frames(waiting, monkeypatch):
+    monkeypatch.setattr(singleflight, "_flights", SingleFlight())
+    release, calls = threading.Event(), []
+
+    @single_flight("test_copy", copy=True)
+    def predict(player_id):
+        calls.append(player_id)
+        release.wait(5)
+        return "grupo", pd.DataFrame({"year_since_debut": [1, 2]})
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(predict, "p1") for _ in range(3)]
+        wait_for(waiting, 2)
+        release.set()
+        results = [f.result(timeout=10) for f in futures]
+
+    assert calls == ["p1"]
+    assert [group for group, _ in results] == ["grupo"] * 3
+    frames = [frame for _, frame in results]
+    frames[0].loc[0, "year_since_debut"] = 99
+    assert frames[1]["year_since_debut"].tolist() == [1, 2]
+    assert len({id(frame) for frame in frames}) == 3
+
+
+# -------------------------
+# Streaming
+# -------------------------
+def words(calls: list):
+    calls.append(1)
+    yield "uno "
+    yield "dos"
+
+
+def test_stream_followers_get_the_leader_text(waiting):
+    flight, calls = SingleFlight(), []
+    leader = flight.stream("k", words, calls)
+    assert next(leader) == "uno "
+
+    with ThreadPoolExecutor(3) as pool:
+        followers = [pool.submit(lambda: list(flight.stream("k", words, calls))) for _ in range(3)]
+        wait_for(waiting, 3)
+        assert "".join(leader) == "dos"
+        results = [f.result(timeout=10) for f in followers]
+
+    assert calls == [1]
+    assert results == [["uno ", "dos"]] * 3
+    assert flight.in_flight() == 0
+
+
+def test_stream_follower_takes_over_when_leader_stops(waiting):
+    flight, calls = SingleFlight(), []
+    leader = flight.stream("k", words, calls)
+    next(leader)
+
+    with ThreadPoolExecutor(1) as pool:
+        follower = pool.submit(lambda: "".join(flight.stream("k", words, calls)))
+        wait_for(waiting, 1)
+        # La sesión del líder se cierra (rerun) antes de acabar
+        leader.close()
+        assert follower.result(timeout=10) == "uno dos"
+
+    assert calls == [1, 1]
+    assert flight.in_flight() == 0
+
+
+def test_stream_decorator_key_includes_versions(monkeypatch):
+    monkeypatch.setattr(singleflight, "current_versions", lambda: ("d1", "m1"))
+    monkeypatch.setattr(singleflight, "_flights", SingleFlight())
+    keys = []
+
+    @single_flight_stream("test_stream", key=lambda player_id: player_id)
+    def chunks(player_id):
+        keys.append(list(singleflight._flights._calls))
+        yield player_id
+
+    assert list(chunks("p1")) == ["p1"]
+    assert keys == [[("test_stream", "p1", "d1", "m1")]]
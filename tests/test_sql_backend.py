@@ -0,0 +1,83 @@
+# tests/test_sql_backend.py
+
+import pandas as pd
+import pytest
+
+import sql_backend
+from sql_backend import aggregate, select
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """
+    Base pequeña en tmp_path con dos jugadores en cada dataset.
+    """
+    metadata = pd.DataFrame({
+        "Player_ID": ["a", "b"],
+        "Player_name": ["Ana", "Bea"],
+        "Position": ["FW", "DF (CB)"],
+        "Birth_date": ["2000-01-01", "2003-06-01"],
+        "Age": ["24-100", "21-50"],
+    })
+    matchlogs = pd.DataFrame({
+        "Player_ID": ["a", "a", "b"],
+        "Date": ["2022-03-01", "2023-03-01", "2023-04-01"],
+        "Competition": ["La Liga"] * 3,
+        "Rival_team": ["Betis", "Celta", "Getafe"],
+        "Minutes": [90, 80, 45],
+        "Goals": [1, 2, 0],
+        "Assists": [0, 1, 1],
+        "Shots": [3, 4, 1],
+        "Shots_on_target": [1, 2, 0],
+        "Yellow_cards": [0, 0, 1],
+        "Red_cards": [0, 0, 0],
+    })
+    path = tmp_path / "futpeak_test.sqlite"
+    loaders = (lambda: matchlogs, lambda: metadata)
+    monkeypatch.setattr(sql_backend, "DATASETS", {"historical": loaders, "future": loaders})
+    monkeypatch.setattr(sql_backend, "database_path", lambda data_version=None: path)
+    return path
+
+
+def test_select_with_operators(database):
+    df = select("matchlogs", ["Player_ID", "Date"], dataset="historical", Minutes__gte=80, order_by="Date")
+    assert df.values.tolist() == [["a", "2022-03-01"], ["a", "2023-03-01"]]
+
+    df = select("players", ["Player_ID"], dataset="future", position_group__in=["DEFENSIVE", "GOALKEEPER"])
+    assert df["Player_ID"].tolist() == ["b"]
+
+    # None no filtra; una lista vacía en __in no devuelve nada
+    assert len(select("players", dataset="historical", Age__lt=None)) == 2
+    assert select("players", Player_ID__in=[]).empty
+
+
+def test_values_are_bound_as_parameters(database):
+    assert select("players", Player_name="x' OR '1'='1").empty
+    assert len(select("players")) == 4
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"Unknown": 1}, "Columna desconocida"),
+    ({'Player_ID" = Player_ID OR "1': 1}, "Columna desconocida"),
+    ({"Minutes__like": 1}, "Operador no soportado"),
+    ({"order_by": "Minutes; DROP TABLE players"}, "Columna desconocida"),
+    ({"columns": ["*"]}, "Columna desconocida"),
+])
+def test_select_rejects_invalid_filters(database, kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        select("matchlogs", **kwargs)
+
+
+def test_unknown_table(database):
+    with pytest.raises(ValueError, match="Tabla desconocida"):
+        select("sqlite_master")
+
+
+def test_aggregate(database):
+    df = aggregate("matchlogs", ["Player_ID"], {"Minutes": "sum", "Goals": "MAX"}, dataset="historical")
+    assert df.sort_values("Player_ID").values.tolist() == [["a", 170, 2], ["b", 45, 0]]
+
+    with pytest.raises(ValueError, match="Agregado no soportado"):
+        aggregate("matchlogs", ["Player_ID"], {"Minutes": "group_concat"})
+    with pytest.raises(ValueError, match="Columna desconocida"):
+        aggregate("matchlogs", ["Player_ID"], {"Minutes) FROM players --": "sum"})
@@ -0,0 +1,40 @@
+# tests/test_startup.py
+
+from startup import PAGE_REQUIREMENTS, StartupLoader, wait_for_page
+from tenants import DEFAULT_TENANT, current_tenant, use_tenant
+
+
+def test_tasks_run_under_the_loader_tenant():
+    loader = StartupLoader({"tenant": current_tenant}, tenant="acme")
+    assert loader.result("tenant", timeout=5) == "acme"
+
+
+def test_tenant_does_not_leak_from_the_launching_thread():
+    with use_tenant("acme"):
+        loader = StartupLoader({"tenant": current_tenant})
+    assert loader.result("tenant", timeout=5) == DEFAULT_TENANT
+
+
+def test_failed_task_is_retried_under_the_loader_tenant():
+    calls = []
+
+    def flaky():
+        calls.append(current_tenant())
+        if len(calls) == 1:
+            raise OSError("descarga interrumpida")
+        return calls[-1]
+
+    loader = StartupLoader({"flaky": flaky}, tenant="acme")
+    assert loader.result("flaky", timeout=5) == "acme"
+    assert calls == ["acme", "acme"]
+
+
+def test_player_page_does_not_wait_for_percentiles():
+    def broken():
+        raise FileNotFoundError("cleaned_matchlogs.csv")
+
+    tasks = {name: (lambda: None) for name in PAGE_REQUIREMENTS["player"]}
+    loader = StartupLoader({**tasks, "percentile_engine": broken})
+    loader.wait()
+    wait_for_page(loader, "player")
+    assert "error" in loader.status().set_index("recurso").loc["percentile_engine", "estado"]
@@ -0,0 +1,81 @@
+# tests/test_tenants.py
+
+import hashlib
+import json
+
+import pytest
+
+import tenants
+
+
+@pytest.fixture
+def tenants_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tenants, "TENANTS_DIR", tmp_path)
+    return tmp_path
+
+
+def write_registry(directory, entries):
+    (directory / tenants.REGISTRY_NAME).write_text(json.dumps(entries), encoding="utf-8")
+
+
+def key_hash(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+@pytest.fixture
+def registry(tenants_dir):
+    for name in ("acme", "beta", "intruso"):
+        (tenants_dir / name).mkdir()
+    write_registry(tenants_dir, {"acme": {"access_key_sha256": key_hash("secreto")}, "beta": {}})
+    return tenants_dir
+
+
+def test_list_tenants_reads_only_the_registry(registry):
+    assert tenants.list_tenants() == [tenants.DEFAULT_TENANT, "acme", "beta"]
+
+
+def test_registry_is_reread_when_it_changes(registry):
+    assert "gamma" not in tenants.list_tenants()
+    write_registry(registry, {"acme": {}, "gamma": {"access_key_sha256": key_hash("x")}})
+    assert tenants.list_tenants() == [tenants.DEFAULT_TENANT, "acme", "gamma"]
+
+
+def test_default_tenant_needs_no_key(registry):
+    assert tenants.resolve_tenant(None) == tenants.DEFAULT_TENANT
+    assert tenants.resolve_tenant(tenants.DEFAULT_TENANT, "cualquiera") == tenants.DEFAULT_TENANT
+
+
+def test_registered_tenant_with_correct_key(registry):
+    assert tenants.resolve_tenant("acme", "secreto") == "acme"
+
+
+@pytest.mark.parametrize("key", ["otra", "", None])
+def test_wrong_or_missing_key_is_rejected(registry, key):
+    with pytest.raises(PermissionError, match="incorrecta"):
+        tenants.resolve_tenant("acme", key)
+
+
+def test_tenant_without_registered_key_is_rejected(registry):
+    with pytest.raises(PermissionError, match="no tiene clave"):
+        tenants.resolve_tenant("beta", "")
+
+
+def test_unregistered_directory_is_not_accessible(registry):
+    with pytest.raises(KeyError):
+        tenants.resolve_tenant("intruso")
+
+
+def test_cache_entries_are_a_fixed_bound(registry, monkeypatch):
+    monkeypatch.setattr(tenants, "MAX_TENANTS", 4)
+
+    # MAX_TENANTS y uno de margen para el cambio de versión, registre quien se registre
+    assert tenants.tenant_cache_entries() == 5
+    assert tenants.tenant_cache_entries(per_tenant=2) == 10
+    write_registry(registry, {name: {} for name in "abcdefgh"})
+    assert tenants.tenant_cache_entries() == 5
+
+
+@pytest.mark.parametrize("tenant", ["../acme", "Acme", "", "a" * 65])
+def test_invalid_tenant_ids_are_rejected(tenant):
+    with pytest.raises(ValueError):
+        tenants.validate_tenant(tenant)
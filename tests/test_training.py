@@ -0,0 +1,50 @@
+# tests/test_training.py
+
+import json
+
+import pytest
+
+import training
+from backtest import holdout_players
+from model_utils import MANIFEST_NAME
+
+CLASSES = ["estrellato tardío", "joven estrella", "jugador medio"]
+
+
+def test_missing_backends_are_skipped(monkeypatch, capsys):
+    installed = {"lightgbm"}
+    monkeypatch.setattr(training.importlib.util, "find_spec", lambda name: object() if name in installed else None)
+
+    assert training.available_model_types(("lightgbm", "xgboost", "catboost")) == ("lightgbm",)
+    assert "xgboost no está instalado" in capsys.readouterr().out
+
+
+def test_no_backend_available_raises(monkeypatch):
+    monkeypatch.setattr(training.importlib.util, "find_spec", lambda name: None)
+
+    with pytest.raises(ValueError):
+        training.available_model_types()
+
+
+def test_single_class_model_is_rejected():
+    y_true = ["jugador medio"] * 6 + ["joven estrella"] * 3 + ["estrellato tardío"] * 2
+
+    with pytest.raises(ValueError, match="un solo grupo"):
+        training.check_class_distribution(y_true, ["joven estrella"] * len(y_true), CLASSES)
+
+
+def test_class_distribution_report():
+    y_true = ["jugador medio", "jugador medio", "joven estrella", "estrellato tardío"]
+    y_pred = ["jugador medio", "joven estrella", "joven estrella", "jugador medio"]
+
+    report = training.check_class_distribution(y_true, y_pred, CLASSES)
+    assert report["true_counts"] == {"estrellato tardío": 1, "joven estrella": 1, "jugador medio": 2}
+    assert report["predicted_counts"] == {"estrellato tardío": 0, "joven estrella": 2, "jugador medio": 2}
+    assert report["balanced_accuracy"] == pytest.approx((0 + 1 + 0.5) / 3, abs=1e-4)
+
+
+def test_holdout_players_from_manifest(tmp_path):
+    assert holdout_players(tmp_path) is None
+
+    (tmp_path / MANIFEST_NAME).write_text(json.dumps({"holdout_players": ["a1", "b2"]}), encoding="utf-8")
+    assert holdout_players(tmp_path) == ["a1", "b2"]
@@ -0,0 +1,91 @@
+# tests/test_whatif.py
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import model_runner
+from model_runner import prepare_features_from_df, project_player
+from whatif import WhatIfSimulator
+
+FEATURES = ["avg_rating", "sum_minutes", "rating_year_1", "growth_2_1", "rating_year_7", "minutes_year_7"]
+CLASSES = np.array(["estrellato tardío", "joven estrella", "jugador medio"])
+
+
+def matches(start, end, seed):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, end, freq="14D")
+    return pd.DataFrame({
+        "Player_ID": "p1",
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Minutes": rng.integers(0, 91, len(dates)),
+        "Goals": rng.integers(0, 2, len(dates)),
+        "Assists": rng.integers(0, 2, len(dates)),
+        "Shots": 3,
+        "Shots_on_target": 1,
+        "Yellow_cards": 0,
+        "Red_cards": 0,
+        "Age": 18 + (dates - dates[0]).days / 365.25,
+    })
+
+
+def predict_proba(X):
+    # Depende de varias features para que cualquier diferencia cambie la salida
+    score = np.asarray(X["avg_rating"], dtype=float) + np.asarray(X["sum_minutes"], dtype=float) / 1e4
+    logits = np.stack([score, 2 * score - 2, np.full_like(score, 1.5)], axis=1)
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+@pytest.fixture
+def assets(monkeypatch):
+    curves = pd.DataFrame([
+        {"peak_group": group, "year_since_debut": year, "rating_avg": 1.0 + k + 0.1 * year, "rating_p25": 0.5, "rating_p75": 2.5}
+        for k, group in enumerate(CLASSES) for year in range(1, 15)
+    ])
+    model = SimpleNamespace(
+        classes_=np.arange(3),
+        predict_proba=predict_proba,
+        predict=lambda X: predict_proba(X).argmax(axis=1),
+    )
+    assets = SimpleNamespace(
+        features=FEATURES,
+        feature_max_year=None,
+        curves=curves,
+        model=model,
+        label_encoder=SimpleNamespace(inverse_transform=lambda codes: CLASSES[np.asarray(codes)]),
+    )
+    monkeypatch.setattr(model_runner, "get_model_assets", lambda: assets)
+    return assets
+
+
+def test_unchanged_inputs_reproduce_the_baseline(assets):
+    X, seasonal = prepare_features_from_df(matches("2018-01-01", "2023-12-31", 0), "p1")
+    simulator = WhatIfSimulator(X, seasonal, assets)
+
+    x, changed = simulator.feature_vector([])
+    assert changed == []
+    np.testing.assert_array_equal(x, X.iloc[0].to_numpy(dtype=float))
+
+    result = simulator.simulate([])
+    group, baseline_seasonal, baseline_curve = project_player(X, seasonal, "p1")
+    assert result["group"] == group
+    assert list(result["probabilities"].values()) == pytest.approx(predict_proba(X)[0], abs=1e-4)
+    assert not result["seasonal"]["hypothetical"].any()
+    np.testing.assert_allclose(result["seasonal"]["rating_per_90"], baseline_seasonal["rating_per_90"])
+    np.testing.assert_allclose(result["curve"]["projection"], baseline_curve["projection"])
+
+
+def test_hypothetical_season_matches_the_recomputed_profile(assets):
+    history = matches("2018-01-01", "2023-12-31", 0)
+    extended = pd.concat([history, matches("2024-01-01", "2024-12-31", 1)], ignore_index=True)
+    X, seasonal = prepare_features_from_df(history, "p1")
+    X_full, seasonal_full = prepare_features_from_df(extended, "p1")
+    season = seasonal_full[seasonal_full["year_since_debut"] == 7].iloc[0]
+
+    x, changed = WhatIfSimulator(X, seasonal, assets).feature_vector([(season["Minutes"], season["rating_per_90"])])
+
+    np.testing.assert_allclose(x, X_full.iloc[0].to_numpy(dtype=float))
+    assert set(changed) == {"avg_rating", "sum_minutes", "rating_year_7", "minutes_year_7"}